@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+treetype Categorization Benchmark
+Compares categorize_token/is_non_typeable against the kind-id dispatch tables
+on every leaf of a source corpus, and checks both produce identical results.
+
+Usage:
+  python DEV/SCRIPTS/bench_categorize.py [source_dir] [--repeat N]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "build"))
+
+from parse_json import (  # noqa: E402
+    LANGUAGE_EXTENSIONS,
+    PARSERS,
+    categorize_token,
+    get_kind_table,
+    is_non_typeable,
+    iter_leaves,
+)
+from token_table import categories_to_mask, mask_to_categories  # noqa: E402
+
+DEFAULT_CORPUS = Path(__file__).resolve().parents[1] / "MISC" / "GM_01_CODE_SNIPPETS"
+
+
+def collect_leaves(corpus_dir):
+    """Return [(language, kind_id, type, raw, text)] for every leaf in the corpus"""
+    leaves = []
+    for path in sorted(corpus_dir.rglob("*")):
+        language = LANGUAGE_EXTENSIONS.get(path.suffix)
+        if language is None:
+            continue
+        source = path.read_bytes()
+        lang, parser = PARSERS[language]
+        for node in iter_leaves(parser.parse(source).root_node):
+            raw = source[node.start_byte : node.end_byte]
+            leaves.append((language, node.kind_id, node.type, raw, raw.decode("utf-8")))
+    return leaves
+
+
+def time_it(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("corpus", nargs="?", default=DEFAULT_CORPUS, type=Path)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    leaves = collect_leaves(args.corpus)
+    tables = {
+        language: get_kind_table(language, PARSERS[language][0]) for language in PARSERS
+    }
+    print(f"Leaves: {len(leaves)} from {args.corpus}\n")
+
+    # Correctness: identical categories and typeability for every leaf
+    mismatches = 0
+    for language, kind_id, token_type, raw, text in leaves:
+        table = tables[language]
+        expected = categorize_token(token_type, text)
+        if mask_to_categories(table.category_mask(kind_id, raw)) != expected:
+            mismatches += 1
+        if table.is_non_typeable(kind_id, raw) != is_non_typeable(token_type, text):
+            mismatches += 1
+
+    def run_rules():
+        for _, _, token_type, _, text in leaves:
+            categories_to_mask(categorize_token(token_type, text))
+            is_non_typeable(token_type, text)
+
+    def run_tables():
+        for language, kind_id, _, raw, _ in leaves:
+            table = tables[language]
+            table.category_mask(kind_id, raw)
+            table.is_non_typeable(kind_id, raw)
+
+    rules_time = time_it(run_rules, args.repeat)
+    tables_time = time_it(run_tables, args.repeat)
+
+    print(f"{'Method':<24}{'Total (ms)':>12}{'ns/token':>12}")
+    print("-" * 48)
+    for name, elapsed in (
+        ("string rules", rules_time),
+        ("kind-id tables", tables_time),
+    ):
+        per_token = elapsed / len(leaves) * 1e9
+        print(f"{name:<24}{elapsed * 1000:>12.1f}{per_token:>12.0f}")
+    print(f"\nSpeedup: {rules_time / tables_time:.1f}x")
+
+    if mismatches:
+        print(f"\n❌ {mismatches} mismatch(es) between rules and tables")
+        return 1
+
+    print("\n✅ Tables match categorize_token/is_non_typeable on every leaf")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+treetype Emitter Benchmark
+Times dataframe_to_json against the previous groupby/iterrows emitter on the
+largest file of a source corpus, and checks both produce identical JSON.
+
+Usage:
+  python DEV/SCRIPTS/bench_emit.py [source_dir] [--repeat N]
+"""
+
+import argparse
+import gc
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "build"))
+
+from parse_json import (  # noqa: E402
+    LANGUAGE_EXTENSIONS,
+    PARSERS,
+    build_line_json,
+    dataframe_to_json,
+    parse_code_to_dataframe,
+    read_source,
+    snippet_json,
+)
+
+DEFAULT_CORPUS = Path(__file__).resolve().parents[1] / "MISC" / "GM_01_CODE_SNIPPETS"
+
+
+def groupby_dataframe_to_json(df, source_code, language_name, schema=1):
+    """The previous emitter: per-line groupby, sort_values and iterrows"""
+    lines_data = []
+    src_lines = source_code.split("\n")
+
+    for line_num, line_df in df.groupby("START_ROW"):
+        line_df = line_df.sort_values(["START_COL"]).reset_index(drop=True)
+        indent_level = line_df.iloc[0]["INDENT_LEVEL"] if len(line_df) > 0 else 0
+
+        display_tokens = []
+        for idx, row in line_df.iterrows():
+            display_tokens.append(
+                {
+                    "text": row["TEXT"],
+                    "type": row["TYPE"],
+                    "categories": row["CATEGORIES"],
+                    "base_typeable": bool(row["BASE_TYPEABLE"]),
+                    "start_col": int(row["START_COL"]),
+                    "end_col": int(row["END_COL"]),
+                }
+            )
+
+        actual_line = src_lines[line_num] if line_num < len(src_lines) else ""
+        lines_data.append(
+            build_line_json(line_num, indent_level, display_tokens, actual_line, schema)
+        )
+
+    return snippet_json(language_name, lines_data, schema)
+
+
+def time_it(fn, repeat):
+    """Best of repeat runs, with the garbage collector paused (like timeit)"""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("corpus", nargs="?", default=DEFAULT_CORPUS, type=Path)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    sources = [p for p in args.corpus.rglob("*") if p.suffix in LANGUAGE_EXTENSIONS]
+    path = max(sources, key=lambda p: p.stat().st_size)
+    language = LANGUAGE_EXTENSIONS[path.suffix]
+    source_code = read_source(path).decode("utf-8")
+    df = parse_code_to_dataframe(source_code, PARSERS[language][1], language)
+    print(f"File: {path.name} ({language}, {len(df)} tokens)\n")
+
+    expected = groupby_dataframe_to_json(df, source_code, language)
+    matches = dataframe_to_json(df, source_code, language) == expected
+
+    groupby_time = time_it(
+        lambda: groupby_dataframe_to_json(df, source_code, language), args.repeat
+    )
+    sweep_time = time_it(
+        lambda: dataframe_to_json(df, source_code, language), args.repeat
+    )
+
+    print(f"{'Emitter':<24}{'Total (ms)':>12}{'us/token':>12}")
+    print("-" * 48)
+    for name, elapsed in (
+        ("groupby/iterrows", groupby_time),
+        ("sort + sweep", sweep_time),
+    ):
+        per_token = elapsed / len(df) * 1e6
+        print(f"{name:<24}{elapsed * 1000:>12.1f}{per_token:>12.1f}")
+    print(f"\nSpeedup: {groupby_time / sweep_time:.1f}x")
+
+    if not matches:
+        print("\n❌ Emitters produce different JSON")
+        return 1
+
+    print("\n✅ Identical JSON from both emitters")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+treetype JSON Backend Benchmark
+Measures read/write throughput of every installed JSON backend over a snippet
+corpus, and checks each one writes the same bytes as stdlib json.
+
+Usage:
+  python DEV/SCRIPTS/bench_json.py [corpus_dir] [--repeat N]
+"""
+
+import argparse
+import gc
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "build"))
+
+from json_backend import available_backends, get_backend  # noqa: E402
+
+DEFAULT_CORPUS = Path(__file__).resolve().parents[2] / "public"
+
+
+def time_it(fn, repeat):
+    """Best of repeat runs, with the garbage collector paused (like timeit)"""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("corpus", nargs="?", default=DEFAULT_CORPUS, type=Path)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    blobs = [path.read_bytes() for path in sorted(args.corpus.rglob("*.json"))]
+    total_mb = sum(len(blob) for blob in blobs) / 1e6
+    reference = get_backend("stdlib")
+    documents = [reference.loads(blob) for blob in blobs]
+    expected = {
+        pretty: [reference.dumps(doc, pretty=pretty) for doc in documents]
+        for pretty in (False, True)
+    }
+    print(f"Corpus: {len(blobs)} files, {total_mb:.1f} MB from {args.corpus}")
+    print("(all throughputs are corpus MB per second)\n")
+
+    print(
+        f"{'Backend':<10}{'read MB/s':>12}{'write MB/s':>12}{'pretty MB/s':>13}  bytes"
+    )
+    print("-" * 56)
+    mismatched = []
+    for name in available_backends():
+        backend = get_backend(name)
+        loads, dumps = backend.loads, backend.dumps
+
+        read = time_it(lambda: [loads(blob) for blob in blobs], args.repeat)
+        write = time_it(lambda: [dumps(doc) for doc in documents], args.repeat)
+        pretty = time_it(
+            lambda: [dumps(doc, pretty=True) for doc in documents], args.repeat
+        )
+
+        same = all(
+            [dumps(doc, pretty=p) for doc in documents] == expected[p]
+            for p in (False, True)
+        )
+        if not same:
+            mismatched.append(name)
+        print(
+            f"{name:<10}{total_mb / read:>12.1f}{total_mb / write:>12.1f}"
+            f"{total_mb / pretty:>13.1f}  {'same' if same else 'DIFFERENT'}"
+        )
+
+    if mismatched:
+        print(f"\n❌ Output differs from stdlib json: {', '.join(mismatched)}")
+        return 1
+
+    print("\n✅ Every backend writes the same bytes as stdlib json")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+treetype Metadata Scan Benchmark
+Compares the 'decode' and 'stream' snippet scanners of build_metadata.py:
+peak traced memory for the largest file, wall-clock over the corpus for each
+job count, and identical stats from both.
+
+Usage:
+  python DEV/SCRIPTS/bench_metadata_scan.py [snippets_dir] [--jobs 1 2 4]
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "build"))
+
+from build_metadata import (  # noqa: E402
+    SCANNERS,
+    scan_snippets,
+    snippet_stats,
+    stream_snippet_stats,
+)
+
+DEFAULT_CORPUS = Path(__file__).resolve().parents[2] / "public"
+SCAN_FUNCTIONS = {"decode": snippet_stats, "stream": stream_snippet_stats}
+
+
+def peak_memory(fn, path):
+    """Peak Python allocation while fn(path) runs, in MB"""
+    tracemalloc.start()
+    try:
+        fn(path)
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("corpus", nargs="?", default=DEFAULT_CORPUS, type=Path)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    files = sorted(p for p in args.corpus.rglob("*.json") if p.name != "metadata.json")
+    total_mb = sum(p.stat().st_size for p in files) / 1e6
+    largest = max(files, key=lambda p: p.stat().st_size)
+    print(f"Corpus: {len(files)} files, {total_mb:.1f} MB from {args.corpus}")
+    print(f"Largest: {largest.name} ({largest.stat().st_size / 1e6:.1f} MB)\n")
+
+    header = f"{'Scanner':<10}{'peak MB':>10}"
+    header += "".join(f"{f'-j {jobs} (s)':>12}" for jobs in args.jobs)
+    print(header)
+    print("-" * len(header))
+
+    results = {}
+    for scanner in SCANNERS:
+        row = f"{scanner:<10}{peak_memory(SCAN_FUNCTIONS[scanner], largest):>10.1f}"
+        for jobs in args.jobs:
+            start = time.perf_counter()
+            results[scanner] = list(scan_snippets(files, scanner, jobs))
+            row += f"{time.perf_counter() - start:>12.2f}"
+        print(row)
+
+    if results["decode"] != results["stream"]:
+        print("\n❌ Scanners report different stats")
+        return 1
+
+    print("\n✅ Identical stats from both scanners")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
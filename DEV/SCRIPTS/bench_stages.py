@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+treetype Stage Cache Benchmark
+Times building every token table of a source corpus with nothing cached,
+with leaves cached (a tokenizer change), with leaves and tokens cached (a
+categorization rule change) and fully cached, and checks every variant
+yields the same tables as build_token_table.
+
+Usage:
+  python DEV/SCRIPTS/bench_stages.py [source_dir] [--categorizer query]
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "build"))
+
+from build_cache import STAGES_DIR_NAME, BuildCache  # noqa: E402
+from parse_json import (  # noqa: E402
+    CATEGORIZERS,
+    LANGUAGE_EXTENSIONS,
+    PARSERS,
+    STAGES,
+    build_token_table,
+    build_token_table_cached,
+    read_source,
+    stage_keys,
+)
+
+DEFAULT_CORPUS = Path(__file__).resolve().parents[1] / "MISC" / "GM_01_CODE_SNIPPETS"
+
+# Stages still cached in each scenario (the rest are deleted before the run)
+SCENARIOS = (
+    ("no cache", ()),
+    ("tokenizer change", ("leaves",)),
+    ("rule change", ("leaves", "tokens")),
+    ("unchanged", STAGES),
+)
+
+
+def table_columns(table):
+    """Comparable contents of a TokenTable"""
+    return list(table.iter_records())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("corpus", nargs="?", default=DEFAULT_CORPUS, type=Path)
+    parser.add_argument("--categorizer", choices=CATEGORIZERS, default="rules")
+    args = parser.parse_args()
+
+    sources = []
+    for path in sorted(args.corpus.rglob("*")):
+        language = LANGUAGE_EXTENSIONS.get(path.suffix)
+        if language is not None:
+            source = read_source(path)
+            keys = stage_keys(source, language, args.categorizer)
+            sources.append((source, language, keys))
+    print(f"Corpus: {len(sources)} files from {args.corpus}\n")
+
+    expected = [
+        table_columns(
+            build_token_table(source, PARSERS[language][1], language, args.categorizer)
+        )
+        for source, language, _ in sources
+    ]
+
+    cache_dir = Path(tempfile.mkdtemp(prefix="treetype_stages_"))
+    try:
+        # Populate every stage once
+        cache = BuildCache(cache_dir)
+        for source, language, keys in sources:
+            parser_ = PARSERS[language][1]
+            build_token_table_cached(
+                source, parser_, language, args.categorizer, cache, keys
+            )
+        stages_dir = cache_dir / STAGES_DIR_NAME
+        kept = {stage: cache_dir / f"kept_{stage}" for stage in STAGES}
+        for stage, path in kept.items():
+            shutil.copytree(stages_dir / stage, path)
+
+        print(f"{'Scenario':<20}{'time (s)':>10}  stages rebuilt")
+        print("-" * 60)
+        ok = True
+        for label, cached in SCENARIOS:
+            for stage in STAGES:
+                shutil.rmtree(stages_dir / stage, ignore_errors=True)
+                if stage in cached:
+                    shutil.copytree(kept[stage], stages_dir / stage)
+
+            cache = BuildCache(cache_dir)
+            start = time.perf_counter()
+            tables = [
+                build_token_table_cached(
+                    source,
+                    PARSERS[language][1],
+                    language,
+                    args.categorizer,
+                    cache,
+                    keys,
+                )
+                for source, language, keys in sources
+            ]
+            elapsed = time.perf_counter() - start
+            rebuilt = ", ".join(
+                f"{stage} {counts[1]}"
+                for stage, counts in cache.stage_counts.items()
+                if counts[1]
+            )
+            print(f"{label:<20}{elapsed:>10.3f}  {rebuilt or '-'}")
+            ok &= [table_columns(table) for table in tables] == expected
+    finally:
+        shutil.rmtree(cache_dir)
+
+    if not ok:
+        print("\n❌ Cached token tables differ from build_token_table")
+        return 1
+
+    print("\n✅ Identical token tables in every scenario")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
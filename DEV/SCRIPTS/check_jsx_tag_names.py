@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+treetype JSX Tag-Name Check
+Compares the build-time jsx_tag_name category against the frontend's
+isJSXTagName neighbour-scanning heuristic on every token of a source corpus.
+
+Disagreements are classified from the syntax tree; any that fall outside
+the known heuristic blind spots fail the check. Heuristic-only tokens stay
+excluded (preset masks and the client apply both), so only TS generic
+arguments and code the grammar cannot parse (JSX in .ts) may appear there.
+
+Usage:
+  python DEV/SCRIPTS/check_jsx_tag_names.py [source_dir] [-v]
+"""
+
+import argparse
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "build"))
+
+from parse_json import (  # noqa: E402
+    LANGUAGE_EXTENSIONS,
+    PARSERS,
+    build_token_table,
+    iter_leaves,
+    read_source,
+    token_table_to_json,
+)
+from presets import is_jsx_tag_name  # noqa: E402
+
+DEFAULT_CORPUS = Path(__file__).resolve().parents[1] / "MISC" / "GM_01_CODE_SNIPPETS"
+
+# Syntax that the heuristic mistakes for "< name >"
+GENERIC_TYPES = {"type_arguments", "type_parameters"}
+
+
+def has_ancestor(node, types):
+    while node is not None:
+        if node.type in types:
+            return True
+        node = node.parent
+    return False
+
+
+def classify(language, tokens, idx, node, heuristic):
+    """Reason the heuristic and the tree disagree on tokens[idx] (None = unknown)"""
+    if heuristic:
+        # Still excluded: preset masks and the client apply the heuristic too
+        if node is not None and has_ancestor(node, GENERIC_TYPES):
+            return "heuristic only: generic type arguments"
+        if node is not None and has_ancestor(node, {"ERROR"}):
+            return "heuristic only: parse error (JSX in a .ts file)"
+        return None
+    if idx == 0 or tokens[idx - 1]["text"] not in ("<", "</"):
+        return "tree only: member/namespace tag name part"
+    if not any(t["text"] in (">", "/>") for t in tokens[idx + 1 :]):
+        return "tree only: tag continues on a later line"
+    return None
+
+
+def check_file(path, language, counts, examples):
+    source = read_source(path)
+    lang, parser = PARSERS[language]
+    nodes = {
+        node.start_point: node for node in iter_leaves(parser.parse(source).root_node)
+    }
+    snippet = token_table_to_json(build_token_table(source, parser, language))
+
+    for line in snippet["lines"]:
+        tokens = line["display_tokens"]
+        for idx, token in enumerate(tokens):
+            heuristic = is_jsx_tag_name(tokens, idx)
+            tagged = "jsx_tag_name" in token["categories"]
+            if heuristic == tagged:
+                if tagged:
+                    counts["agree"] += 1
+                continue
+            node = nodes.get((line["line_number"], token["start_col"]))
+            reason = classify(language, tokens, idx, node, heuristic) or "unexplained"
+            counts[reason] += 1
+            examples.setdefault(reason, []).append(
+                f"{path.name}:{line['line_number'] + 1}: {token['text']!r} in "
+                f"{line['actual_line'].strip()[:60]!r}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("corpus", nargs="?", default=DEFAULT_CORPUS, type=Path)
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="List every disagreement"
+    )
+    args = parser.parse_args()
+
+    counts = Counter()
+    examples = {}
+    files = 0
+    for path in sorted(args.corpus.rglob("*")):
+        language = LANGUAGE_EXTENSIONS.get(path.suffix)
+        if language is None:
+            continue
+        check_file(path, language, counts, examples)
+        files += 1
+
+    print(f"Files: {files} from {args.corpus}\n")
+    print(f"{'Result':<48}{'Tokens':>8}")
+    print("-" * 56)
+    for reason, count in sorted(counts.items(), key=lambda item: item[0] != "agree"):
+        print(f"{reason:<48}{count:>8}")
+        if args.verbose or reason == "unexplained":
+            for example in examples.get(reason, []):
+                print(f"    {example}")
+
+    if counts["unexplained"]:
+        print(f"\n❌ {counts['unexplained']} unexplained disagreement(s)")
+        return 1
+
+    print("\n✅ jsx_tag_name agrees with isJSXTagName except at known blind spots")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+treetype Build Cache
+Persistent manifest of parse results, used to skip unchanged sources, and of
+per-output snippet stats, used by build_metadata.py to avoid decoding snippets.
+Also stores the binary outputs of parse_json.py's pipeline stages (leaves,
+token tables, categories) under stages/, keyed by content.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = Path(".treetype_cache")
+MANIFEST_VERSION = 1
+STAGES_DIR_NAME = "stages"
+
+
+class BuildCache:
+    """
+    Manifest under a cache dir mapping each source to the key it was last
+    built with and the output it produced, plus the stats of each output
+    (size, mtime, sha256, line and typeable character counts).
+
+    Stage outputs are files named after their key, written by whichever
+    process builds them; entries list the stage keys they used, and save()
+    deletes stage files no entry refers to any more.
+
+    Workers of a parallel run each hold their own BuildCache; drain() hands
+    their new entries and hit/miss counts to the parent, which merge()s them
+    and is the only process that save()s.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, force=False):
+        self.cache_dir = Path(cache_dir)
+        self.path = self.cache_dir / "manifest.json"
+        self.force = force
+        self.entries, self.outputs = self._load()
+        self.hits = 0
+        self.misses = 0
+        # stage name -> [outputs reused, outputs rebuilt]
+        self.stage_counts = {}
+        self._updates = {}
+        self._output_updates = {}
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}, {}
+        if manifest.get("version") != MANIFEST_VERSION:
+            return {}, {}
+        return manifest.get("entries", {}), manifest.get("outputs", {})
+
+    @staticmethod
+    def _source_id(source_path):
+        return str(Path(source_path).resolve())
+
+    def is_fresh(self, source_path, key, output_path):
+        """True if source was last built with key into output_path (still present)"""
+        entry = self.entries.get(self._source_id(source_path))
+        fresh = (
+            not self.force
+            and entry is not None
+            and entry["key"] == key
+            and entry["output"] == str(Path(output_path).resolve())
+            and Path(output_path).is_file()
+        )
+        if fresh:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return fresh
+
+    def record(self, source_path, key, output_path, **extra):
+        """Remember a successful build (extra fields are stored alongside)"""
+        entry = {"key": key, "output": str(Path(output_path).resolve()), **extra}
+        source_id = self._source_id(source_path)
+        self.entries[source_id] = entry
+        self._updates[source_id] = entry
+
+    def record_output(self, output_path, sha256, **stats):
+        """Remember the stats of an output file just written"""
+        stat = Path(output_path).stat()
+        entry = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": sha256,
+            **stats,
+        }
+        output_id = self._source_id(output_path)
+        self.outputs[output_id] = entry
+        self._output_updates[output_id] = entry
+
+    def output_stats(self, output_path):
+        """
+        Recorded stats of output_path, or None if missing or out of date.
+
+        Size and mtime are checked first; when only the mtime moved (e.g. a
+        fresh checkout) the file is re-hashed and the entry kept if it matches.
+        Counts as a hit or miss like is_fresh.
+        """
+        output_id = self._source_id(output_path)
+        entry = None if self.force else self.outputs.get(output_id)
+        if entry is not None:
+            stat = Path(output_path).stat()
+            if stat.st_size != entry["size"]:
+                entry = None
+            elif stat.st_mtime_ns != entry["mtime_ns"]:
+                digest = hashlib.sha256(Path(output_path).read_bytes()).hexdigest()
+                if digest == entry["sha256"]:
+                    entry = {**entry, "mtime_ns": stat.st_mtime_ns}
+                    self.outputs[output_id] = entry
+                    self._output_updates[output_id] = entry
+                else:
+                    entry = None
+        if entry is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return entry
+
+    def _stage_path(self, stage, key):
+        return self.cache_dir / STAGES_DIR_NAME / stage / f"{key}.bin"
+
+    def _count_stage(self, stage, reused):
+        counts = self.stage_counts.setdefault(stage, [0, 0])
+        counts[0 if reused else 1] += 1
+
+    def load_stage(self, stage, key, decode):
+        """
+        Stored output of a pipeline stage, passed through decode, or None.
+        Only an output that decodes counts as reused: one that is missing or
+        makes decode raise ValueError (e.g. a damaged file) is left to be
+        rebuilt.
+        """
+        if self.force:
+            return None
+        try:
+            data = self._stage_path(stage, key).read_bytes()
+        except OSError:
+            return None
+        try:
+            value = decode(data)
+        except ValueError:
+            return None
+        self._count_stage(stage, reused=True)
+        return value
+
+    def store_stage(self, stage, key, data):
+        """Store the output of a pipeline stage (atomically: workers may race)"""
+        self._count_stage(stage, reused=False)
+        path = self._stage_path(stage, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+
+    def prune_stages(self):
+        """Delete stage outputs that no manifest entry refers to"""
+        stages_dir = self.cache_dir / STAGES_DIR_NAME
+        if not stages_dir.is_dir():
+            return 0
+        live = {
+            (stage, key)
+            for entry in self.entries.values()
+            for stage, key in entry.get("stages", {}).items()
+        }
+        removed = 0
+        for path in stages_dir.glob("*/*.bin"):
+            if (path.parent.name, path.stem) not in live:
+                path.unlink()
+                removed += 1
+        return removed
+
+    def drain(self):
+        """
+        Return and reset (new entries, hits, misses, new output stats,
+        stage reused/rebuilt counts)
+        """
+        drained = (
+            self._updates,
+            self.hits,
+            self.misses,
+            self._output_updates,
+            self.stage_counts,
+        )
+        self._updates, self.hits, self.misses = {}, 0, 0
+        self._output_updates = {}
+        self.stage_counts = {}
+        return drained
+
+    def merge(self, updates, hits, misses, output_updates, stage_counts):
+        """Fold a worker's drain() result into this cache"""
+        self.entries.update(updates)
+        self._updates.update(updates)
+        self.outputs.update(output_updates)
+        self._output_updates.update(output_updates)
+        self.hits += hits
+        self.misses += misses
+        for stage, (reused, rebuilt) in stage_counts.items():
+            counts = self.stage_counts.setdefault(stage, [0, 0])
+            counts[0] += reused
+            counts[1] += rebuilt
+
+    def save(self):
+        """Write the manifest if anything changed, then prune stage outputs"""
+        if not self._updates and not self._output_updates:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": MANIFEST_VERSION,
+                    "entries": self.entries,
+                    "outputs": self.outputs,
+                },
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+        tmp_path.replace(self.path)
+        if self._updates:
+            self.prune_stages()
+        self._updates = {}
+        self._output_updates = {}
@@ -2,13 +2,57 @@
 """
 treetype Metadata Builder
 Scans snippets/ directory and generates metadata.json index
+Uses the snippet stats parse_json.py records in the build cache; only
+snippets without up-to-date stats are scanned (optionally in parallel, and
+optionally with the bounded-memory event reader)
+Also writes a paginated index (snippets/index/) for large libraries and an
+inverted search index (snippets/search/, see search_index.py)
 """
 
-import json
+import argparse
+import codecs
+import math
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 import hashlib
 
+from build_cache import DEFAULT_CACHE_DIR, BuildCache
+from json_backend import BACKENDS as JSON_BACKENDS, ENV_VAR as JSON_BACKEND_ENV
+from json_backend import get_backend
+from json_events import CHUNK_SIZE, iter_events
+from search_index import SEARCH_DIR_NAME, write_search_index
+
+# How snippets without recorded stats are read: fully decoded with the JSON
+# backend, or streamed through json_events (flat memory, never builds char_map)
+SCANNERS = ("decode", "stream")
+
+# Paginated index: snippets/index/manifest.json plus one page file per
+# (language or "all", sort order, page)
+INDEX_DIR_NAME = "index"
+INDEX_VERSION = 1
+ALL_LANGUAGES = "all"
+DEFAULT_PAGE_SIZE = 50
+PAGE_PATH = "{language}/{sort}/{page}.json"
+
+# Library sort orders presorted into the index; ties fall back to name
+SORT_ORDERS = ("name", "difficulty", "lines", "date")
+DIFFICULTY_ORDER = {"beginner": 0, "intermediate": 1, "advanced": 2}
+
+# Per-line subtrees the stream scanner skips without building objects
+STREAM_SKIP = frozenset(
+    {
+        "token_fields",
+        "category_bits",
+        "lines.item.char_map",
+        "lines.item.token_offsets",
+        "lines.item.preset_masks",
+        "lines.item.preset_lengths",
+    }
+)
+
 
 def generate_snippet_id(filepath):
     """Generate stable ID from filepath"""
@@ -62,17 +106,162 @@ def get_snippet_name(filepath):
     return " ".join(word.capitalize() for word in words)
 
 
-def analyze_snippet(filepath):
-    """Load and analyze a snippet JSON file"""
+def snippet_stats(filepath, backend=None):
+    """Decode a snippet JSON file (schema 1 or compact schema 2) for its stats"""
+    backend = backend or get_backend()
+    with open(filepath, "rb") as f:
+        raw = f.read()
+    data = backend.loads(raw)
+    lines = data.get("lines", [])
+    return {
+        "sha256": hashlib.sha256(raw).hexdigest(),
+        "language": data.get("language", "unknown"),
+        "schema_version": data.get("schema_version", 1),
+        "lines": len(lines),
+        "typeable_chars": sum(len(line.get("typing_sequence", "")) for line in lines),
+        "identifiers": snippet_identifiers(data),
+    }
+
+
+def snippet_identifiers(data):
+    """Sorted distinct identifier token texts of a decoded snippet (any schema)"""
+    identifiers = set()
+    if data.get("schema_version", 1) == 2:
+        types = data.get("types", [])
+        for line in data.get("lines", []):
+            for token in line.get("tokens", []):
+                if types[token[1]].endswith("identifier"):
+                    identifiers.add(token[0])
+    else:
+        for line in data.get("lines", []):
+            for token in line.get("display_tokens", []):
+                if token["type"].endswith("identifier"):
+                    identifiers.add(token["text"])
+    return sorted(identifiers)
+
+
+class _HashingTextReader:
+    """Text reader over a binary file that hashes the bytes it reads"""
+
+    def __init__(self, f):
+        self.f = f
+        self.digest = hashlib.sha256()
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+
+    def read(self, size):
+        data = self.f.read(size)
+        self.digest.update(data)
+        return self.decoder.decode(data, final=not data)
+
+
+def stream_snippet_stats(filepath, chunk_size=CHUNK_SIZE):
+    """
+    snippet_stats via the event reader: memory stays at about one chunk
+    however large the file, and char_map/mask arrays are never built.
+    """
+    language = "unknown"
+    schema_version = 1
+    line_count = 0
+    typeable_chars = 0
+    types = []
+    # (text, type name) of schema 1 tokens, (text, type index) of schema 2 ones
+    tokens = set()
+    text = token_type = None
+    field = 0
+    with open(filepath, "rb") as f:
+        reader = _HashingTextReader(f)
+        for prefix, event, value in iter_events(reader, STREAM_SKIP, chunk_size):
+            if prefix == "lines.item.tokens.item":
+                if event == "start_array":
+                    field = 0
+                elif event == "end_array":
+                    tokens.add((text, token_type))
+            elif prefix == "lines.item.tokens.item.item":
+                # Compact tokens are [text, type index, ...]
+                if field == 0:
+                    text = value
+                elif field == 1:
+                    token_type = value
+                field += 1
+            elif prefix == "lines.item.display_tokens.item.text":
+                text = value
+            elif prefix == "lines.item.display_tokens.item.type":
+                token_type = value
+            elif prefix == "lines.item.display_tokens.item":
+                if event == "end_map":
+                    tokens.add((text, token_type))
+            elif prefix == "lines.item":
+                if event == "start_map":
+                    line_count += 1
+            elif prefix == "lines.item.typing_sequence":
+                typeable_chars += len(value)
+            elif prefix == "types.item":
+                types.append(value)
+            elif prefix == "language":
+                language = value
+            elif prefix == "schema_version":
+                schema_version = value
+
+    if schema_version == 2:
+        tokens = {(text, types[index]) for text, index in tokens}
+    identifiers = sorted(
+        {text for text, token_type in tokens if token_type.endswith("identifier")}
+    )
+    return {
+        "sha256": reader.digest.hexdigest(),
+        "language": language,
+        "schema_version": schema_version,
+        "lines": line_count,
+        "typeable_chars": typeable_chars,
+        "identifiers": identifiers,
+    }
+
+
+def _scan_worker(task):
+    filepath, scanner, json_backend = task
     try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        if scanner == "stream":
+            return stream_snippet_stats(filepath), None
+        return snippet_stats(filepath, get_backend(json_backend)), None
+    except Exception as e:
+        return None, str(e)
+
+
+def scan_snippets(files, scanner="decode", jobs=1, json_backend=None):
+    """
+    Yield (filepath, stats, error) for each file in order, using a process
+    pool when jobs > 1. Exactly one of stats and error is None.
+    """
+    tasks = [(filepath, scanner, json_backend) for filepath in files]
+    if jobs > 1 and len(tasks) > 1:
+        chunksize = max(1, len(tasks) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = pool.map(_scan_worker, tasks, chunksize=chunksize)
+            for filepath, (stats, error) in zip(files, results):
+                yield filepath, stats, error
+    else:
+        for task in tasks:
+            yield (task[0], *_scan_worker(task))
 
-        # Calculate stats
-        line_count = len(data.get("lines", []))
-        total_typeable_chars = sum(
-            len(line.get("typing_sequence", "")) for line in data.get("lines", [])
-        )
+
+def analyze_snippet(filepath, backend=None, cache=None, stats=None):
+    """
+    Analyze a snippet JSON file.
+
+    stats (as returned by snippet_stats) are used as given. Otherwise, with
+    a BuildCache, stats recorded at parse time are used when the file is
+    unchanged; failing that the file is decoded and its stats recorded.
+    """
+    try:
+        if stats is None and cache is not None:
+            stats = cache.output_stats(filepath)
+        if stats is None:
+            stats = snippet_stats(filepath, backend)
+            if cache is not None:
+                cache.record_output(filepath, **stats)
+
+        line_count = stats["lines"]
+        total_typeable_chars = stats["typeable_chars"]
 
         # Get file modification time
         mtime = filepath.stat().st_mtime
@@ -84,12 +273,13 @@ def analyze_snippet(filepath):
         return {
             "id": snippet_id,
             "name": get_snippet_name(filepath),
-            "language": data.get("language", "unknown"),
+            "language": stats["language"],
             "path": str(filepath),
+            "schemaVersion": stats["schema_version"],
             "lines": line_count,
             "typeable_chars": total_typeable_chars,
             "difficulty": estimate_difficulty(line_count, total_typeable_chars),
-            "tags": extract_tags(filepath, data),
+            "tags": extract_tags(filepath, stats),
             "dateAdded": date_added,
         }
     except Exception as e:
@@ -97,8 +287,102 @@ def analyze_snippet(filepath):
         return None
 
 
-def build_metadata():
-    """Scan snippets/ directory and generate metadata.json"""
+def is_snippet_file(filepath, snippets_dir):
+    """True for snippet JSON files (not metadata.json or the paginated index)"""
+    rel_parts = Path(filepath).relative_to(snippets_dir).parts
+    return rel_parts != ("metadata.json",) and rel_parts[0] not in (
+        INDEX_DIR_NAME,
+        SEARCH_DIR_NAME,
+    )
+
+
+def sort_snippets(snippets, order):
+    """
+    Sort metadata entries: name A-Z, easiest, shortest or newest first.
+
+    Every order is a stable sort of the name order, so ties keep name order.
+    metadata.json is written in name order too, which lets the library's
+    fallback (stable sorts on the same keys) match the index pages exactly.
+    """
+    by_name = sorted(snippets, key=lambda s: (s["name"].casefold(), s["id"]))
+    if order == "difficulty":
+        return sorted(by_name, key=lambda s: DIFFICULTY_ORDER.get(s["difficulty"], 3))
+    if order == "lines":
+        return sorted(by_name, key=lambda s: s["lines"])
+    if order == "date":
+        return sorted(by_name, key=lambda s: s["dateAdded"], reverse=True)
+    return by_name
+
+
+def write_metadata_index(
+    snippets, snippets_dir, generated_at, page_size=DEFAULT_PAGE_SIZE, backend=None
+):
+    """
+    Write the paginated index under <snippets_dir>/index/.
+
+    manifest.json lists every shard (ALL_LANGUAGES and each language) with
+    its snippet and page counts; each page holds up to page_size metadata
+    entries in one of SORT_ORDERS, so a client renders the first page of any
+    view after fetching the manifest and one small page. Returns the number
+    of page files written.
+    """
+    backend = backend or get_backend()
+    index_dir = Path(snippets_dir) / INDEX_DIR_NAME
+    if index_dir.exists():
+        shutil.rmtree(index_dir)
+
+    groups = {ALL_LANGUAGES: snippets}
+    for snippet in snippets:
+        groups.setdefault(snippet["language"], []).append(snippet)
+
+    shards = {}
+    page_count = 0
+    for language, group in groups.items():
+        pages = max(1, math.ceil(len(group) / page_size))
+        shards[language] = {"count": len(group), "pages": pages}
+        for order in SORT_ORDERS:
+            ordered = sort_snippets(group, order)
+            for page in range(pages):
+                path = index_dir / PAGE_PATH.format(
+                    language=language, sort=order, page=page
+                )
+                path.parent.mkdir(parents=True, exist_ok=True)
+                page_data = {
+                    "language": language,
+                    "sort": order,
+                    "page": page,
+                    "pages": pages,
+                    "snippets": ordered[page * page_size : (page + 1) * page_size],
+                }
+                path.write_bytes(backend.dumps(page_data))
+                page_count += 1
+
+    manifest = {
+        "version": INDEX_VERSION,
+        "generatedAt": generated_at,
+        "totalSnippets": len(snippets),
+        "languages": sorted(set(s["language"] for s in snippets)),
+        "pageSize": page_size,
+        "sortOrders": list(SORT_ORDERS),
+        "pagePath": f"{INDEX_DIR_NAME}/{PAGE_PATH}",
+        "shards": shards,
+    }
+    (index_dir / "manifest.json").write_bytes(backend.dumps(manifest))
+    return page_count
+
+
+def build_metadata(
+    json_backend=None,
+    cache_dir=DEFAULT_CACHE_DIR,
+    force=False,
+    scanner="decode",
+    jobs=1,
+    page_size=DEFAULT_PAGE_SIZE,
+    index_identifiers=False,
+):
+    """Scan snippets/ directory and generate metadata.json and the paginated index"""
+    backend = get_backend(json_backend)
+    cache = BuildCache(cache_dir, force=force)
 
     snippets_dir = Path("snippets")
 
@@ -111,8 +395,10 @@ def build_metadata():
     print("BUILDING METADATA INDEX")
     print(f"{'='*70}\n")
 
-    # Find all JSON files (excluding metadata.json itself)
-    json_files = [f for f in snippets_dir.rglob("*.json") if f.name != "metadata.json"]
+    # Find all JSON files (excluding metadata.json and the index itself)
+    json_files = [
+        f for f in snippets_dir.rglob("*.json") if is_snippet_file(f, snippets_dir)
+    ]
 
     if not json_files:
         print("⚠️  No snippet JSON files found in snippets/")
@@ -121,25 +407,50 @@ def build_metadata():
 
     print(f"Found {len(json_files)} snippet file(s):\n")
 
+    # Recorded stats first; scan only the snippets without them
+    json_files.sort()
+    stats = {}
+    pending = []
+    for filepath in json_files:
+        entry = cache.output_stats(filepath)
+        if entry is not None and index_identifiers and "identifiers" not in entry:
+            entry = None  # recorded before identifiers were harvested
+        if entry is None:
+            pending.append(filepath)
+        else:
+            stats[filepath] = entry
+    for filepath, entry, error in scan_snippets(pending, scanner, jobs, json_backend):
+        if error is not None:
+            print(f"⚠️  Warning: Could not process {filepath}: {error}")
+            continue
+        cache.record_output(filepath, **entry)
+        stats[filepath] = entry
+
     # Process each snippet
     snippets = []
-    for filepath in sorted(json_files):
+    for filepath in json_files:
         print(f"  Processing: {filepath.relative_to(snippets_dir)}")
-        metadata = analyze_snippet(filepath)
+        if filepath not in stats:
+            continue
+        metadata = analyze_snippet(filepath, backend, stats=stats[filepath])
         if metadata:
             snippets.append(metadata)
             print(
                 f"    ✅ {metadata['name']} ({metadata['language']}, {metadata['lines']} lines)"
             )
 
+    cache.save()
+
     if not snippets:
         print("\n❌ No valid snippets found!")
         return False
 
-    # Build metadata structure
+    # Build metadata structure (in index name order, see sort_snippets)
+    snippets = sort_snippets(snippets, "name")
+    generated_at = datetime.utcnow().isoformat() + "Z"
     metadata = {
         "version": "1.0",
-        "generatedAt": datetime.utcnow().isoformat() + "Z",
+        "generatedAt": generated_at,
         "totalSnippets": len(snippets),
         "languages": sorted(list(set(s["language"] for s in snippets))),
         "snippets": snippets,
@@ -147,15 +458,38 @@ def build_metadata():
 
     # Write metadata.json
     output_path = snippets_dir / "metadata.json"
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(metadata, f, indent=2, ensure_ascii=False)
+    with open(output_path, "wb") as f:
+        f.write(backend.dumps(metadata, pretty=True))
+    page_count = write_metadata_index(
+        snippets, snippets_dir, generated_at, page_size, backend
+    )
+    identifiers = None
+    if index_identifiers:
+        identifiers = {
+            snippet["id"]: stats[Path(snippet["path"])].get("identifiers", ())
+            for snippet in snippets
+        }
+    term_count, shard_count = write_search_index(
+        snippets, snippets_dir, identifiers, backend
+    )
 
     print(f"\n{'='*70}")
     print("✅ METADATA GENERATED SUCCESSFULLY")
     print(f"{'='*70}\n")
     print(f"Output: {output_path}")
+    print(f"Index: {snippets_dir / INDEX_DIR_NAME} ({page_count} page file(s))")
+    print(
+        f"Search: {snippets_dir / SEARCH_DIR_NAME} "
+        f"({term_count} term(s) in {shard_count} shard(s))"
+    )
     print(f"Total snippets: {len(snippets)}")
     print(f"Languages: {', '.join(metadata['languages'])}")
+    schemas = sorted(set(s["schemaVersion"] for s in snippets))
+    print(f"Snippet schemas: {', '.join(f'v{v}' for v in schemas)}")
+    print(
+        f"Stats: {len(json_files) - len(pending)} from manifest, "
+        f"{len(pending)} scanned ({scanner})"
+    )
     print(f"\nNext steps:")
     print(f"  1. Review {output_path}")
     print(f"  2. Test with local server: python -m http.server 8000")
@@ -167,5 +501,69 @@ def build_metadata():
 if __name__ == "__main__":
     import sys
 
-    success = build_metadata()
+    parser = argparse.ArgumentParser(
+        description="treetype Metadata Builder - Index snippets/ into metadata.json"
+    )
+    parser.add_argument(
+        "--json-backend",
+        choices=JSON_BACKENDS,
+        default=None,
+        help=f"JSON backend (default: ${JSON_BACKEND_ENV} or 'auto')",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        type=Path,
+        help=f"Build cache holding parse-time snippet stats (default: {DEFAULT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Decode every snippet instead of using recorded stats",
+    )
+    parser.add_argument(
+        "--scan",
+        choices=SCANNERS,
+        default="decode",
+        help=(
+            "How snippets without recorded stats are read: 'decode' (default) "
+            "or 'stream' (event reader, flat memory per worker)"
+        ),
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for scanning (default: 1, 0 = all cores)",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=DEFAULT_PAGE_SIZE,
+        help=f"Snippets per paginated index page (default: {DEFAULT_PAGE_SIZE})",
+    )
+    parser.add_argument(
+        "--identifiers",
+        action="store_true",
+        help="Add identifier tokens (recorded at parse time) to the search index",
+    )
+    args = parser.parse_args()
+    if args.page_size < 1:
+        parser.error("--page-size must be at least 1")
+    try:
+        get_backend(args.json_backend)
+    except ImportError as e:
+        parser.error(f"JSON backend unavailable: {e}")
+
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    success = build_metadata(
+        args.json_backend,
+        args.cache_dir,
+        args.force,
+        args.scan,
+        jobs,
+        args.page_size,
+        args.identifiers,
+    )
     sys.exit(0 if success else 1)
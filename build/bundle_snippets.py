@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+treetype Snippet Bundler
+Concatenates every snippet of a language into one bundle file with a header
+index, so a client can fetch a single snippet with an HTTP Range request or
+a local reader can memory-map the bundle. Run after build_metadata.py.
+
+Bundle layout (snippets/bundles/<language>.ttb):
+
+  b"TTBN"  version (1 byte)  3 reserved zero bytes
+  index length (uint32, little endian)
+  index: compact JSON
+    {"language": ..., "snippets": [{"id", "offset", "length", "sha256"}, ...]}
+  data: the snippet files, concatenated in index order
+
+Offsets are relative to the start of the data section, which begins at
+HEADER_SIZE + index length. Snippet bytes are stored exactly as on disk.
+
+Usage:
+  python build/bundle_snippets.py            # bundle snippets/ per language
+  python build/bundle_snippets.py --verify   # re-read every bundled snippet
+"""
+
+import argparse
+import hashlib
+import mmap
+import shutil
+import struct
+import sys
+from pathlib import Path
+
+from json_backend import get_backend
+
+MAGIC = b"TTBN"
+VERSION = 1
+BUNDLE_SUFFIX = ".ttb"
+HEADER = struct.Struct("<4sB3xI")
+HEADER_SIZE = HEADER.size
+COPY_CHUNK_SIZE = 1 << 20
+
+DEFAULT_SNIPPETS_DIR = Path("snippets")
+
+
+# ============================================================================
+# WRITER
+# ============================================================================
+
+
+def write_bundle(output_path, language, snippets, backend=None):
+    """
+    Write one bundle from (snippet id, file path) pairs.
+
+    Two passes over the files, so memory stays at one copy buffer: the first
+    hashes and sizes them for the index (which precedes the data), the
+    second copies them after it. Returns the index entries written.
+    """
+    backend = backend or get_backend()
+    entries = []
+    offset = 0
+    for snippet_id, path in snippets:
+        digest = hashlib.sha256()
+        length = 0
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(COPY_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                length += len(chunk)
+        entries.append(
+            {
+                "id": snippet_id,
+                "offset": offset,
+                "length": length,
+                "sha256": digest.hexdigest(),
+            }
+        )
+        offset += length
+
+    index = backend.dumps({"language": language, "snippets": entries})
+    tmp_path = Path(output_path).with_suffix(".tmp")
+    tmp_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with open(tmp_path, "wb") as out:
+            out.write(HEADER.pack(MAGIC, VERSION, len(index)))
+            out.write(index)
+            data_start = out.tell()
+            for (snippet_id, path), entry in zip(snippets, entries):
+                with open(path, "rb") as f:
+                    shutil.copyfileobj(f, out, COPY_CHUNK_SIZE)
+                if out.tell() - data_start != entry["offset"] + entry["length"]:
+                    raise ValueError(f"Snippet changed while bundling: {path}")
+        tmp_path.replace(output_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return entries
+
+
+def group_snippets(metadata, snippets_dir):
+    """Group metadata snippets by language as (id, path) pairs"""
+    groups = {}
+    for snippet in metadata["snippets"]:
+        path = Path(snippet["path"])
+        if not path.is_absolute() and path.parts[0] == DEFAULT_SNIPPETS_DIR.name:
+            path = Path(snippets_dir, *path.parts[1:])
+        groups.setdefault(snippet["language"], []).append((snippet["id"], path))
+    return groups
+
+
+# ============================================================================
+# READER
+# ============================================================================
+
+
+class SnippetBundle:
+    """Random access to the snippets of a bundle through mmap"""
+
+    def __init__(self, path, backend=None):
+        self.path = Path(path)
+        self.backend = backend or get_backend()
+        self._file = open(self.path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Empty bundle: {self.path}")
+
+        if len(self._map) < HEADER_SIZE:
+            self.close()
+            raise ValueError(f"Truncated bundle header: {self.path}")
+        magic, version, index_length = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not a treetype snippet bundle: {self.path}")
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"Unsupported bundle version: {version}")
+
+        index_end = HEADER_SIZE + index_length
+        if len(self._map) < index_end:
+            self.close()
+            raise ValueError(f"Truncated bundle index: {self.path}")
+        try:
+            index = self.backend.loads(self._map[HEADER_SIZE:index_end])
+            self.language = index["language"]
+            self.entries = {entry["id"]: entry for entry in index["snippets"]}
+        except Exception:
+            # Decode errors differ per JSON backend (msgspec's are not ValueError)
+            self.close()
+            raise ValueError(f"Invalid bundle index: {self.path}") from None
+        self.data_offset = index_end
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __contains__(self, snippet_id):
+        return snippet_id in self.entries
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def byte_range(self, snippet_id):
+        """Absolute (start, end) file offsets of a snippet, end exclusive"""
+        entry = self.entries[snippet_id]
+        start = self.data_offset + entry["offset"]
+        return start, start + entry["length"]
+
+    def read(self, snippet_id, verify=False):
+        """Raw snippet bytes; verify checks them against the index hash"""
+        start, end = self.byte_range(snippet_id)
+        data = self._map[start:end]
+        if (
+            verify
+            and hashlib.sha256(data).hexdigest() != self.entries[snippet_id]["sha256"]
+        ):
+            raise ValueError(f"Hash mismatch for {snippet_id} in {self.path}")
+        return data
+
+    def load(self, snippet_id, verify=False):
+        """Decoded snippet JSON"""
+        return self.backend.loads(self.read(snippet_id, verify))
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+
+def bundle_snippets(snippets_dir=DEFAULT_SNIPPETS_DIR, output_dir=None, backend=None):
+    """Write one bundle per language listed in <snippets_dir>/metadata.json"""
+    backend = backend or get_backend()
+    snippets_dir = Path(snippets_dir)
+    output_dir = Path(output_dir) if output_dir else snippets_dir / "bundles"
+
+    metadata_path = snippets_dir / "metadata.json"
+    if not metadata_path.is_file():
+        print(f"❌ Error: {metadata_path} not found!")
+        print("   Run python build/build_metadata.py first.")
+        return False
+
+    metadata = backend.loads(metadata_path.read_bytes())
+    groups = group_snippets(metadata, snippets_dir)
+
+    missing = [
+        path for pairs in groups.values() for _, path in pairs if not path.is_file()
+    ]
+    if missing:
+        for path in missing:
+            print(f"❌ Error: Snippet listed in metadata not found: {path}")
+        return False
+
+    print(f"\n{'='*70}")
+    print("BUNDLING SNIPPETS")
+    print(f"{'='*70}\n")
+    print(f"{'Language':<14}{'Snippets':>10}{'Bundle bytes':>16}  Output")
+    print("-" * 70)
+    for language in sorted(groups):
+        output_path = output_dir / f"{language}{BUNDLE_SUFFIX}"
+        entries = write_bundle(output_path, language, groups[language], backend)
+        size = output_path.stat().st_size
+        print(f"{language:<14}{len(entries):>10}{size:>16,}  {output_path}")
+
+    print(f"\n✅ Wrote {len(groups)} bundle(s) to {output_dir}")
+    return True
+
+
+def verify_bundles(snippets_dir=DEFAULT_SNIPPETS_DIR, output_dir=None, backend=None):
+    """Check every bundled snippet matches its hash and its source file"""
+    backend = backend or get_backend()
+    snippets_dir = Path(snippets_dir)
+    output_dir = Path(output_dir) if output_dir else snippets_dir / "bundles"
+    metadata = backend.loads((snippets_dir / "metadata.json").read_bytes())
+
+    failures = 0
+    checked = 0
+    for language, pairs in sorted(group_snippets(metadata, snippets_dir).items()):
+        with SnippetBundle(
+            output_dir / f"{language}{BUNDLE_SUFFIX}", backend
+        ) as bundle:
+            for snippet_id, path in pairs:
+                checked += 1
+                if (
+                    snippet_id not in bundle
+                    or bundle.read(snippet_id, verify=True) != path.read_bytes()
+                ):
+                    failures += 1
+                    print(f"❌ Bundle mismatch: {snippet_id} ({language})")
+
+    if failures:
+        print(f"\n❌ {failures}/{checked} bundled snippet(s) differ")
+        return False
+    print(f"✅ Verified {checked} bundled snippet(s)")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="treetype Snippet Bundler - One range-readable file per language"
+    )
+    parser.add_argument(
+        "--snippets-dir",
+        default=DEFAULT_SNIPPETS_DIR,
+        type=Path,
+        help="Directory containing metadata.json (default: snippets)",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        help="Bundle directory (default: <snippets-dir>/bundles)",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Check existing bundles against the snippet files instead of writing",
+    )
+    args = parser.parse_args()
+
+    if args.verify:
+        success = verify_bundles(args.snippets_dir, args.output_dir)
+    else:
+        success = bundle_snippets(args.snippets_dir, args.output_dir)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+treetype Snippet Compressor
+Writes precompressed .gz (and .br when the brotli module is installed) next
+to every snippet JSON file, metadata.json and the index/search files, across
+a process pool, removes outputs whose JSON is gone, and prints a
+per-language raw vs compressed size table.
+
+Usage:
+  python build/compress_snippets.py              # compress snippets/
+  python build/compress_snippets.py --jobs 0     # all cores
+  python build/compress_snippets.py --force      # recompress everything
+"""
+
+import argparse
+import gzip
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from build_metadata import is_snippet_file
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_SNIPPETS_DIR = Path("snippets")
+
+# Row label for metadata.json and the index/ and search/ files
+INDEX_LABEL = "(index)"
+
+# Every suffix compress_file may have written (brotli or not)
+OUTPUT_SUFFIXES = (".gz", ".br")
+
+
+def gzip_bytes(data):
+    # mtime=0 keeps the output reproducible between builds
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def brotli_bytes(data):
+    return brotli.compress(data, quality=11)
+
+
+def encoders():
+    """(suffix, compress function) for every available encoding"""
+    available = [(".gz", gzip_bytes)]
+    if brotli is not None:
+        available.append((".br", brotli_bytes))
+    return available
+
+
+def is_up_to_date(source, target):
+    return target.is_file() and target.stat().st_mtime >= source.stat().st_mtime
+
+
+def compress_file(path, force=False):
+    """
+    Write each compressed variant of path that is missing or stale.
+
+    Returns (raw size, {suffix: compressed size}, number of variants written).
+    """
+    path = Path(path)
+    data = None
+    sizes = {}
+    written = 0
+    for suffix, compress in encoders():
+        target = path.with_name(path.name + suffix)
+        if not force and is_up_to_date(path, target):
+            sizes[suffix] = target.stat().st_size
+            continue
+        if data is None:
+            data = path.read_bytes()
+        compressed = compress(data)
+        tmp_path = target.with_name(target.name + ".tmp")
+        tmp_path.write_bytes(compressed)
+        tmp_path.replace(target)
+        sizes[suffix] = len(compressed)
+        written += 1
+    return path.stat().st_size, sizes, written
+
+
+def _compress_file_worker(args):
+    return compress_file(*args)
+
+
+def find_assets(snippets_dir):
+    """Snippet JSON files and metadata.json (never the .gz/.br outputs)"""
+    return sorted(Path(snippets_dir).rglob("*.json"))
+
+
+def language_of(path, snippets_dir):
+    if not is_snippet_file(path, snippets_dir):
+        return INDEX_LABEL
+    return Path(path).relative_to(snippets_dir).parts[0]
+
+
+def remove_stale_outputs(snippets_dir):
+    """Delete .gz/.br files whose JSON source no longer exists; returns them"""
+    stale = []
+    for suffix in OUTPUT_SUFFIXES:
+        for target in Path(snippets_dir).rglob(f"*.json{suffix}"):
+            if not target.with_name(target.name[: -len(suffix)]).is_file():
+                target.unlink()
+                stale.append(target)
+    return sorted(stale)
+
+
+def print_size_table(totals, suffixes):
+    header = f"{'Language':<14}{'Files':>7}{'Raw bytes':>14}"
+    for suffix in suffixes:
+        header += f"{suffix + ' bytes':>14}{'ratio':>8}"
+    print(header)
+    print("-" * len(header))
+
+    grand = {"files": 0, "raw": 0, **{suffix: 0 for suffix in suffixes}}
+    rows = sorted(totals.items(), key=lambda item: (item[0] == INDEX_LABEL, item[0]))
+    for label, row in rows + [("total", grand)]:
+        line = f"{label:<14}{row['files']:>7}{row['raw']:>14,}"
+        for suffix in suffixes:
+            ratio = row["raw"] / row[suffix] if row[suffix] else 0
+            line += f"{row[suffix]:>14,}{ratio:>7.1f}x"
+        if label == "total":
+            print("-" * len(header))
+        print(line)
+        if row is not grand:
+            for key in grand:
+                grand[key] += row[key]
+
+
+def compress_snippets(snippets_dir=DEFAULT_SNIPPETS_DIR, jobs=1, force=False):
+    """Compress every asset under snippets_dir and print the size table"""
+    snippets_dir = Path(snippets_dir)
+    if not snippets_dir.exists():
+        print(f"❌ Error: {snippets_dir} directory not found!")
+        return False
+
+    files = find_assets(snippets_dir)
+    if not files:
+        print(f"⚠️  No JSON files found in {snippets_dir}")
+        return False
+
+    suffixes = [suffix for suffix, _ in encoders()]
+    print(f"\n{'='*70}")
+    print(f"PRECOMPRESSING ASSETS ({', '.join(suffixes)})")
+    print(f"{'='*70}\n")
+    if brotli is None:
+        print("⚠️  brotli module not installed; skipping .br (pip install brotli)\n")
+
+    tasks = [(path, force) for path in files]
+    if jobs > 1 and len(files) > 1:
+        chunksize = max(1, len(files) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_compress_file_worker, tasks, chunksize=chunksize))
+    else:
+        results = [_compress_file_worker(task) for task in tasks]
+
+    totals = {}
+    written = 0
+    for path, (raw_size, sizes, count) in zip(files, results):
+        row = totals.setdefault(
+            language_of(path, snippets_dir),
+            {"files": 0, "raw": 0, **{suffix: 0 for suffix in suffixes}},
+        )
+        row["files"] += 1
+        row["raw"] += raw_size
+        for suffix in suffixes:
+            row[suffix] += sizes[suffix]
+        written += count
+
+    stale = remove_stale_outputs(snippets_dir)
+
+    print_size_table(totals, suffixes)
+    skipped = len(files) * len(suffixes) - written
+    print(f"\n✅ Wrote {written} compressed file(s), {skipped} already up to date")
+    if stale:
+        print(f"   Removed {len(stale)} stale compressed file(s)")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="treetype Snippet Compressor - Precompressed .gz/.br assets"
+    )
+    parser.add_argument(
+        "snippets_dir",
+        nargs="?",
+        default=DEFAULT_SNIPPETS_DIR,
+        type=Path,
+        help="Directory to compress (default: snippets)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes (default: 1, 0 = all cores)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Recompress files even if their compressed output is up to date",
+    )
+    args = parser.parse_args()
+
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    success = compress_snippets(args.snippets_dir, jobs, args.force)
+    sys.exit(0 if success else 1)
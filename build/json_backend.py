@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+treetype JSON Backend
+Pluggable JSON encode/decode: orjson or msgspec when installed, stdlib json otherwise
+"""
+
+import json
+import os
+
+# Backend names selectable via --json-backend / TREETYPE_JSON_BACKEND
+BACKENDS = ("auto", "orjson", "msgspec", "stdlib")
+ENV_VAR = "TREETYPE_JSON_BACKEND"
+
+# Order tried by "auto"
+PREFERRED = ("orjson", "msgspec", "stdlib")
+
+
+class JsonBackend:
+    """
+    dumps() returns UTF-8 bytes and loads() accepts bytes or str.
+
+    Every backend writes the same bytes as the stdlib reference, i.e.
+    json.dumps(obj, ensure_ascii=False) with separators=(",", ":") when
+    compact, or indent=2 when pretty.
+    """
+
+    name = "stdlib"
+
+    def dumps(self, obj, pretty=False):
+        if pretty:
+            return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode(
+            "utf-8"
+        )
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class OrjsonBackend(JsonBackend):
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self._dumps = orjson.dumps
+        self._loads = orjson.loads
+        self._indent = orjson.OPT_INDENT_2
+
+    def dumps(self, obj, pretty=False):
+        return self._dumps(obj, option=self._indent if pretty else 0)
+
+    def loads(self, data):
+        return self._loads(data)
+
+
+class MsgspecBackend(JsonBackend):
+    """msgspec for compact output and reading; pretty output goes through stdlib"""
+
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec
+
+        self._encode = msgspec.json.Encoder().encode
+        self._decode = msgspec.json.Decoder().decode
+
+    def dumps(self, obj, pretty=False):
+        if pretty:
+            return super().dumps(obj, pretty=True)
+        return self._encode(obj)
+
+    def loads(self, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        return self._decode(data)
+
+
+_FACTORIES = {
+    "orjson": OrjsonBackend,
+    "msgspec": MsgspecBackend,
+    "stdlib": JsonBackend,
+}
+_BACKENDS = {}
+
+
+def get_backend(name=None):
+    """
+    Return the named backend (cached).
+
+    name None falls back to $TREETYPE_JSON_BACKEND, then "auto", which picks
+    the first importable of orjson, msgspec, stdlib. Naming a backend that
+    is not installed raises ImportError.
+    """
+    name = name or os.environ.get(ENV_VAR) or "auto"
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown JSON backend: {name} (choose from {BACKENDS})")
+
+    backend = _BACKENDS.get(name)
+    if backend is None:
+        if name == "auto":
+            for candidate in PREFERRED:
+                try:
+                    backend = get_backend(candidate)
+                    break
+                except ImportError:
+                    continue
+        else:
+            backend = _FACTORIES[name]()
+        _BACKENDS[name] = backend
+    return backend
+
+
+def available_backends():
+    """Names of the concrete backends importable here"""
+    names = []
+    for name in PREFERRED:
+        try:
+            get_backend(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
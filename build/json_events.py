@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+treetype JSON Events
+Incremental, event-based JSON reader: reads a file in fixed-size chunks and
+yields ijson-style (prefix, event, value) tuples, so large snippets can be
+scanned in bounded memory. Subtrees that are not needed (e.g. char_map) can
+be skipped without producing events or Python objects.
+"""
+
+import re
+from json.decoder import JSONDecodeError, scanstring
+
+CHUNK_SIZE = 1 << 16
+
+# Next token after optional whitespace: punctuation, string start, number or literal
+_TOKEN = re.compile(
+    r"[ \t\n\r]*(?:([{}\[\],:])|(\")|(-?(?:0|[1-9]\d*)(\.\d+)?([eE][-+]?\d+)?)"
+    r"|(true|false|null))"
+)
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_CHARS = re.compile(r"[-+.eE\d]*")
+
+# Everything up to the next bracket, stepping over whole strings
+_SKIP = re.compile(r'(?:[^"\[\]{}]+|"(?:[^"\\]|\\.)*")*')
+
+_LITERALS = {
+    "true": ("boolean", True),
+    "false": ("boolean", False),
+    "null": ("null", None),
+}
+
+
+class _Buffer:
+    """Sliding text window over a file"""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def refill(self):
+        """Read another chunk, dropping consumed text; False at end of file"""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.text = self.text[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def error(self, message):
+        return JSONDecodeError(message, self.text, self.pos)
+
+
+def _next_token(buf):
+    """Return (kind, value) of the next token; kind None at end of input"""
+    while True:
+        text = buf.text
+        match = _TOKEN.match(text, buf.pos)
+        # A token touching the end of the window may continue in the next chunk
+        # (for numbers, "1" may be the start of "1.5e3")
+        if match is None or (
+            not match.group(1)
+            and (
+                match.end() == len(text)
+                or match.group(3)
+                and _NUMBER_CHARS.match(text, match.end()).end() == len(text)
+            )
+        ):
+            if buf.refill():
+                continue
+            if match is None:
+                buf.pos = _WHITESPACE.match(text, buf.pos).end()
+                if buf.pos == len(text):
+                    return None, None
+                raise buf.error("Expecting value")
+
+        punct, quote, number, fraction, exponent, literal = match.groups()
+        if punct:
+            buf.pos = match.end()
+            return punct, None
+        if quote:
+            try:
+                value, end = scanstring(text, match.end())
+            except JSONDecodeError:
+                buf.pos = match.start(2)
+                if buf.refill():
+                    continue
+                raise
+            buf.pos = end
+            return "string", value
+        buf.pos = match.end()
+        if number:
+            if fraction or exponent:
+                return "number", float(number)
+            return "number", int(number)
+        return _LITERALS[literal]
+
+
+def _skip_value(buf, first):
+    """Skip the rest of a container whose opening bracket was just read"""
+    depth = 1
+    while depth:
+        text = buf.text
+        pos = _SKIP.match(text, buf.pos).end()
+        if pos == len(text) or text[pos] == '"':
+            # Window ends inside the run (possibly mid-string): read more
+            buf.pos = pos
+            if not buf.refill():
+                raise buf.error(f"Unterminated value opened with {first!r}")
+            continue
+        depth += 1 if text[pos] in "[{" else -1
+        buf.pos = pos + 1
+
+
+def iter_events(f, skip=(), chunk_size=CHUNK_SIZE):
+    """
+    Yield (prefix, event, value) for the JSON document in text file f.
+
+    Events and prefixes follow ijson.parse: start_map, map_key, end_map,
+    start_array, end_array, string, number, boolean, null; array items have
+    prefix "<array prefix>.item". Objects and arrays whose prefix is in skip
+    yield nothing at all.
+    """
+    buf = _Buffer(f, chunk_size)
+    buf.refill()
+    # One [prefix, is_map] frame per open container
+    stack = []
+    prefix = ""
+    kind, value = _next_token(buf)
+
+    while True:
+        if kind is None:
+            if stack:
+                raise buf.error("Unexpected end of document")
+            return
+
+        if kind in "{[":
+            if prefix in skip:
+                _skip_value(buf, kind)
+            elif kind == "{":
+                yield prefix, "start_map", None
+                stack.append([prefix, True])
+                kind, value = _next_token(buf)
+                if kind == "}":
+                    stack.pop()
+                    yield prefix, "end_map", None
+                elif kind == "string":
+                    yield prefix, "map_key", value
+                    if _next_token(buf)[0] != ":":
+                        raise buf.error("Expecting ':' delimiter")
+                    prefix = f"{prefix}.{value}" if prefix else value
+                    kind, value = _next_token(buf)
+                    continue
+                else:
+                    raise buf.error("Expecting property name")
+            else:
+                yield prefix, "start_array", None
+                stack.append([prefix, False])
+                prefix = f"{prefix}.item" if prefix else "item"
+                kind, value = _next_token(buf)
+                if kind == "]":
+                    prefix = stack.pop()[0]
+                    yield prefix, "end_array", None
+                else:
+                    continue
+        elif kind in ("string", "number", "boolean", "null"):
+            yield prefix, kind, value
+        else:
+            raise buf.error(f"Unexpected {kind!r}")
+
+        # After a complete value: close containers or move to the next item/key
+        while stack:
+            container_prefix, is_map = stack[-1]
+            kind, value = _next_token(buf)
+            if kind == ",":
+                if is_map:
+                    key_kind, key = _next_token(buf)
+                    if key_kind != "string":
+                        raise buf.error("Expecting property name")
+                    yield container_prefix, "map_key", key
+                    if _next_token(buf)[0] != ":":
+                        raise buf.error("Expecting ':' delimiter")
+                    prefix = f"{container_prefix}.{key}" if container_prefix else key
+                else:
+                    prefix = f"{container_prefix}.item" if container_prefix else "item"
+                kind, value = _next_token(buf)
+                break
+            if kind == ("}" if is_map else "]"):
+                stack.pop()
+                yield container_prefix, "end_map" if is_map else "end_array", None
+                continue
+            raise buf.error("Expecting ',' delimiter")
+        else:
+            kind, value = _next_token(buf)
+            if kind is not None:
+                raise buf.error("Extra data")
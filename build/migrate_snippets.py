@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""
+treetype Snippet Migration
+Re-categorizes and re-emits existing snippet JSON without its source code:
+the categorization, typeability and JSX-splitting rules of parse_json.py are
+re-applied to each line's stored display tokens, and the snippet is
+rewritten in a target schema. Every output is decoded back and checked
+against the input (lines, token text and positions, tree-only categories)
+before it replaces anything.
+
+Categories that only a syntax tree can tell (keyword, identifier and
+jsx_tag_name) are carried over from the stored tokens; all others are
+recomputed by categorize_token. JSX snippets built before jsx_tag_name
+existed get it rebuilt from the token stream (legacy_jsx_tag_names).
+
+Usage:
+  python build/migrate_snippets.py public/ --schema 2            # in place
+  python build/migrate_snippets.py public/ --schema 2 -o migrated/ -j 4
+  python build/migrate_snippets.py public/ --dry-run             # report only
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+
+from build_metadata import is_snippet_file
+from json_backend import BACKENDS as JSON_BACKENDS, get_backend
+from parse_json import (
+    JSX_LANGUAGES,
+    SCHEMAS,
+    TOKEN_FIELDS,
+    build_line_json,
+    categorize_token,
+    decode_snippet,
+    is_non_typeable,
+    snippet_json,
+    split_jsx_text_token,
+    write_snippet_stream,
+)
+from token_table import (
+    IDENTIFIER,
+    JSX_TAG_NAME,
+    KEYWORD,
+    categories_to_mask,
+    mask_to_categories,
+)
+
+# Category bits decided by the syntax tree, not by a token's type and text
+TREE_CATEGORY_BITS = KEYWORD | IDENTIFIER | JSX_TAG_NAME
+
+# Token types of the named leaves in a JSX element name (<a.b>, <svg:rect>)
+JSX_NAME_TYPES = {"identifier", "type_identifier", "property_identifier"}
+JSX_NAME_SEPARATORS = {".", ":"}
+
+
+# ============================================================================
+# MIGRATION
+# ============================================================================
+
+
+def iter_stored_lines(json_data):
+    """Yield (line, display tokens) of a snippet of any schema, in line order"""
+    if json_data.get("schema_version", 1) == 1:
+        for line in json_data["lines"]:
+            yield line, line["display_tokens"]
+        return
+
+    types = json_data["types"]
+    for line in json_data["lines"]:
+        tokens = []
+        for values in line["tokens"]:
+            token = dict(zip(TOKEN_FIELDS, values))
+            token["type"] = types[token["type"]]
+            token["categories"] = mask_to_categories(token["categories"])
+            token["base_typeable"] = bool(token["base_typeable"])
+            tokens.append(token)
+        yield line, tokens
+
+
+def legacy_jsx_tag_names(token_lines):
+    """
+    Positions (line index, token index) of JSX element names in a snippet
+    stored without the jsx_tag_name category.
+
+    Stands in for the syntax tree: a name after < or </ whose element is
+    closed by > or /> before the next <, on this or a later line. Unlike
+    the client's isJSXTagName, it takes every part of a member or namespace
+    name and follows tags onto later lines, and it skips < right after a
+    name (Promise<User>), which is generic syntax rather than an element.
+    """
+    stream = [
+        (line_idx, idx, token)
+        for line_idx, tokens in enumerate(token_lines)
+        for idx, token in enumerate(tokens)
+    ]
+    tag_names = set()
+    for pos, (_, _, token) in enumerate(stream):
+        if token["text"] not in ("<", "</"):
+            continue
+        if pos > 0:
+            _, _, before = stream[pos - 1]
+            if (
+                before["type"] in JSX_NAME_TYPES
+                and stream[pos - 1][0] == stream[pos][0]
+                and before["end_col"] == token["start_col"]
+            ):
+                continue  # Type arguments: Promise<User>
+
+        name = []
+        end = pos + 1
+        while end < len(stream) and stream[end][2]["type"] in JSX_NAME_TYPES:
+            name.append(stream[end][:2])
+            if end + 1 < len(stream) and (
+                stream[end + 1][2]["text"] in JSX_NAME_SEPARATORS
+            ):
+                end += 2
+            else:
+                end += 1
+                break
+        if not name:
+            continue
+
+        for _, _, following in stream[end:]:
+            if following["text"] in (">", "/>"):
+                tag_names.update(name)
+                break
+            if following["text"] == "<":
+                break
+    return tag_names
+
+
+def migrate_token(token, line_number, split_jsx):
+    """
+    Re-apply the parse-time rules to one stored display token.
+
+    Returns the list of tokens it becomes (jsx_text with surrounding
+    whitespace is split, as parse_json.py does since the JSX fix).
+    """
+    token_type = token["type"]
+    text = token["text"]
+    if token_type == "jsx_text_whitespace":
+        # Split-off whitespace is neither categorized nor typeable
+        return [{**token, "categories": [], "base_typeable": False}]
+
+    mask = categories_to_mask(categorize_token(token_type, text))
+    mask |= categories_to_mask(token["categories"]) & TREE_CATEGORY_BITS
+    categories = mask_to_categories(mask)
+
+    if not (split_jsx and token_type == "jsx_text"):
+        return [
+            {
+                **token,
+                "categories": categories,
+                "base_typeable": not is_non_typeable(token_type, text),
+            }
+        ]
+
+    row = {
+        "START_ROW": line_number,
+        "START_COL": token["start_col"],
+        "END_ROW": line_number,
+        "END_COL": token["end_col"],
+        "TEXT": text,
+        "TYPE": token_type,
+        "BASE_TYPEABLE": not is_non_typeable(token_type, text),
+        "CATEGORIES": categories,
+        "INDENT_LEVEL": token["start_col"] // 4,
+    }
+    return [
+        {
+            "text": piece["TEXT"],
+            "type": piece["TYPE"],
+            "categories": piece["CATEGORIES"],
+            "base_typeable": piece["BASE_TYPEABLE"],
+            "start_col": piece["START_COL"],
+            "end_col": piece["END_COL"],
+        }
+        for piece in split_jsx_text_token(row)
+    ]
+
+
+def rejoin_jsx_text(tokens):
+    """
+    Yield (token, stored tokens) with split jsx_text pieces joined back up.
+
+    A jsx_text token with jsx_text_whitespace pieces touching either side is
+    one split leaf; rejoining lets migrate_token categorize and split the
+    leaf's full text, exactly as parse_json.py does.
+    """
+    idx = 0
+    while idx < len(tokens):
+        token = tokens[idx]
+        first = last = idx
+        if token["type"] == "jsx_text_whitespace" and idx + 1 < len(tokens):
+            following = tokens[idx + 1]
+            if (
+                following["type"] == "jsx_text"
+                and following["start_col"] == token["end_col"]
+            ):
+                last = idx + 1
+        if tokens[last]["type"] == "jsx_text" and last + 1 < len(tokens):
+            following = tokens[last + 1]
+            if (
+                following["type"] == "jsx_text_whitespace"
+                and following["start_col"] == tokens[last]["end_col"]
+            ):
+                last += 1
+
+        group = tokens[first : last + 1]
+        if len(group) > 1:
+            content = next(t for t in group if t["type"] == "jsx_text")
+            token = {
+                **content,
+                "text": "".join(t["text"] for t in group),
+                "start_col": group[0]["start_col"],
+                "end_col": group[-1]["end_col"],
+            }
+        yield token, group
+        idx = last + 1
+
+
+def migrate_snippet(json_data):
+    """
+    Re-categorize a decoded snippet.
+
+    Returns (language, [(line_number, indent_level, actual_line, tokens)],
+    number of stored tokens whose output changed).
+    """
+    language = json_data["language"]
+    split_jsx = language in JSX_LANGUAGES
+    stored_lines = list(iter_stored_lines(json_data))
+    tag_names = set()
+    if split_jsx and not any(
+        "jsx_tag_name" in token["categories"]
+        for _, tokens in stored_lines
+        for token in tokens
+    ):
+        tag_names = legacy_jsx_tag_names([tokens for _, tokens in stored_lines])
+
+    lines = []
+    changed = 0
+    for line_idx, (line, stored_tokens) in enumerate(stored_lines):
+        if split_jsx:
+            groups = rejoin_jsx_text(stored_tokens)
+        else:
+            groups = ((token, [token]) for token in stored_tokens)
+        tokens = []
+        idx = 0
+        for token, stored in groups:
+            if (line_idx, idx) in tag_names:
+                token = {**token, "categories": token["categories"] + ["jsx_tag_name"]}
+            idx += len(stored)
+            migrated = migrate_token(token, line["line_number"], split_jsx)
+            if migrated != stored:
+                changed += len(stored)
+            tokens.extend(migrated)
+        lines.append(
+            (line["line_number"], line["indent_level"], line["actual_line"], tokens)
+        )
+    return language, lines, changed
+
+
+def preserved_mismatch(stored_data, migrated_data):
+    """
+    First difference between a stored snippet and its migration (both
+    decoded, any schema) in what migration must keep, or None.
+
+    Per line: number, indent, source text and the token texts in order;
+    every stored token boundary (splitting jsx_text only adds boundaries)
+    and every category only the syntax tree decides (legacy snippets may
+    gain jsx_tag_name, never lose one).
+    """
+    stored_lines = list(iter_stored_lines(stored_data))
+    migrated_lines = list(iter_stored_lines(migrated_data))
+    if stored_data["language"] != migrated_data["language"]:
+        return "language changed"
+    if len(stored_lines) != len(migrated_lines):
+        return f"{len(stored_lines)} lines became {len(migrated_lines)}"
+
+    for (line, tokens), (new_line, new_tokens) in zip(stored_lines, migrated_lines):
+        number = line["line_number"]
+        for field in ("line_number", "indent_level", "actual_line"):
+            if line[field] != new_line[field]:
+                return f"line {number}: {field} changed"
+        if "".join(t["text"] for t in tokens) != "".join(t["text"] for t in new_tokens):
+            return f"line {number}: token text changed"
+
+        boundaries = set()
+        tree_bits = {}
+        for token in new_tokens:
+            boundaries.update((token["start_col"], token["end_col"]))
+            col = token["start_col"]
+            tree_bits[col] = tree_bits.get(col, 0) | (
+                categories_to_mask(token["categories"]) & TREE_CATEGORY_BITS
+            )
+        for token in tokens:
+            col = token["start_col"]
+            if col not in boundaries or token["end_col"] not in boundaries:
+                return f"line {number}: token {token['text']!r} at column {col} moved"
+            bits = categories_to_mask(token["categories"]) & TREE_CATEGORY_BITS
+            if bits & ~tree_bits.get(col, 0):
+                return f"line {number}: token {token['text']!r} lost a tree category"
+    return None
+
+
+def emit_snippet(language, lines, schema, backend):
+    """
+    Serialize migrated lines in the target schema.
+
+    Returns (output bytes, round_trip_ok): round_trip_ok when the output
+    decodes back to the schema 1 snippet the migrated tokens describe (a
+    serializer check; preserved_mismatch checks the migration itself).
+    """
+    expected_lines = [
+        build_line_json(number, indent, tokens, actual_line)
+        for number, indent, actual_line, tokens in lines
+    ]
+    if schema == 2:
+        out_lines = (
+            build_line_json(number, indent, tokens, actual_line, 2)
+            for number, indent, actual_line, tokens in lines
+        )
+    else:
+        out_lines = expected_lines
+
+    f = io.BytesIO()
+    write_snippet_stream(f, language, len(lines), out_lines, schema, backend)
+    data = f.getvalue()
+
+    expected = snippet_json(language, expected_lines)
+    round_trip_ok = decode_snippet(backend.loads(data)) == expected
+    return data, round_trip_ok
+
+
+def migrate_file(input_path, output_path, schema, json_backend=None, dry_run=False):
+    """
+    Migrate one snippet file.
+
+    Returns (bytes in, bytes out, tokens changed, status) where status is
+    "rewritten", "unchanged" (output identical to the existing file),
+    "round trip failed", "verify failed: <first difference from the
+    input>" or an error message. Nothing is written on failure or with
+    dry_run.
+    """
+    backend = get_backend(json_backend)
+    raw = Path(input_path).read_bytes()
+    try:
+        json_data = backend.loads(raw)
+        language, lines, changed = migrate_snippet(json_data)
+        data, round_trip_ok = emit_snippet(language, lines, schema, backend)
+        mismatch = preserved_mismatch(json_data, backend.loads(data))
+    except (KeyError, TypeError, ValueError) as e:
+        return len(raw), 0, 0, f"{type(e).__name__}: {e}"
+    if not round_trip_ok:
+        return len(raw), len(data), changed, "round trip failed"
+    if mismatch is not None:
+        return len(raw), len(data), changed, f"verify failed: {mismatch}"
+
+    output_path = Path(output_path)
+    if output_path.is_file() and output_path.read_bytes() == data:
+        return len(raw), len(data), changed, "unchanged"
+    if not dry_run:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = output_path.with_name(f"{output_path.name}.tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(output_path)
+    return len(raw), len(data), changed, "rewritten"
+
+
+def _migrate_worker(paths, schema, json_backend, dry_run):
+    return migrate_file(*paths, schema, json_backend, dry_run)
+
+
+def iter_snippet_files(paths, output_dir=None):
+    """Yield (input, output) paths for snippet files and directories"""
+    for path in map(Path, paths):
+        if path.is_dir():
+            for filepath in sorted(path.rglob("*.json")):
+                if is_snippet_file(filepath, path):
+                    relative = filepath.relative_to(path)
+                    yield filepath, (output_dir or path) / relative
+        elif path.is_file():
+            yield path, (output_dir or path.parent) / path.name
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="treetype Snippet Migration - Re-categorize and re-emit snippet JSON"
+    )
+    parser.add_argument("paths", nargs="+", help="Snippet JSON files or directories")
+    parser.add_argument(
+        "--schema",
+        type=int,
+        choices=SCHEMAS,
+        default=2,
+        help="Target schema (default: 2)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        type=Path,
+        help="Write migrated files here, mirroring each input directory "
+        "(default: rewrite in place)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes (default: 1, 0 = all cores)",
+    )
+    parser.add_argument(
+        "--json-backend",
+        choices=JSON_BACKENDS,
+        help="JSON encoder/decoder (default: auto)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Migrate and verify, but write nothing",
+    )
+    args = parser.parse_args()
+
+    try:
+        get_backend(args.json_backend)
+    except (ImportError, ValueError) as e:
+        parser.error(f"JSON backend unavailable: {e}")
+
+    files = list(iter_snippet_files(args.paths, args.output_dir))
+    if not files:
+        print("❌ Error: No snippet JSON files found")
+        return 1
+
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    worker_args = (repeat(args.schema), repeat(args.json_backend), repeat(args.dry_run))
+    start = time.perf_counter()
+    if jobs > 1 and len(files) > 1:
+        chunksize = max(1, len(files) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(
+                pool.map(_migrate_worker, files, *worker_args, chunksize=chunksize)
+            )
+    else:
+        results = list(map(_migrate_worker, files, *worker_args))
+    elapsed = time.perf_counter() - start
+
+    bytes_in = bytes_out = tokens_changed = 0
+    statuses = {}
+    failed = 0
+    for (input_path, _), (size_in, size_out, changed, status) in zip(files, results):
+        if status not in ("rewritten", "unchanged"):
+            print(f"❌ {input_path}: {status}")
+            failed += 1
+            continue
+        bytes_in += size_in
+        bytes_out += size_out
+        tokens_changed += changed
+        statuses[status] = statuses.get(status, 0) + 1
+
+    migrated = len(files) - failed
+    saved = bytes_in - bytes_out
+    rate = bytes_in / 1e6 / elapsed if elapsed else 0.0
+    files_rate = migrated / elapsed if elapsed else 0.0
+    print(f"\n{'='*70}")
+    verb = "Would rewrite" if args.dry_run else "Rewrote"
+    print(f"✅ Migrated {migrated}/{len(files)} file(s) to schema {args.schema}")
+    rewritten, unchanged = statuses.get("rewritten", 0), statuses.get("unchanged", 0)
+    print(f"   {verb} {rewritten}, unchanged {unchanged}")
+    print(f"   Tokens re-categorized or split: {tokens_changed}")
+    print(
+        f"   Size: {bytes_in / 1e6:.2f} MB -> {bytes_out / 1e6:.2f} MB "
+        f"({saved / 1e6:+.2f} MB saved, {100 * saved / max(bytes_in, 1):.1f}%)"
+    )
+    print(
+        f"   Throughput: {files_rate:.1f} files/s, {rate:.1f} MB/s "
+        f"({elapsed:.2f}s, {jobs} job(s))"
+    )
+    print(f"{'='*70}")
+    if rewritten and not args.dry_run:
+        print("\nNext steps:")
+        print("  1. Run: python build/build_metadata.py")
+        print("  2. Re-run compress_snippets.py / bundle_snippets.py if you ship them")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
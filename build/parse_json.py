@@ -2,35 +2,198 @@
 """
 treetype Parser - Refactored for Phase 6
 Converts source code files to treetype JSON format
-Supports: Python, JavaScript, TypeScript, TSX
+Supports: Python, JavaScript, TypeScript, TSX (+ entry-point plugins)
 """
 
-import tree_sitter_python as tspython
-import tree_sitter_javascript as tsjavascript
-from tree_sitter_typescript import language_typescript, language_tsx
-from tree_sitter import Language, Parser
-import pandas as pd
+import time
+
+_IMPORT_START = time.perf_counter()
+
+from tree_sitter import Language, Parser, Query, QueryCursor
 import json
 from pathlib import Path
 import argparse
+import hashlib
+import io
+import os
 import sys
+from collections.abc import Mapping
+from contextlib import redirect_stdout
+from itertools import groupby, repeat
+
+import presets
+import snippet_pack
+import token_table
+from build_cache import DEFAULT_CACHE_DIR, BuildCache
+from json_backend import (
+    BACKENDS as JSON_BACKENDS,
+    ENV_VAR as JSON_BACKEND_ENV,
+    get_backend,
+)
+from token_table import (
+    ANGLE_BRACKET,
+    COMMENT,
+    CURLY_BRACE,
+    IDENTIFIER,
+    JSX_TAG_NAME,
+    KEYWORD,
+    OPERATOR,
+    PARENTHESIS,
+    PUNCTUATION,
+    SQUARE_BRACKET,
+    STRING_CONTENT,
+    STRING_DELIMITER,
+    STRING_DELIMITER_NODE,
+    CATEGORY_BITS,
+    LEAF_JSX_TAG,
+    LEAF_MISSING,
+    LeafTable,
+    TokenTable,
+    categories_to_mask,
+    mask_to_categories,
+)
+
+# (label, seconds) pairs collected for --startup-report
+STARTUP_TIMINGS = [("module imports", time.perf_counter() - _IMPORT_START)]
 
 # ============================================================================
 # PARSER SETUP
 # ============================================================================
 
-PARSERS = {
-    "python": (Language(tspython.language()), Parser(Language(tspython.language()))),
-    "javascript": (
-        Language(tsjavascript.language()),
-        Parser(Language(tsjavascript.language())),
-    ),
-    "typescript": (
-        Language(language_typescript()),
-        Parser(Language(language_typescript())),
-    ),
-    "tsx": (Language(language_tsx()), Parser(Language(language_tsx()))),
-}
+
+def _python_language():
+    import tree_sitter_python
+
+    return tree_sitter_python.language()
+
+
+def _javascript_language():
+    import tree_sitter_javascript
+
+    return tree_sitter_javascript.language()
+
+
+def _typescript_language():
+    from tree_sitter_typescript import language_typescript
+
+    return language_typescript()
+
+
+def _tsx_language():
+    from tree_sitter_typescript import language_tsx
+
+    return language_tsx()
+
+
+# Entry-point groups for grammar plugins, e.g. in a plugin's pyproject.toml:
+#   [project.entry-points."treetype.languages"]
+#   rust = "tree_sitter_rust:language"
+#   [project.entry-points."treetype.extensions"]
+#   ".rs" = "rust"
+LANGUAGE_ENTRY_POINTS = "treetype.languages"
+EXTENSION_ENTRY_POINTS = "treetype.extensions"
+
+_dist_versions = {}
+
+
+def dist_version(distribution):
+    """
+    Installed version of a distribution, read from its .dist-info directory
+    name on sys.path: importing importlib.metadata alone costs ~40 ms, most
+    of a cached single-file run. Other install layouts fall back to it;
+    "unknown" when the distribution is not installed.
+    """
+    version = _dist_versions.get(distribution)
+    if version is None:
+        prefix = distribution.replace("-", "_").replace(".", "_").lower() + "-"
+        for entry in sys.path:
+            try:
+                names = os.listdir(entry or ".")
+            except OSError:
+                continue
+            for name in names:
+                if name.endswith(".dist-info") and name.lower().startswith(prefix):
+                    version = name[len(prefix) : -len(".dist-info")]
+                    break
+            if version is not None:
+                break
+        else:
+            from importlib.metadata import PackageNotFoundError, version as metadata
+
+            try:
+                version = metadata(distribution)
+            except PackageNotFoundError:
+                version = "unknown"
+        _dist_versions[distribution] = version
+    return version
+
+
+class LanguageRegistry(Mapping):
+    """
+    Language name -> (Language, Parser), loaded on first use.
+
+    Grammar modules are only imported when a language is first looked up,
+    so parsing one .py file never loads the JavaScript/TypeScript grammars.
+    """
+
+    def __init__(self, loaders, distributions):
+        self._loaders = dict(loaders)
+        self._distributions = dict(distributions)
+        self._loaded = {}
+        self._versions = {}
+
+    def register(self, name, loader, distribution=None):
+        """Add a language; loader() returns the tree-sitter language pointer"""
+        self._loaders[name] = loader
+        self._distributions[name] = distribution
+        self._loaded.pop(name, None)
+        self._versions.pop(name, None)
+
+    def grammar_version(self, name):
+        """Installed version of the package providing a grammar (no grammar load)"""
+        version = self._versions.get(name)
+        if version is None:
+            distribution = self._distributions.get(name)
+            version = dist_version(distribution) if distribution else "unknown"
+            self._versions[name] = version
+        return version
+
+    def __getitem__(self, name):
+        entry = self._loaded.get(name)
+        if entry is None:
+            loader = self._loaders[name]
+            start = time.perf_counter()
+            language = Language(loader())
+            entry = (language, Parser(language))
+            self._loaded[name] = entry
+            STARTUP_TIMINGS.append((f"grammar: {name}", time.perf_counter() - start))
+        return entry
+
+    def __contains__(self, name):
+        # Mapping's default would call __getitem__ and load the grammar
+        return name in self._loaders
+
+    def __iter__(self):
+        return iter(self._loaders)
+
+    def __len__(self):
+        return len(self._loaders)
+
+
+PARSERS = LanguageRegistry(
+    {
+        "python": _python_language,
+        "javascript": _javascript_language,
+        "typescript": _typescript_language,
+        "tsx": _tsx_language,
+    },
+    {
+        "python": "tree-sitter-python",
+        "javascript": "tree-sitter-javascript",
+        "typescript": "tree-sitter-typescript",
+        "tsx": "tree-sitter-typescript",
+    },
+)
 
 LANGUAGE_EXTENSIONS = {
     ".py": "python",
@@ -40,11 +203,106 @@ LANGUAGE_EXTENSIONS = {
     ".tsx": "tsx",
 }
 
+_plugins_loaded = False
+
+
+def load_plugin_languages():
+    """
+    Register grammars published under the treetype entry-point groups.
+
+    Discovery runs at most once, and only when a built-in language does not
+    cover the request (unknown suffix or directory scan).
+    """
+    global _plugins_loaded
+    if _plugins_loaded:
+        return
+    _plugins_loaded = True
+
+    from importlib.metadata import entry_points
+
+    start = time.perf_counter()
+    for ep in entry_points(group=LANGUAGE_ENTRY_POINTS):
+        if ep.name not in PARSERS:
+            distribution = ep.dist.name if ep.dist else None
+            PARSERS.register(ep.name, lambda ep=ep: ep.load()(), distribution)
+    for ep in entry_points(group=EXTENSION_ENTRY_POINTS):
+        if ep.value in PARSERS:
+            LANGUAGE_EXTENSIONS.setdefault(ep.name, ep.value)
+    STARTUP_TIMINGS.append(("plugin discovery", time.perf_counter() - start))
+
+
+# Languages whose grammars can produce jsx_text tokens
+JSX_LANGUAGES = {"tsx", "javascript"}
+
+# Token engines selectable via --engine
+ENGINES = ("stream", "legacy")
+
+# Categorizers selectable via --categorizer (stream engine only)
+CATEGORIZERS = ("rules", "query")
+
+# Output schemas selectable via --schema: 1 = pretty-printed with a
+# per-character char_map, 2 = compact with per-line token_offsets
+SCHEMAS = (1, 2)
+
+# Output formats: JSON snippets, or binary snippet packs (see snippet_pack.py)
+FORMATS = ("json", "pack")
+
+# Tree-sitter category queries: common.scm + <language>.scm
+QUERIES_DIR = Path(__file__).resolve().parent / "queries"
+
 # ============================================================================
 # TOKEN CATEGORIZATION
 # ============================================================================
 
 
+STRING_DELIMITERS = {'"', "'", "`"}
+PUNCTUATION_MARKS = {":", ";", ",", "."}
+PARENTHESES = {"(", ")"}
+CURLY_BRACES = {"{", "}"}
+SQUARE_BRACKETS = {"[", "]"}
+ANGLE_BRACKETS = {"<", ">", "</", "/>"}
+
+OPERATORS = {
+    "=",
+    "+",
+    "-",
+    "*",
+    "/",
+    "%",
+    "!",
+    "&",
+    "|",
+    "^",
+    "~",
+    "->",
+    "=>",
+    "++",
+    "--",
+    "+=",
+    "-=",
+    "*=",
+    "/=",
+    "%=",
+    "==",
+    "!=",
+    "===",
+    "!==",
+    "<=",
+    ">=",
+    "&&",
+    "||",
+    "<<",
+    ">>",
+    "**",
+    "//",
+    "?",
+    ":",
+    "??",
+    "?.",
+    "...",
+}
+
+
 def categorize_token(token_type, token_text):
     """Classify tokens into categories for frontend filtering"""
     categories = []
@@ -63,66 +321,27 @@ def categorize_token(token_type, token_text):
         categories.append("string_content")
 
     # String delimiters
-    if token_text in {'"', "'", "`"}:
+    if token_text in STRING_DELIMITERS:
         categories.append("string_delimiter")
     if "string_start" in type_lower or "string_end" in type_lower:
         categories.append("string_delimiter")
 
     # Punctuation
-    if token_text in {":", ";", ",", "."}:
+    if token_text in PUNCTUATION_MARKS:
         categories.append("punctuation")
 
     # Split brackets
-    if token_text in {"(", ")"}:
+    if token_text in PARENTHESES:
         categories.append("parenthesis")
-    if token_text in {"{", "}"}:
+    if token_text in CURLY_BRACES:
         categories.append("curly_brace")
-    if token_text in {"[", "]"}:
+    if token_text in SQUARE_BRACKETS:
         categories.append("square_bracket")
-    if token_text in {"<", ">", "</", "/>"}:
+    if token_text in ANGLE_BRACKETS:
         categories.append("angle_bracket")
 
     # Operators
-    operators = {
-        "=",
-        "+",
-        "-",
-        "*",
-        "/",
-        "%",
-        "!",
-        "&",
-        "|",
-        "^",
-        "~",
-        "->",
-        "=>",
-        "++",
-        "--",
-        "+=",
-        "-=",
-        "*=",
-        "/=",
-        "%=",
-        "==",
-        "!=",
-        "===",
-        "!==",
-        "<=",
-        ">=",
-        "&&",
-        "||",
-        "<<",
-        ">>",
-        "**",
-        "//",
-        "?",
-        ":",
-        "??",
-        "?.",
-        "...",
-    }
-    if token_text in operators:
+    if token_text in OPERATORS:
         categories.append("operator")
 
     return categories
@@ -135,6 +354,172 @@ def is_non_typeable(token_type, token_text):
     return False
 
 
+# ============================================================================
+# KIND-ID DISPATCH TABLES
+# ============================================================================
+
+
+def type_category_mask(token_type):
+    """Category bits decided by the node type alone (mirrors categorize_token)"""
+    mask = 0
+    type_lower = token_type.lower()
+
+    if "comment" in type_lower:
+        mask |= COMMENT
+    if "string" in type_lower and ("content" in type_lower or "fragment" in type_lower):
+        mask |= STRING_CONTENT
+    if token_type == "jsx_text":
+        mask |= STRING_CONTENT
+    if "string_start" in type_lower or "string_end" in type_lower:
+        mask |= STRING_DELIMITER_NODE
+
+    return mask
+
+
+def build_text_category_masks():
+    """
+    Text-keyed fallback table: category bits decided by token text alone.
+
+    Keyed by UTF-8 bytes so source slices (bytes or memoryview) can be looked
+    up without decoding.
+    """
+    rules = (
+        (STRING_DELIMITERS, STRING_DELIMITER),
+        (PUNCTUATION_MARKS, PUNCTUATION),
+        (PARENTHESES, PARENTHESIS),
+        (CURLY_BRACES, CURLY_BRACE),
+        (SQUARE_BRACKETS, SQUARE_BRACKET),
+        (ANGLE_BRACKETS, ANGLE_BRACKET),
+        (OPERATORS, OPERATOR),
+    )
+    masks = {}
+    for texts, bit in rules:
+        for text in texts:
+            key = text.encode("utf-8")
+            masks[key] = masks.get(key, 0) | bit
+    return masks
+
+
+TEXT_CATEGORY_MASKS = build_text_category_masks()
+
+
+class KindTable:
+    """
+    Per-language classification table indexed by the grammar's kind_id.
+
+    category_mask(kind_id, text) is two O(1) lookups and returns the same
+    bitmask as categories_to_mask(categorize_token(type, text)). text is the
+    token's UTF-8 bytes (bytes or memoryview slice of the source).
+    """
+
+    def __init__(self, language):
+        kind_names = [
+            language.node_kind_for_id(kind_id) or ""
+            for kind_id in range(language.node_kind_count)
+        ]
+        self.type_masks = [type_category_mask(name) for name in kind_names]
+        self.whitespace_kinds = frozenset(
+            kind_id for kind_id, name in enumerate(kind_names) if name == "whitespace"
+        )
+
+    def category_mask(self, kind_id, text):
+        return self.type_masks[kind_id] | TEXT_CATEGORY_MASKS.get(text, 0)
+
+    def is_non_typeable(self, kind_id, text):
+        return kind_id in self.whitespace_kinds and str(text, "utf-8").strip() == ""
+
+
+_KIND_TABLES = {}
+
+
+def get_kind_table(language_name, language):
+    """Build (once) and return the KindTable for a language"""
+    table = _KIND_TABLES.get(language_name)
+    if table is None:
+        table = KindTable(language)
+        _KIND_TABLES[language_name] = table
+    return table
+
+
+# ============================================================================
+# QUERY-DRIVEN CATEGORIZATION
+# ============================================================================
+
+# Capture names used in queries/*.scm -> category bits
+CAPTURE_BITS = {
+    "comment": COMMENT,
+    "string_content": STRING_CONTENT,
+    "string_delimiter": STRING_DELIMITER,
+    "string_delimiter.node": STRING_DELIMITER_NODE,
+    "punctuation": PUNCTUATION,
+    "parenthesis": PARENTHESIS,
+    "curly_brace": CURLY_BRACE,
+    "square_bracket": SQUARE_BRACKET,
+    "angle_bracket": ANGLE_BRACKET,
+    "operator": OPERATOR,
+    "keyword": KEYWORD,
+    "identifier": IDENTIFIER,
+}
+
+_CATEGORY_QUERIES = {}
+
+
+def get_category_query(language_name, language):
+    """Compile (once) and return the category Query for a language"""
+    query = _CATEGORY_QUERIES.get(language_name)
+    if query is None:
+        source = (QUERIES_DIR / "common.scm").read_text(encoding="utf-8")
+        source += (QUERIES_DIR / f"{language_name}.scm").read_text(encoding="utf-8")
+        query = Query(language, source)
+
+        for idx in range(query.capture_count):
+            name = query.capture_name(idx)
+            if name not in CAPTURE_BITS:
+                raise ValueError(f"Unknown capture @{name} in {language_name} queries")
+
+        _CATEGORY_QUERIES[language_name] = query
+    return query
+
+
+def query_category_masks(root_node, language_name, language):
+    """
+    Run the category query once over the tree.
+
+    Returns {node.id: category bitmask}; nodes without captures are absent.
+    """
+    query = get_category_query(language_name, language)
+    masks = {}
+    for name, nodes in QueryCursor(query).captures(root_node).items():
+        bit = CAPTURE_BITS[name]
+        for node in nodes:
+            masks[node.id] = masks.get(node.id, 0) | bit
+    return masks
+
+
+_JSX_TAG_NAME_QUERIES = {}
+
+
+def jsx_tag_name_ids(root_node, language_name, language):
+    """
+    Node ids of the named leaves that spell a JSX element's tag name.
+
+    Taken from the syntax tree (queries/jsx_tag_name.scm), so tags spanning
+    several lines are found and TypeScript generics (Array<Item>) are not,
+    unlike the frontend's neighbour-scanning isJSXTagName heuristic.
+    """
+    query = _JSX_TAG_NAME_QUERIES.get(language_name)
+    if query is None:
+        source = (QUERIES_DIR / "jsx_tag_name.scm").read_text(encoding="utf-8")
+        query = _JSX_TAG_NAME_QUERIES[language_name] = Query(language, source)
+
+    ids = set()
+    for nodes in QueryCursor(query).captures(root_node).values():
+        for name_node in nodes:
+            leaves = iter_leaves(name_node) if name_node.child_count else (name_node,)
+            ids.update(leaf.id for leaf in leaves if leaf.is_named)
+    return ids
+
+
 # ============================================================================
 # JSX TEXT HANDLING (BUG FIX)
 # ============================================================================
@@ -230,26 +615,50 @@ def split_jsx_text_token(row):
 # ============================================================================
 
 
+# Node types emitted whole, without descending into their children
+ATOMIC_TYPES = {"string_content", "comment", "string_fragment"}
+
+
+def iter_leaves(node):
+    """
+    Lazily yield leaf nodes below node in source order.
+
+    Iterative TreeCursor walk (constant Python stack, linear time). Nodes in
+    ATOMIC_TYPES are yielded whole instead of being descended into.
+    """
+    cursor = node.walk()
+    if not cursor.goto_first_child():
+        return
+
+    depth = 1
+    while True:
+        current = cursor.node
+        if current.type in ATOMIC_TYPES or not cursor.goto_first_child():
+            yield current
+
+            # Advance to the next sibling, climbing back up as needed
+            while not cursor.goto_next_sibling():
+                cursor.goto_parent()
+                depth -= 1
+                if depth == 0:
+                    return
+        else:
+            depth += 1
+
+
 def get_leaves(node, nodes=None):
     """Get leaf nodes, treating string_content and comment as atomic"""
     if nodes is None:
         nodes = []
 
-    atomic_types = {"string_content", "comment", "string_fragment"}
-
-    for child in node.children:
-        if child.type in atomic_types:
-            nodes.append(child)
-        elif child.children:
-            nodes.extend(get_leaves(child))
-        else:
-            nodes.append(child)
-
+    nodes.extend(iter_leaves(node))
     return nodes
 
 
 def parse_code_to_dataframe(source_code, parser, language_name):
     """Parse code and return enhanced DataFrame"""
+    import pandas as pd
+
     src_code_bytes = source_code.encode("utf-8")
     root_node = parser.parse(src_code_bytes).root_node
     leaves = get_leaves(root_node)
@@ -268,81 +677,729 @@ def parse_code_to_dataframe(source_code, parser, language_name):
     df["CATEGORIES"] = df.apply(
         lambda x: categorize_token(x["TYPE"], x["TEXT"]), axis=1
     )
+    if language_name in JSX_LANGUAGES:
+        tag_ids = jsx_tag_name_ids(root_node, language_name, parser.language)
+        df["CATEGORIES"] = df.apply(
+            lambda x: (
+                x["CATEGORIES"] + ["jsx_tag_name"]
+                if x["NODE"].id in tag_ids
+                else x["CATEGORIES"]
+            ),
+            axis=1,
+        )
     df["INDENT_LEVEL"] = df["START_COL"].apply(lambda x: x // 4)
 
-    # CRITICAL FIX: Split jsx_text tokens to separate whitespace
-    if language_name in ["tsx", "javascript"]:  # JSX can appear in both
-        expanded_rows = []
-        for idx, row in df.iterrows():
-            split_tokens = split_jsx_text_token(row)
-            expanded_rows.extend(split_tokens)
-
-        # Rebuild dataframe with split tokens
-        if expanded_rows:
-            df = pd.DataFrame(expanded_rows)
+    # CRITICAL FIX: Split jsx_text tokens to separate whitespace. Only the
+    # jsx_text rows with leading/trailing whitespace are touched; their pieces
+    # are slotted in at the original row's position (fractional index) and
+    # every other row is left alone.
+    if language_name in JSX_LANGUAGES:  # JSX can appear in both
+        text = df["TEXT"]
+        split_mask = (df["TYPE"] == "jsx_text") & (text != text.str.strip())
+        if split_mask.any():
+            pieces = []
+            positions = []
+            split_rows = df.loc[split_mask].drop(columns="NODE")
+            for position, row in zip(split_rows.index, split_rows.to_dict("records")):
+                split_tokens = split_jsx_text_token(row)
+                pieces.extend(split_tokens)
+                positions.extend(position + k / 4 for k in range(len(split_tokens)))
+
+            df = (
+                pd.concat([df.loc[~split_mask], pd.DataFrame(pieces, index=positions)])
+                .sort_index(kind="stable")
+                .reset_index(drop=True)
+            )
 
     return df
 
 
+def append_jsx_text(
+    table, start_row, start_col, end_row, end_col, start_byte, end_byte, text, leaf
+):
+    """
+    Append a jsx_text token to a TokenTable, splitting off leading/trailing
+    whitespace exactly like split_jsx_text_token does for DataFrame rows.
+    """
+    indent_level = start_col // 4
+
+    # If no leading/trailing whitespace, keep as-is
+    content = text.strip()
+    if text == content:
+        table.append(
+            start_row,
+            start_col,
+            end_row,
+            end_col,
+            start_byte,
+            end_byte,
+            "jsx_text",
+            False,
+            0,
+            indent_level,
+            leaf,
+        )
+        return
+
+    # Byte spans are taken from the node's own edges; columns are chained
+    # piece by piece to match split_jsx_text_token
+    leading_ws = len(text) - len(text.lstrip())
+    trailing_ws = len(text) - len(text.rstrip())
+    leading_end = start_byte + len(text[:leading_ws].encode("utf-8"))
+    trailing_start = end_byte - len(text[len(text) - trailing_ws :].encode("utf-8"))
+
+    pieces = []
+    if leading_ws > 0:
+        pieces.append((leading_ws, start_byte, leading_end, "jsx_text_whitespace"))
+    if content:
+        pieces.append((len(content), leading_end, trailing_start, "jsx_text"))
+    if trailing_ws > 0:
+        pieces.append((trailing_ws, trailing_start, end_byte, "jsx_text_whitespace"))
+
+    current_col = start_col
+    for length, piece_start, piece_end, piece_type in pieces:
+        table.append(
+            start_row,
+            current_col,
+            end_row,
+            current_col + length,
+            piece_start,
+            piece_end,
+            piece_type,
+            False,
+            0,
+            indent_level,
+            leaf,
+        )
+        current_col += length
+
+
+def extract_leaves(source, parser, language_name, categorizer="rules"):
+    """
+    Leaf extraction stage: parse source (UTF-8 bytes) into a LeafTable.
+
+    Everything later stages need from the syntax tree is recorded here: kind
+    ids, error-recovery placeholders, JSX tag names and, for the "query"
+    categorizer, the queries/*.scm captures. The tree is released on return.
+    """
+    leaves = LeafTable(language_name)
+    tree = parser.parse(source)
+    query_masks = None
+    if categorizer == "query":
+        query_masks = query_category_masks(
+            tree.root_node, language_name, parser.language
+        )
+    tag_ids = ()
+    if language_name in JSX_LANGUAGES:
+        tag_ids = jsx_tag_name_ids(tree.root_node, language_name, parser.language)
+
+    for node in iter_leaves(tree.root_node):
+        flags = LEAF_MISSING if node.is_missing else 0
+        if tag_ids and node.id in tag_ids:
+            flags |= LEAF_JSX_TAG
+        leaves.append(
+            node.start_point,
+            node.end_point,
+            node.start_byte,
+            node.end_byte,
+            node.kind_id,
+            node.type,
+            flags,
+            query_masks.get(node.id, 0) if query_masks is not None else 0,
+        )
+    return leaves
+
+
+def tokenize_leaves(leaves, source, language_name):
+    """
+    Token table stage: lay leaves out as TokenTable rows, splitting jsx_text
+    whitespace. Token text is never copied (only jsx_text is decoded, for
+    splitting); categories are left to categorize_tokens.
+    """
+    table = TokenTable(source, language_name)
+    view = table.view
+    split_jsx = language_name in JSX_LANGUAGES
+    types = leaves.types
+
+    for leaf in range(len(leaves)):
+        start_row, start_col = leaves.start_row[leaf], leaves.start_col[leaf]
+        end_row, end_col = leaves.end_row[leaf], leaves.end_col[leaf]
+        start_byte, end_byte = leaves.start_byte[leaf], leaves.end_byte[leaf]
+        token_type = types[leaves.type_code[leaf]]
+
+        if split_jsx and token_type == "jsx_text":
+            append_jsx_text(
+                table,
+                start_row,
+                start_col,
+                end_row,
+                end_col,
+                start_byte,
+                end_byte,
+                str(view[start_byte:end_byte], "utf-8"),
+                leaf,
+            )
+            continue
+
+        table.append(
+            start_row,
+            start_col,
+            end_row,
+            end_col,
+            start_byte,
+            end_byte,
+            token_type,
+            False,
+            0,
+            start_col // 4,
+            leaf,
+        )
+
+    return table
+
+
+def categorize_tokens(table, leaves, kinds, categorizer="rules"):
+    """
+    Categorization stage: fill a TokenTable's category_mask and base_typeable
+    columns from the leaf each token was cut from.
+
+    categorizer "rules" looks leaves up in the KindTable (memoryview slices,
+    no decoding); "query" uses the captures recorded by extract_leaves. Split
+    jsx_text pieces share their leaf's categories; the whitespace pieces get
+    none and are not typeable.
+    """
+    view = table.view
+    whitespace_code = table._type_codes.get("jsx_text_whitespace")
+    jsx_text_code = table._type_codes.get("jsx_text")
+    category_mask = table.category_mask
+    base_typeable = table.base_typeable
+
+    for idx in range(len(table)):
+        type_code = table.type_code[idx]
+        if type_code == whitespace_code:
+            category_mask[idx] = 0
+            base_typeable[idx] = 0
+            continue
+
+        leaf = table.leaf[idx]
+        kind_id = leaves.kind_id[leaf]
+        flags = leaves.flags[leaf]
+        text = view[leaves.start_byte[leaf] : leaves.end_byte[leaf]]
+        if categorizer != "query":
+            mask = kinds.category_mask(kind_id, text)
+        elif flags & LEAF_MISSING:
+            # Error-recovery placeholders have no text to categorize
+            mask = 0
+        else:
+            mask = leaves.query_mask[leaf]
+        if flags & LEAF_JSX_TAG:
+            mask |= JSX_TAG_NAME
+        category_mask[idx] = mask
+
+        if type_code == jsx_text_code:
+            typeable = not is_non_typeable("jsx_text", table.text(idx))
+        else:
+            typeable = not kinds.is_non_typeable(kind_id, text)
+        base_typeable[idx] = 1 if typeable else 0
+
+    return table
+
+
+def build_token_table(source, parser, language_name, categorizer="rules"):
+    """
+    Parse code into a categorized, columnar TokenTable.
+
+    source is the UTF-8 source buffer (str is encoded once). Runs the leaf
+    extraction, token table and categorization stages back to back;
+    build_token_table_cached runs the same stages over the stage cache.
+
+    categorizer "rules" uses the kind-id dispatch tables; "query" runs the
+    queries/*.scm captures once over the tree (and adds keyword/identifier).
+    The table holds only byte offsets into the source buffer, so the syntax
+    tree is released as soon as this function returns.
+    """
+    if isinstance(source, str):
+        source = source.encode("utf-8")
+    leaves = extract_leaves(source, parser, language_name, categorizer)
+    table = tokenize_leaves(leaves, source, language_name)
+    kinds = get_kind_table(language_name, parser.language)
+    return categorize_tokens(table, leaves, kinds, categorizer)
+
+
 # ============================================================================
 # JSON EXPORT
 # ============================================================================
 
 
-def dataframe_to_json(df, source_code, language_name):
-    """Convert DataFrame to frontend-ready JSON"""
+def build_line_json(line_num, indent_level, display_tokens, actual_line, schema=1):
+    """Build one frontend line object from its sorted display tokens"""
+    # Build typing sequence
+    typing_tokens = [t for t in display_tokens if t["base_typeable"]]
+    typing_sequence = "".join([t["text"] for t in typing_tokens])
+
+    # Typeable tokens and typing length under each frontend preset
+    preset_masks, preset_lengths = presets.preset_tables(display_tokens)
+
+    if schema == 2:
+        # Start of each typing token in typing_sequence (prefix sums)
+        token_offsets = []
+        offset = 0
+        for token in typing_tokens:
+            token_offsets.append(offset)
+            offset += len(token["text"])
+
+        return {
+            "line_number": int(line_num),
+            "indent_level": int(indent_level),
+            "actual_line": actual_line,
+            "display_tokens": display_tokens,  # packed by snippet_json
+            "typing_sequence": typing_sequence,
+            "token_offsets": token_offsets,
+            "preset_masks": preset_masks,
+            "preset_lengths": preset_lengths,
+        }
+
+    # Build character map (one shared entry per token, it is only serialized)
+    char_map = {}
+    char_idx = 0
+    for token_idx, token in enumerate(typing_tokens):
+        entry = {"token_idx": token_idx, "display_col": token["start_col"]}
+        for char in token["text"]:
+            char_map[str(char_idx)] = entry
+            char_idx += 1
+
+    return {
+        "line_number": int(line_num),
+        "indent_level": int(indent_level),
+        "actual_line": actual_line,
+        "display_tokens": display_tokens,
+        "typing_sequence": typing_sequence,
+        "char_map": char_map,
+        "preset_masks": preset_masks,
+        "preset_lengths": preset_lengths,
+    }
+
+
+# Schema 2 stores each display token as a positional array in this order,
+# with "type" an index into the file's "types" table and "categories" a
+# bitmask over "category_bits" (token_table.CATEGORY_BITS). "types" follows
+# "lines" so a streamed file can write it once every line is out.
+TOKEN_FIELDS = ("text", "type", "categories", "base_typeable", "start_col", "end_col")
+
+
+def pack_line_tokens(line, types, type_codes):
+    """Replace a line's display_tokens with schema 2 arrays (types grows as needed)"""
+    packed = []
+    for token in line.pop("display_tokens"):
+        code = type_codes.get(token["type"])
+        if code is None:
+            code = type_codes[token["type"]] = len(types)
+            types.append(token["type"])
+        packed.append(
+            [
+                token["text"],
+                code,
+                categories_to_mask(token["categories"]),
+                int(token["base_typeable"]),
+                token["start_col"],
+                token["end_col"],
+            ]
+        )
+    line["tokens"] = packed
+    return line
+
+
+def snippet_json(language_name, lines_data, schema=1):
+    """Top-level snippet object; schema 2 packs display tokens into arrays"""
+    if schema != 2:
+        return {
+            "language": language_name,
+            "total_lines": len(lines_data),
+            "lines": lines_data,
+        }
+
+    types = []
+    type_codes = {}
+    for line in lines_data:
+        pack_line_tokens(line, types, type_codes)
+
+    return {
+        "schema_version": 2,
+        "language": language_name,
+        "total_lines": len(lines_data),
+        "token_fields": list(TOKEN_FIELDS),
+        "category_bits": [name for name, _ in CATEGORY_BITS],
+        "lines": lines_data,
+        "types": types,
+    }
+
+
+def decode_snippet(json_data):
+    """Expand a snippet of any schema into the schema 1 layout"""
+    if json_data.get("schema_version", 1) == 1:
+        return json_data
+
+    types = json_data["types"]
     lines_data = []
+    for line in json_data["lines"]:
+        display_tokens = [
+            {
+                "text": text,
+                "type": types[code],
+                "categories": mask_to_categories(mask),
+                "base_typeable": bool(base_typeable),
+                "start_col": start_col,
+                "end_col": end_col,
+            }
+            for text, code, mask, base_typeable, start_col, end_col in line["tokens"]
+        ]
+        lines_data.append(
+            build_line_json(
+                line["line_number"],
+                line["indent_level"],
+                display_tokens,
+                line["actual_line"],
+            )
+        )
+    return snippet_json(json_data["language"], lines_data)
+
+
+def write_snippet_json(json_data, f, schema=1, backend=None):
+    """Serialize a snippet to binary file f: schema 1 pretty-printed, schema 2 compact"""
+    backend = backend or get_backend()
+    f.write(backend.dumps(json_data, pretty=schema != 2))
+
+
+def write_snippet_stream(f, language_name, total_lines, lines, schema=1, backend=None):
+    """
+    Serialize a snippet to binary file f line by line as lines yields them.
+
+    Writes exactly the bytes write_snippet_json(snippet_json(...)) would, but
+    only one line object is alive at a time. total_lines must be known up
+    front because it precedes "lines" in the output.
+    """
+    dumps = (backend or get_backend()).dumps
+    if schema == 2:
+        header = {
+            "schema_version": 2,
+            "language": language_name,
+            "total_lines": total_lines,
+            "token_fields": list(TOKEN_FIELDS),
+            "category_bits": [name for name, _ in CATEGORY_BITS],
+        }
+        f.write(dumps(header)[:-1])
+        f.write(b',"lines":[')
+        types = []
+        type_codes = {}
+        separator = b""
+        for line in lines:
+            f.write(separator)
+            f.write(dumps(pack_line_tokens(line, types, type_codes)))
+            separator = b","
+        f.write(b'],"types":')
+        f.write(dumps(types))
+        f.write(b"}")
+        return
+
+    f.write(b'{\n  "language": ' + dumps(language_name) + b",\n")
+    f.write(b'  "total_lines": ' + dumps(total_lines) + b",\n")
+    f.write(b'  "lines": [')
+    separator = b"\n    "
+    empty = True
+    for line in lines:
+        # Nested two levels deep: every structural newline gains 4 spaces
+        # (newlines inside strings are escaped, so they are never hit)
+        f.write(separator)
+        f.write(dumps(line, pretty=True).replace(b"\n", b"\n    "))
+        separator = b",\n    "
+        empty = False
+    f.write(b"]\n}" if empty else b"\n  ]\n}")
+
+
+def iter_dataframe_lines(df, source_code, schema=1):
+    """
+    Yield the frontend line objects of a DataFrame in line order.
+
+    Columns are pulled out as plain lists, sorted once (stably) by
+    (START_ROW, START_COL) and swept linearly into lines; no per-row pandas
+    objects are created.
+    """
+    start_row = df["START_ROW"].tolist()
+    start_col = df["START_COL"].tolist()
+    end_col = df["END_COL"].tolist()
+    text = df["TEXT"].tolist()
+    token_type = df["TYPE"].tolist()
+    categories = df["CATEGORIES"].tolist()
+    base_typeable = df["BASE_TYPEABLE"].tolist()
+    indent_level = df["INDENT_LEVEL"].tolist()
     src_lines = source_code.split("\n")
 
-    for line_num, line_df in df.groupby("START_ROW"):
-        line_df = line_df.sort_values(["START_COL"]).reset_index(drop=True)
-        indent_level = line_df.iloc[0]["INDENT_LEVEL"] if len(line_df) > 0 else 0
+    order = sorted(range(len(start_row)), key=lambda i: (start_row[i], start_col[i]))
+
+    for line_num, line_idx in groupby(order, key=start_row.__getitem__):
+        line_idx = list(line_idx)
+        display_tokens = [
+            {
+                "text": text[idx],
+                "type": token_type[idx],
+                "categories": categories[idx],
+                "base_typeable": bool(base_typeable[idx]),
+                "start_col": start_col[idx],
+                "end_col": end_col[idx],
+            }
+            for idx in line_idx
+        ]
+
+        actual_line = src_lines[line_num] if line_num < len(src_lines) else ""
+        yield build_line_json(
+            line_num,
+            indent_level[line_idx[0]],
+            display_tokens,
+            actual_line,
+            schema,
+        )
+
 
-        # Build display tokens
+def dataframe_to_json(df, source_code, language_name, schema=1):
+    """Convert DataFrame to frontend-ready JSON"""
+    lines_data = list(iter_dataframe_lines(df, source_code, schema))
+    return snippet_json(language_name, lines_data, schema)
+
+
+def iter_token_table_lines(table, schema=1):
+    """Yield the frontend line objects of a TokenTable in line order"""
+    for line_num, line_idx in groupby(
+        table.row_order(), key=table.start_row.__getitem__
+    ):
         display_tokens = []
-        for idx, row in line_df.iterrows():
+        indent_level = None
+        for idx in line_idx:
+            if indent_level is None:
+                indent_level = table.indent_level[idx]
             display_tokens.append(
                 {
-                    "text": row["TEXT"],
-                    "type": row["TYPE"],
-                    "categories": row["CATEGORIES"],
-                    "base_typeable": bool(row["BASE_TYPEABLE"]),
-                    "start_col": int(row["START_COL"]),
-                    "end_col": int(row["END_COL"]),
+                    "text": table.text(idx),
+                    "type": table.type_name(idx),
+                    "categories": table.categories(idx),
+                    "base_typeable": bool(table.base_typeable[idx]),
+                    "start_col": table.start_col[idx],
+                    "end_col": table.end_col[idx],
                 }
             )
 
-        # Build typing sequence
-        typing_tokens = [t for t in display_tokens if t["base_typeable"]]
-        typing_sequence = "".join([t["text"] for t in typing_tokens])
-
-        # Build character map
-        char_map = {}
-        char_idx = 0
-        for token_idx, token in enumerate(typing_tokens):
-            for char in token["text"]:
-                char_map[str(char_idx)] = {
-                    "token_idx": int(token_idx),
-                    "display_col": int(token["start_col"]),
-                }
-                char_idx += 1
+        yield build_line_json(
+            line_num,
+            indent_level,
+            display_tokens,
+            table.line_text(line_num),
+            schema,
+        )
 
-        lines_data.append(
+
+def token_table_to_json(table, schema=1):
+    """Convert a TokenTable to frontend-ready JSON (same layout as DataFrame path)"""
+    lines_data = list(iter_token_table_lines(table, schema))
+    return snippet_json(table.language, lines_data, schema)
+
+
+# ============================================================================
+# BUILD CACHE KEYS
+# ============================================================================
+
+# Modules whose code shapes a snippet's tokens or JSON layout. Their files are
+# hashed whole (with the queries and presets) rather than function by function:
+# inspect.getsource over every rule cost ~70 ms per run, cache hits included.
+RULE_FILES = (
+    Path(__file__).resolve(),
+    Path(token_table.__file__),
+    Path(presets.__file__),
+    Path(snippet_pack.__file__),
+)
+
+_rules_version = None
+
+
+def code_digest(sources, constants=(), query_files=False):
+    """Hash of the source of functions/classes/modules and constant sets"""
+    import inspect
+
+    digest = hashlib.sha256()
+    for obj in sources:
+        digest.update(inspect.getsource(obj).encode("utf-8"))
+    for constant in constants:
+        digest.update(repr(sorted(constant)).encode("utf-8"))
+    if query_files:
+        for query_file in sorted(QUERIES_DIR.glob("*.scm")):
+            digest.update(query_file.read_bytes())
+    return digest
+
+
+def rules_version():
+    """Hash of the rule modules, queries and presets (computed once, on first use)"""
+    global _rules_version
+    if _rules_version is None:
+        digest = hashlib.sha256()
+        query_files = sorted(QUERIES_DIR.glob("*.scm"))
+        for path in (*RULE_FILES, *query_files, presets.PRESETS_FILE):
+            digest.update(path.read_bytes())
+        _rules_version = digest.hexdigest()
+    return _rules_version
+
+
+def build_cache_key(source, language_name, options):
+    """Cache key for one source: content, grammar, rules and output options"""
+    digest = hashlib.sha256(source)
+    digest.update(
+        json.dumps(
             {
-                "line_number": int(line_num),
-                "indent_level": int(indent_level),
-                "actual_line": src_lines[line_num] if line_num < len(src_lines) else "",
-                "display_tokens": display_tokens,
-                "typing_sequence": typing_sequence,
-                "char_map": char_map,
-            }
+                "language": language_name,
+                "grammar": PARSERS.grammar_version(language_name),
+                "tree_sitter": dist_version("tree-sitter"),
+                "rules": rules_version(),
+                "options": options,
+            },
+            sort_keys=True,
+        ).encode("utf-8")
+    )
+    return digest.hexdigest()
+
+
+# ============================================================================
+# STAGE CACHE
+# ============================================================================
+
+# Stages of the stream engine cached on disk, in pipeline order, with the
+# code (and constants) that shapes each one's output. JSON/pack emission is
+# the last stage; its output is the snippet itself, skipped via the manifest.
+STAGES = ("leaves", "tokens", "categories")
+STAGE_SOURCES = {
+    "leaves": (
+        (
+            iter_leaves,
+            extract_leaves,
+            query_category_masks,
+            get_category_query,
+            jsx_tag_name_ids,
+            token_table.ColumnTable,
+            LeafTable,
+        ),
+        (ATOMIC_TYPES, JSX_LANGUAGES, CAPTURE_BITS.items()),
+    ),
+    "tokens": (
+        (tokenize_leaves, append_jsx_text, token_table.ColumnTable, TokenTable),
+        (JSX_LANGUAGES,),
+    ),
+    "categories": (
+        (
+            categorize_tokens,
+            categorize_token,
+            is_non_typeable,
+            type_category_mask,
+            build_text_category_masks,
+            KindTable,
+        ),
+        (
+            STRING_DELIMITERS,
+            PUNCTUATION_MARKS,
+            PARENTHESES,
+            CURLY_BRACES,
+            SQUARE_BRACKETS,
+            ANGLE_BRACKETS,
+            OPERATORS,
+            CATEGORY_BITS,
+        ),
+    ),
+}
+
+_stage_versions = {}
+
+
+def stage_version(stage):
+    """Hash of the code of one cached stage"""
+    version = _stage_versions.get(stage)
+    if version is None:
+        sources, constants = STAGE_SOURCES[stage]
+        version = code_digest(
+            sources, constants, query_files=stage == "leaves"
+        ).hexdigest()
+        _stage_versions[stage] = version
+    return version
+
+
+def stage_keys(source, language_name, categorizer):
+    """
+    Cache key of each stage: the key of its input (the previous stage, or the
+    source, grammar and categorizer for leaves) hashed with its code version.
+    A rule change thus re-keys only the stages from the changed one onwards.
+    """
+    digest = hashlib.sha256(source)
+    digest.update(
+        json.dumps(
+            {
+                "language": language_name,
+                "grammar": PARSERS.grammar_version(language_name),
+                "tree_sitter": dist_version("tree-sitter"),
+                "categorizer": categorizer,
+            },
+            sort_keys=True,
+        ).encode("utf-8")
+    )
+    keys = {}
+    key = digest.hexdigest()
+    for stage in STAGES:
+        key = hashlib.sha256(
+            f"{key}:{stage_version(stage)}".encode("utf-8")
+        ).hexdigest()
+        keys[stage] = key
+    return keys
+
+
+def build_token_table_cached(source, parser, language_name, categorizer, cache, keys):
+    """
+    build_token_table through the BuildCache's stage store.
+
+    Each stage is loaded if its key is cached, and otherwise run from the
+    previous stage's output and stored; leaves are only needed (and only
+    parsed) when the token table or categories have to be rebuilt. A stored
+    output that fails to load (e.g. a damaged file) is rebuilt.
+    """
+    table = cache.load_stage(
+        "tokens",
+        keys["tokens"],
+        lambda data: TokenTable.from_bytes(data, source, language_name),
+    )
+    if table is not None:
+        categorized = cache.load_stage(
+            "categories",
+            keys["categories"],
+            lambda data: table.load_bytes(data, TokenTable.CATEGORY_COLUMNS),
         )
+        if categorized is not None:
+            return categorized
 
-    return {
-        "language": language_name,
-        "total_lines": len(lines_data),
-        "lines": lines_data,
-    }
+    leaves = cache.load_stage(
+        "leaves",
+        keys["leaves"],
+        lambda data: LeafTable.from_bytes(data, language_name),
+    )
+    if leaves is None:
+        leaves = extract_leaves(source, parser, language_name, categorizer)
+        cache.store_stage("leaves", keys["leaves"], leaves.to_bytes(LeafTable.COLUMNS))
+
+    if table is None:
+        table = tokenize_leaves(leaves, source, language_name)
+        cache.store_stage(
+            "tokens", keys["tokens"], table.to_bytes(TokenTable.TOKEN_COLUMNS)
+        )
+
+    kinds = get_kind_table(language_name, parser.language)
+    categorize_tokens(table, leaves, kinds, categorizer)
+    cache.store_stage(
+        "categories",
+        keys["categories"],
+        table.to_bytes(TokenTable.CATEGORY_COLUMNS, with_types=False),
+    )
+    return table
 
 
 # ============================================================================
@@ -350,8 +1407,44 @@ def dataframe_to_json(df, source_code, language_name):
 # ============================================================================
 
 
-def validate_file(filepath):
-    """Validate source file"""
+class HashingWriter:
+    """Binary file wrapper that hashes everything written through it"""
+
+    def __init__(self, f):
+        self._f = f
+        self._digest = hashlib.sha256()
+
+    def write(self, data):
+        self._digest.update(data)
+        return self._f.write(data)
+
+    def hexdigest(self):
+        return self._digest.hexdigest()
+
+
+def read_source(filepath):
+    """
+    Read a source file once as UTF-8 bytes.
+
+    Line endings are normalized to \n, matching what text-mode reads did
+    before the pipeline went bytes-native.
+    """
+    source = Path(filepath).read_bytes()
+    if b"\r" in source:
+        source = source.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    return source
+
+
+def count_lines(source):
+    """Number of lines in a bytes buffer (a trailing partial line counts)"""
+    line_count = source.count(b"\n")
+    if source and not source.endswith(b"\n"):
+        line_count += 1
+    return line_count
+
+
+def validate_file(filepath, source=None):
+    """Validate source file (source: its bytes, if already read)"""
     path = Path(filepath)
 
     if not path.exists():
@@ -360,6 +1453,9 @@ def validate_file(filepath):
     if not path.is_file():
         return False, f"Not a file: {filepath}"
 
+    if path.suffix not in LANGUAGE_EXTENSIONS:
+        load_plugin_languages()
+
     if path.suffix not in LANGUAGE_EXTENSIONS:
         return (
             False,
@@ -367,8 +1463,9 @@ def validate_file(filepath):
         )
 
     # Check file size (warn if > 1000 lines)
-    with open(path, "r", encoding="utf-8") as f:
-        line_count = sum(1 for _ in f)
+    if source is None:
+        source = read_source(path)
+    line_count = count_lines(source)
 
     if line_count < 5:
         return False, f"File too short ({line_count} lines). Minimum: 5 lines"
@@ -380,26 +1477,64 @@ def validate_file(filepath):
     return True, None
 
 
-def process_file(input_path, output_path=None, quiet=False):
-    """Process a single source file"""
+def process_file(
+    input_path,
+    output_path=None,
+    quiet=False,
+    engine="stream",
+    categorizer="rules",
+    cache=None,
+    schema=1,
+    stream=True,
+    json_backend=None,
+    output_format="json",
+):
+    """Process a single source file
+
+    engine selects the token pipeline: "stream" (single-pass columnar
+    TokenTable) or "legacy" (pandas DataFrame). categorizer selects how the
+    stream engine categorizes tokens: "rules" or tree-sitter "query".
+    schema selects the output format (see SCHEMAS). stream writes each line
+    as soon as it is built instead of assembling the whole snippet first
+    (same bytes either way). json_backend names the JSON encoder (see
+    json_backend.BACKENDS; default from $TREETYPE_JSON_BACKEND or "auto").
+    output_format "pack" writes a binary .ttsp snippet pack instead of JSON
+    (schema, stream and json_backend do not apply).
+    With a BuildCache, sources whose cache key is unchanged are skipped and
+    their output left untouched.
+    """
+    input_file = Path(input_path)
+
+    # Read once as bytes; validation and parsing share the buffer
+    source = read_source(input_file) if input_file.is_file() else None
+
     # Validate
-    valid, error = validate_file(input_path)
+    valid, error = validate_file(input_path, source)
     if not valid:
         print(f"❌ Error: {error}")
         return False
 
-    input_file = Path(input_path)
     language = LANGUAGE_EXTENSIONS[input_file.suffix]
 
     # Determine output path
     if output_path is None:
-        output_path = Path("snippets") / language / f"{input_file.stem}.json"
+        suffix = snippet_pack.PACK_SUFFIX if output_format == "pack" else ".json"
+        output_path = Path("snippets") / language / f"{input_file.stem}{suffix}"
     else:
         output_path = Path(output_path)
 
-    # Read source
-    with open(input_file, "r", encoding="utf-8") as f:
-        source_code = f.read()
+    # Skip unchanged sources
+    if cache is not None:
+        options = {"engine": engine, "categorizer": categorizer}
+        if output_format == "pack":
+            options["format"] = "pack"
+        else:
+            options["schema"] = schema
+        cache_key = build_cache_key(source, language, options)
+        if cache.is_fresh(input_file, cache_key, output_path):
+            if not quiet:
+                print(f"⏭️  Unchanged: {input_file.name} -> {output_path}")
+            return True
 
     # Parse
     if not quiet:
@@ -408,37 +1543,189 @@ def process_file(input_path, output_path=None, quiet=False):
         print(f"{'='*70}\n")
 
     lang, parser = PARSERS[language]
-    df = parse_code_to_dataframe(source_code, parser, language)
-
-    if not quiet:
-        print(f"Total tokens: {len(df)}")
-        print(f"Base typeable: {df['BASE_TYPEABLE'].sum()}")
-        print(f"Lines: {df['START_ROW'].nunique()}")
-
-    # Convert to JSON
-    json_data = dataframe_to_json(df, source_code, language)
+    if output_format == "pack":
+        # Packs store offsets implicitly; skip building char_map
+        schema = 2
+    if engine == "legacy":
+        source_code = source.decode("utf-8")
+        df = parse_code_to_dataframe(source_code, parser, language)
+
+        if not quiet:
+            print(f"Total tokens: {len(df)}")
+            print(f"Base typeable: {df['BASE_TYPEABLE'].sum()}")
+            print(f"Lines: {df['START_ROW'].nunique()}")
+
+        total_lines = df["START_ROW"].nunique()
+        lines = iter_dataframe_lines(df, source_code, schema)
+    else:
+        if cache is not None:
+            stages = stage_keys(source, language, categorizer)
+            table = build_token_table_cached(
+                source, parser, language, categorizer, cache, stages
+            )
+        else:
+            table = build_token_table(source, parser, language, categorizer)
+
+        if not quiet:
+            print(f"Total tokens: {len(table)}")
+            print(f"Base typeable: {table.typeable_count()}")
+            print(f"Lines: {table.line_count()}")
+
+        total_lines = table.line_count()
+        lines = iter_token_table_lines(table, schema)
+
+    typeable_chars = 0
+    line_count = 0
+    identifiers = set()
+
+    def count_typeable(lines):
+        nonlocal typeable_chars, line_count
+        for line in lines:
+            typeable_chars += len(line["typing_sequence"])
+            line_count += 1
+            for token in line["display_tokens"]:
+                if token["type"].endswith("identifier"):
+                    identifiers.add(token["text"])
+            yield line
 
     # Write output
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(json_data, f, indent=2, ensure_ascii=False)
+    backend = get_backend(json_backend)
+    # Stream into a sibling temp file and swap it in on success, so a failure
+    # mid-emission never leaves a truncated snippet or loses the previous one
+    tmp_path = output_path.with_name(f"{output_path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "wb") as raw_file:
+            f = HashingWriter(raw_file)
+            if output_format == "pack":
+                f.write(
+                    snippet_pack.pack_snippet(
+                        language, total_lines, count_typeable(lines)
+                    )
+                )
+            elif stream:
+                write_snippet_stream(
+                    f, language, total_lines, count_typeable(lines), schema, backend
+                )
+            else:
+                json_data = snippet_json(language, list(count_typeable(lines)), schema)
+                write_snippet_json(json_data, f, schema, backend)
+        tmp_path.replace(output_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    if cache is not None:
+        if engine == "legacy":
+            cache.record(input_file, cache_key, output_path)
+        else:
+            cache.record(input_file, cache_key, output_path, stages=stages)
+        # Stats for build_metadata.py, so it need not decode the snippet
+        cache.record_output(
+            output_path,
+            f.hexdigest(),
+            language=language,
+            schema_version=schema,
+            format=output_format,
+            lines=line_count,
+            typeable_chars=typeable_chars,
+            identifiers=sorted(identifiers),
+        )
 
     if not quiet:
         print(f"\n✅ Snippet generated: {output_path}")
-        print(f"   Lines: {json_data['total_lines']}")
-        typeable_chars = sum(
-            len(line.get("typing_sequence", "")) for line in json_data["lines"]
-        )
+        print(f"   Lines: {total_lines}")
         print(f"   Typeable characters: {typeable_chars}")
 
     return True
 
 
+# ============================================================================
+# BATCH PROCESSING
+# ============================================================================
+
+
+_WORKER_CACHE = None
+
+
+def _init_worker(languages, cache_dir, force):
+    """Pool initializer: load each needed grammar, its tables and the cache once"""
+    global _WORKER_CACHE
+    if cache_dir is not None:
+        _WORKER_CACHE = BuildCache(cache_dir, force=force)
+    if any(name not in PARSERS for name in languages):
+        load_plugin_languages()
+    for name in languages:
+        language, _ = PARSERS[name]
+        get_kind_table(name, language)
+
+
+def _process_file_worker(filepath, options):
+    """Run process_file in a worker, capturing its console output"""
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        ok = process_file(filepath, None, cache=_WORKER_CACHE, **options)
+    cache_updates = _WORKER_CACHE.drain() if _WORKER_CACHE is not None else None
+    return ok, buffer.getvalue(), cache_updates
+
+
+def process_files_parallel(files_to_process, jobs, options, cache=None):
+    """
+    Process files across a pool of worker processes.
+
+    Yields one success flag per file in input order; each worker's console
+    output is replayed in the same order so logs read like a sequential run.
+    Workers check their own copy of the cache; their new entries and hit/miss
+    counts are merged into cache here.
+    """
+    # Imported here: multiprocessing costs single-file runs ~40 ms at startup
+    from concurrent.futures import ProcessPoolExecutor
+
+    suffixes = {Path(f).suffix for f in files_to_process}
+    languages = sorted(
+        LANGUAGE_EXTENSIONS[suffix]
+        for suffix in suffixes
+        if suffix in LANGUAGE_EXTENSIONS
+    )
+    chunksize = max(1, len(files_to_process) // (jobs * 4))
+
+    cache_args = (cache.cache_dir, cache.force) if cache is not None else (None, False)
+
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(languages, *cache_args),
+    ) as pool:
+        results = pool.map(
+            _process_file_worker,
+            files_to_process,
+            repeat(options),
+            chunksize=chunksize,
+        )
+        for ok, output, cache_updates in results:
+            if output:
+                print(output, end="")
+            if cache is not None:
+                cache.merge(*cache_updates)
+            yield ok
+
+
 # ============================================================================
 # CLI
 # ============================================================================
 
 
+def print_startup_report():
+    """Print the timings collected in STARTUP_TIMINGS"""
+    print(f"\n{'='*70}")
+    print("STARTUP REPORT")
+    print(f"{'='*70}")
+    for label, seconds in STARTUP_TIMINGS:
+        print(f"  {label:<40}{seconds * 1000:>10.1f} ms")
+    total = time.perf_counter() - _IMPORT_START
+    print(f"  {'total (since module import)':<40}{total * 1000:>10.1f} ms")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="treetype Parser - Convert source code to typing snippets",
@@ -456,10 +1743,28 @@ Examples:
   
   # Batch process directory
   python build/parse_json.py sources/python/
+
+  # Batch process directory on 8 worker processes (0 = all cores)
+  python build/parse_json.py sources/ --jobs 8
+
+  # Rebuild everything, ignoring the build cache
+  python build/parse_json.py sources/ --force
   
   # Quiet mode (no output except errors)
   python build/parse_json.py sources/python/views.py -q
 
+  # Use the legacy pandas token engine
+  python build/parse_json.py sources/python/views.py --engine legacy
+
+  # Categorize with tree-sitter queries (adds keyword/identifier)
+  python build/parse_json.py sources/python/views.py --categorizer query
+
+  # Write the compact v2 schema (token_offsets instead of char_map)
+  python build/parse_json.py sources/ --schema 2
+
+  # Write binary snippet packs (.ttsp) instead of JSON
+  python build/parse_json.py sources/ --format pack
+
 Supported languages:
   .py   -> Python
   .js   -> JavaScript
@@ -473,19 +1778,91 @@ Supported languages:
     parser.add_argument(
         "-o",
         "--output",
-        help="Output path (default: snippets/<language>/<filename>.json)",
+        help="Output path (default: snippets/<language>/<filename>.json or .ttsp)",
     )
     parser.add_argument(
         "-q", "--quiet", action="store_true", help="Quiet mode (minimal output)"
     )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="stream",
+        help="Token engine: single-pass 'stream' (default) or pandas 'legacy'",
+    )
+    parser.add_argument(
+        "--categorizer",
+        choices=CATEGORIZERS,
+        default="rules",
+        help="Token categorization: built-in 'rules' (default) or queries/*.scm",
+    )
+    parser.add_argument(
+        "--schema",
+        type=int,
+        choices=SCHEMAS,
+        default=1,
+        help="Output schema: 1 = pretty char_map (default), 2 = compact token_offsets",
+    )
+    parser.add_argument(
+        "--format",
+        dest="output_format",
+        choices=FORMATS,
+        default="json",
+        help="Output format: 'json' snippets (default) or binary 'pack' (.ttsp)",
+    )
+    parser.add_argument(
+        "--no-stream",
+        dest="stream",
+        action="store_false",
+        help="Build each snippet in memory before writing (default: stream lines)",
+    )
+    parser.add_argument(
+        "--json-backend",
+        choices=JSON_BACKENDS,
+        default=None,
+        help=(
+            f"JSON encoder (default: ${JSON_BACKEND_ENV} or 'auto', which prefers "
+            "orjson > msgspec > stdlib); output bytes are the same for all"
+        ),
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for batch runs (default: 1, 0 = all cores)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-parse every source even if the build cache says it is unchanged",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        type=Path,
+        help=f"Build cache directory (default: {DEFAULT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--startup-report",
+        action="store_true",
+        help="Print import/grammar initialisation timings when done",
+    )
 
     args = parser.parse_args()
 
+    if args.engine == "legacy" and args.categorizer != "rules":
+        parser.error("--categorizer query requires the stream engine")
+    try:
+        get_backend(args.json_backend)
+    except (ImportError, ValueError) as e:
+        parser.error(f"JSON backend unavailable: {e}")
+
     # Collect all files to process
     files_to_process = []
     for input_item in args.input:
         path = Path(input_item)
         if path.is_dir():
+            load_plugin_languages()
             # Recursively find supported files
             for ext in LANGUAGE_EXTENSIONS.keys():
                 files_to_process.extend(path.rglob(f"*{ext}"))
@@ -500,24 +1877,62 @@ Supported languages:
         return 1
 
     # Process files
+    cache = BuildCache(args.cache_dir, force=args.force)
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
     success_count = 0
-    for filepath in files_to_process:
-        # Can only specify output for single file
-        output = args.output if len(files_to_process) == 1 else None
-
-        if process_file(filepath, output, args.quiet):
-            success_count += 1
+    if jobs > 1 and len(files_to_process) > 1:
+        options = {
+            "quiet": args.quiet,
+            "engine": args.engine,
+            "categorizer": args.categorizer,
+            "schema": args.schema,
+            "stream": args.stream,
+            "json_backend": args.json_backend,
+            "output_format": args.output_format,
+        }
+        success_count = sum(
+            process_files_parallel(files_to_process, jobs, options, cache)
+        )
+    else:
+        for filepath in files_to_process:
+            # Can only specify output for single file
+            output = args.output if len(files_to_process) == 1 else None
+
+            if process_file(
+                filepath,
+                output,
+                args.quiet,
+                args.engine,
+                args.categorizer,
+                cache,
+                args.schema,
+                args.stream,
+                args.json_backend,
+                args.output_format,
+            ):
+                success_count += 1
+    cache.save()
 
     # Summary
     if not args.quiet and len(files_to_process) > 1:
         print(f"\n{'='*70}")
         print(f"✅ Processed {success_count}/{len(files_to_process)} file(s)")
+        print(f"   Cache: {cache.hits} unchanged, {cache.misses} rebuilt")
+        if cache.stage_counts:
+            counts = []
+            for stage in STAGES:
+                reused, rebuilt = cache.stage_counts.get(stage, (0, 0))
+                counts.append(f"{stage} {reused}/{rebuilt}")
+            print(f"   Stages (reused/rebuilt): {', '.join(counts)}")
         print(f"{'='*70}")
         print("\nNext steps:")
         print("  1. Run: python build/build_metadata.py")
         print("  2. Test locally: python -m http.server 8000")
         print("  3. Commit and push to deploy")
 
+    if args.startup_report:
+        print_startup_report()
+
     return 0 if success_count == len(files_to_process) else 1
 
 
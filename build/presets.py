@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+treetype Typing Presets
+Build-time evaluation of the frontend typing-mode presets (src/data/presets.json)
+"""
+
+import json
+from pathlib import Path
+
+HEX_DIGITS = "0123456789abcdef"
+
+PRESETS_FILE = Path(__file__).resolve().parents[1] / "src" / "data" / "presets.json"
+
+# Characters JavaScript's String.prototype.trim() strips (differs from
+# str.isspace, e.g. U+001C-U+001F, U+0085, U+FEFF)
+JS_WHITESPACE = frozenset(
+    "\t\n\v\f\r \u00a0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006"
+    "\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000\ufeff"
+)
+
+
+def load_presets(path=PRESETS_FILE):
+    """Preset name -> {"exclude": set, "include_specific": set}, in file order"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {
+        name: {
+            "exclude": frozenset(config["exclude"]),
+            "include_specific": frozenset(config.get("includeSpecific", ())),
+        }
+        for name, config in data.items()
+    }
+
+
+PRESETS = load_presets()
+
+
+# ============================================================================
+# TYPEABILITY (mirrors applyExclusionConfig in src/core/config.ts)
+# ============================================================================
+
+
+def is_jsx_tag_name(tokens, idx):
+    """
+    The frontend's isJSXTagName heuristic: identifier right after < or </
+    with a closing > or /> later on the line. The client applies it on top of
+    the jsx_tag_name category, so preset masks do too: it also hides TS
+    generic arguments (Promise<User>), as it always has.
+    """
+    if tokens[idx]["type"] not in ("identifier", "type_identifier"):
+        return False
+    if idx == 0 or tokens[idx - 1]["text"] not in ("<", "</"):
+        return False
+    for token in tokens[idx + 1 :]:
+        if token["text"] in (">", "/>"):
+            return True
+        if token["text"] == "<":
+            return False
+    return False
+
+
+def preset_tables(tokens, presets=PRESETS):
+    """
+    ({preset: mask}, {preset: typing length}) for one line's display tokens.
+
+    Mask bits follow encode_mask(); typing length is in UTF-16 code units
+    (JavaScript string length). Per-token facts are worked out once and
+    shared by every preset.
+    """
+    # (bit, text, categories, is JSX tag name, UTF-16 length) of every token
+    # that any preset could make typeable
+    candidates = []
+    for idx, token in enumerate(tokens):
+        text = token["text"]
+        if not token["base_typeable"] or all(c in JS_WHITESPACE for c in text):
+            continue  # Whitespace / non-typeable: never typeable
+        categories = token["categories"]
+        candidates.append(
+            (
+                1 << idx,
+                text,
+                categories,
+                "jsx_tag_name" in categories or is_jsx_tag_name(tokens, idx),
+                len(text.encode("utf-16-le")) // 2,
+            )
+        )
+
+    masks = {}
+    lengths = {}
+    for name, preset in presets.items():
+        exclude = preset["exclude"]
+        include_specific = preset["include_specific"]
+        hide_tag_names = "angle_bracket" in exclude
+        bits = 0
+        length = 0
+        for bit, text, categories, tag_name, units in candidates:
+            if tag_name and hide_tag_names:
+                continue
+            if text in include_specific or not any(c in exclude for c in categories):
+                bits |= bit
+                length += units
+        masks[name] = encode_mask(bits, len(tokens))
+        lengths[name] = length
+    return masks, lengths
+
+
+def encode_mask(bits, token_count):
+    """Hex string of a token bitset; digit k holds tokens 4k..4k+3, lowest bit first"""
+    return "".join(HEX_DIGITS[bits >> shift & 15] for shift in range(0, token_count, 4))
+
+
+def decode_mask(mask, token_count):
+    """Per-token flags from an encode_mask() string"""
+    return [
+        bool(int(mask[idx >> 2], 16) >> (idx & 3) & 1) for idx in range(token_count)
+    ]
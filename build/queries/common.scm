@@ -0,0 +1,14 @@
+; Shared text rules for named leaves (e.g. a string_content of "+").
+; Anonymous tokens are categorized by kind in the per-language files.
+
+((_) @string_delimiter (#any-of? @string_delimiter "\"" "'" "`"))
+((_) @punctuation (#any-of? @punctuation ":" ";" "," "."))
+((_) @parenthesis (#any-of? @parenthesis "(" ")"))
+((_) @curly_brace (#any-of? @curly_brace "{" "}"))
+((_) @square_bracket (#any-of? @square_bracket "[" "]"))
+((_) @angle_bracket (#any-of? @angle_bracket "<" ">" "</" "/>"))
+((_) @operator
+  (#any-of? @operator
+    "!" "!=" "!==" "%" "%=" "&" "&&" "*" "**" "*=" "+" "++" "+=" "-" "--"
+    "-=" "->" "..." "/" "//" "/=" ":" "<<" "<=" "=" "==" "===" "=>" ">="
+    ">>" "?" "?." "??" "^" "|" "||" "~"))
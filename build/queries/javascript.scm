@@ -0,0 +1,46 @@
+; JavaScript token categories (see parse_json.categorize_token)
+; Anonymous tokens are listed by kind; common.scm covers named leaves
+; whose whole text is a delimiter, mark or operator.
+
+; Comments
+(comment) @comment
+(html_comment) @comment
+
+; String content
+(jsx_text) @string_content
+(string_fragment) @string_content
+
+; String delimiters
+["\"" "'" "`"] @string_delimiter
+
+; Punctuation
+["," "." ":" ";"] @punctuation
+
+; Brackets
+["(" ")"] @parenthesis
+["{" "}"] @curly_brace
+["[" "]"] @square_bracket
+["/>" "<" "</" ">"] @angle_bracket
+
+; Operators
+[
+  "!" "!=" "!==" "%" "%=" "&" "&&" "*" "**" "*=" "+" "++" "+=" "-" "--" "-="
+  "..." "/" "/=" ":" "<<" "<=" "=" "==" "===" "=>" ">=" ">>" "?" "??" "^" "|"
+  "||" "~"
+] @operator
+
+; Keywords
+[
+  "as" "async" "await" "break" "case" "catch" "class" "const" "continue"
+  "debugger" "default" "delete" "do" "else" "export" "extends" "finally" "for"
+  "from" "function" "get" "if" "import" "in" "instanceof" "let" "meta" "new"
+  "of" "return" "set" "static" "switch" "target" "throw" "try" "typeof"
+  "using" "var" "void" "while" "with" "yield"
+] @keyword
+
+; Identifiers
+[
+  (identifier) (private_property_identifier) (property_identifier)
+  (shorthand_property_identifier) (shorthand_property_identifier_pattern)
+  (statement_identifier)
+] @identifier
@@ -0,0 +1,7 @@
+; JSX element names (tsx/javascript). Every named leaf under a captured
+; name (identifier, member_expression or jsx_namespace_name parts) gets the
+; jsx_tag_name category; see parse_json.jsx_tag_name_ids.
+
+(jsx_opening_element name: (_) @jsx_tag_name)
+(jsx_closing_element name: (_) @jsx_tag_name)
+(jsx_self_closing_element name: (_) @jsx_tag_name)
@@ -0,0 +1,38 @@
+; Python token categories (see parse_json.categorize_token)
+; Anonymous tokens are listed by kind; common.scm covers named leaves
+; whose whole text is a delimiter, mark or operator.
+
+; Comments
+(comment) @comment
+
+; String content
+(string_content) @string_content
+
+; String delimiters
+[(string_start) (string_end)] @string_delimiter.node
+
+; Punctuation
+["," "." ":" ";"] @punctuation
+
+; Brackets
+["(" ")"] @parenthesis
+["{" "}"] @curly_brace
+["[" "]"] @square_bracket
+["<" ">"] @angle_bracket
+
+; Operators
+[
+  "!=" "%" "%=" "&" "*" "**" "*=" "+" "+=" "-" "-=" "->" "/" "//" "/=" ":"
+  "<<" "<=" "=" "==" ">=" ">>" "^" "|" "~"
+] @operator
+
+; Keywords
+[
+  "and" "as" "assert" "async" "await" "break" "case" "class" "continue" "def"
+  "del" "elif" "else" "except" "finally" "for" "from" "global" "if" "import"
+  "in" "is" "lambda" "match" "nonlocal" "not" "or" "pass" "raise" "return"
+  "try" "type" "while" "with" "yield"
+] @keyword
+
+; Identifiers
+(identifier) @identifier
@@ -0,0 +1,50 @@
+; TypeScript token categories (see parse_json.categorize_token)
+; Anonymous tokens are listed by kind; common.scm covers named leaves
+; whose whole text is a delimiter, mark or operator.
+
+; Comments
+(comment) @comment
+(html_comment) @comment
+
+; String content
+(jsx_text) @string_content
+(string_fragment) @string_content
+
+; String delimiters
+["\"" "'" "`"] @string_delimiter
+
+; Punctuation
+["," "." ":" ";"] @punctuation
+
+; Brackets
+["(" ")"] @parenthesis
+["{" "}"] @curly_brace
+["[" "]"] @square_bracket
+["<" ">"] @angle_bracket
+
+; Operators
+[
+  "!" "!=" "!==" "%" "%=" "&" "&&" "*" "**" "*=" "+" "++" "+=" "-" "--" "-="
+  "..." "/" "/=" ":" "<<" "<=" "=" "==" "===" "=>" ">=" ">>" "?" "?." "??" "^"
+  "|" "||" "~"
+] @operator
+
+; Keywords
+[
+  "abstract" "accessor" "any" "as" "assert" "asserts" "async" "await"
+  "boolean" "break" "case" "catch" "class" "const" "continue" "debugger"
+  "declare" "default" "delete" "do" "else" "enum" "export" "extends" "finally"
+  "for" "from" "function" "get" "global" "if" "implements" "import" "in"
+  "infer" "instanceof" "interface" "is" "keyof" "let" "meta" "module"
+  "namespace" "never" "new" "number" "object" "of" "override" "private"
+  "protected" "public" "readonly" "require" "return" "satisfies" "set"
+  "static" "string" "switch" "symbol" "target" "throw" "try" "type" "typeof"
+  "unknown" "using" "var" "void" "while" "with" "yield"
+] @keyword
+
+; Identifiers
+[
+  (identifier) (private_property_identifier) (property_identifier)
+  (shorthand_property_identifier) (shorthand_property_identifier_pattern)
+  (statement_identifier) (type_identifier)
+] @identifier
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+treetype Search Index
+Build-time inverted index over snippet names (trigrams), tags and optionally
+identifiers, written by build_metadata.py to snippets/search/, with a query
+API and CLI over the same files.
+
+Layout:
+  search/manifest.json  {"version", "ngram", "docs": [[id, name], ...],
+                         "fields": [...], "shards": [shard keys]}
+  search/<key>.json     {"<field>:<term>": [delta-encoded doc numbers], ...}
+
+Terms are lowercase. "n:" terms are name trigrams, "t:" tags and "i:"
+identifiers. A term lives in the shard named after its first character
+(anything outside a-z/0-9 goes to "_"). Posting lists hold ascending doc
+numbers (indexes into "docs") as the first number followed by gaps.
+
+Usage:
+  python build/search_index.py decorator             # query snippets/search
+  python build/search_index.py usestate --index-dir public/search
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from json_backend import get_backend
+
+SEARCH_DIR_NAME = "search"
+SEARCH_VERSION = 1
+NGRAM = 3
+
+NAME_FIELD = "n"
+TAG_FIELD = "t"
+IDENTIFIER_FIELD = "i"
+
+
+# ============================================================================
+# TERMS AND POSTINGS
+# ============================================================================
+
+
+def ngrams(text, n=NGRAM):
+    """Distinct n-grams of text, in first-seen order"""
+    return list(dict.fromkeys(text[i : i + n] for i in range(len(text) - n + 1)))
+
+
+def shard_key(term):
+    """Shard of a field-prefixed term: first character of its body"""
+    char = term.split(":", 1)[1][:1]
+    return char if char.isascii() and char.isalnum() else "_"
+
+
+def delta_encode(doc_numbers):
+    previous = 0
+    gaps = []
+    for number in doc_numbers:
+        gaps.append(number - previous)
+        previous = number
+    return gaps
+
+
+def delta_decode(gaps):
+    total = 0
+    numbers = []
+    for gap in gaps:
+        total += gap
+        numbers.append(total)
+    return numbers
+
+
+def document_terms(snippet, identifiers=()):
+    """Field-prefixed index terms of one metadata entry"""
+    terms = {f"{NAME_FIELD}:{gram}" for gram in ngrams(snippet["name"].lower())}
+    terms.update(f"{TAG_FIELD}:{tag.lower()}" for tag in snippet["tags"])
+    terms.update(f"{IDENTIFIER_FIELD}:{name.lower()}" for name in identifiers)
+    return terms
+
+
+# ============================================================================
+# WRITER
+# ============================================================================
+
+
+def write_search_index(snippets, snippets_dir, identifiers=None, backend=None):
+    """
+    Write the index for metadata entries under <snippets_dir>/search/.
+
+    identifiers maps snippet id -> identifier names; None leaves "i:" terms
+    out. Returns (term count, shard count).
+    """
+    backend = backend or get_backend()
+    search_dir = Path(snippets_dir) / SEARCH_DIR_NAME
+    search_dir.mkdir(parents=True, exist_ok=True)
+
+    postings = {}
+    for doc, snippet in enumerate(snippets):
+        names = identifiers.get(snippet["id"], ()) if identifiers is not None else ()
+        for term in document_terms(snippet, names):
+            postings.setdefault(term, []).append(doc)
+
+    shards = {}
+    for term in sorted(postings):
+        shards.setdefault(shard_key(term), {})[term] = delta_encode(postings[term])
+
+    # Replace shards from a previous build that no longer exist
+    for stale in search_dir.glob("*.json"):
+        if stale.stem not in shards and stale.name != "manifest.json":
+            stale.unlink()
+    for key, terms in shards.items():
+        (search_dir / f"{key}.json").write_bytes(backend.dumps(terms))
+
+    fields = [NAME_FIELD, TAG_FIELD]
+    if identifiers is not None:
+        fields.append(IDENTIFIER_FIELD)
+    manifest = {
+        "version": SEARCH_VERSION,
+        "ngram": NGRAM,
+        "fields": fields,
+        "docs": [[snippet["id"], snippet["name"]] for snippet in snippets],
+        "shards": sorted(shards),
+    }
+    (search_dir / "manifest.json").write_bytes(backend.dumps(manifest))
+    return len(postings), len(shards)
+
+
+# ============================================================================
+# QUERIES
+# ============================================================================
+
+
+class SearchIndex:
+    """Query API over a written index; shards are loaded on first use"""
+
+    def __init__(self, search_dir, backend=None):
+        self.search_dir = Path(search_dir)
+        self.backend = backend or get_backend()
+        manifest = self.backend.loads((self.search_dir / "manifest.json").read_bytes())
+        if manifest["version"] != SEARCH_VERSION:
+            raise ValueError(f"Unsupported search index version: {manifest['version']}")
+        self.ngram = manifest["ngram"]
+        self.fields = manifest["fields"]
+        self.ids = [doc_id for doc_id, _ in manifest["docs"]]
+        self.names = [name.lower() for _, name in manifest["docs"]]
+        self._shard_keys = set(manifest["shards"])
+        self._shards = {}
+
+    def _shard(self, key):
+        shard = self._shards.get(key)
+        if shard is None:
+            if key in self._shard_keys:
+                shard = self.backend.loads(
+                    (self.search_dir / f"{key}.json").read_bytes()
+                )
+            else:
+                shard = {}
+            self._shards[key] = shard
+        return shard
+
+    def postings(self, term):
+        """Doc numbers for a field-prefixed term, e.g. t:python"""
+        return delta_decode(self._shard(shard_key(term)).get(term, ()))
+
+    def _name_matches(self, text):
+        """Docs whose name contains text (trigram candidates, then verified)"""
+        if len(text) < self.ngram:
+            return {doc for doc, name in enumerate(self.names) if text in name}
+        candidates = None
+        for gram in sorted(ngrams(text, self.ngram)):
+            docs = set(self.postings(f"{NAME_FIELD}:{gram}"))
+            candidates = docs if candidates is None else candidates & docs
+            if not candidates:
+                return set()
+        return {doc for doc in candidates if text in self.names[doc]}
+
+    def search(self, query):
+        """
+        Ids of snippets whose name contains query, or with a tag or (when
+        indexed) an identifier equal to it; case-insensitive, in doc order.
+        """
+        text = query.strip().lower()
+        if not text:
+            return list(self.ids)
+        docs = self._name_matches(text)
+        docs.update(self.postings(f"{TAG_FIELD}:{text}"))
+        if IDENTIFIER_FIELD in self.fields:
+            docs.update(self.postings(f"{IDENTIFIER_FIELD}:{text}"))
+        return [self.ids[doc] for doc in sorted(docs)]
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="treetype Search Index - Query the snippet search index"
+    )
+    parser.add_argument("query", help="Name substring, tag or identifier")
+    parser.add_argument(
+        "--index-dir",
+        default=Path("snippets") / SEARCH_DIR_NAME,
+        type=Path,
+        help=f"Search index directory (default: snippets/{SEARCH_DIR_NAME})",
+    )
+    args = parser.parse_args()
+
+    if not (args.index_dir / "manifest.json").is_file():
+        print(f"❌ Error: No search index in {args.index_dir}")
+        print("   Run python build/build_metadata.py first.")
+        return 1
+
+    index = SearchIndex(args.index_dir)
+    start = time.perf_counter()
+    results = index.search(args.query)
+    elapsed = time.perf_counter() - start
+
+    for snippet_id in results:
+        print(f"  {snippet_id}")
+    print(f"\n✅ {len(results)} match(es) in {elapsed * 1000:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+treetype Snippet Pack
+Binary snippet format (.ttsp): interned string tables, varint columns and
+category/preset bitmasks. Decodes back to the JSON snippet layout in one pass.
+
+Layout (all integers unsigned LEB128 varints unless noted, strings are a
+varint byte length followed by UTF-8):
+
+  b"TTSP"  version (1 byte)
+  language  total_lines
+  types:      count, string*          token type names
+  categories: count, string*          category name of each mask bit
+  presets:    count, string*          preset name of each preset flag bit
+  lines (total_lines times):
+    line_number - previous line_number - 1   (previous starts at -1)
+    indent_level  actual_line  token_count
+    tokens (token_count times):
+      type index  category mask
+      flags: bit 0 base_typeable, bit 1 text is actual_line[start:end]
+             (byte columns), bit 2+i typeable under preset i
+      zigzag(start_col - previous end_col)   (previous starts at 0)
+      zigzag(end_col - start_col)
+      text (only when flag bit 1 is clear)
+
+Usage:
+  python build/snippet_pack.py verify snippets/      # round-trip every JSON
+  python build/snippet_pack.py pack snippets/python/foo.json
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from json_backend import get_backend
+from presets import PRESETS, decode_mask, encode_mask
+from token_table import CATEGORY_BITS, categories_to_mask, mask_to_categories
+
+MAGIC = b"TTSP"
+VERSION = 1
+PACK_SUFFIX = ".ttsp"
+
+BASE_TYPEABLE_FLAG = 1 << 0
+TEXT_IN_LINE_FLAG = 1 << 1
+PRESET_FLAG_SHIFT = 2
+
+
+# ============================================================================
+# VARINTS
+# ============================================================================
+
+
+def write_varint(out, value):
+    """Append an unsigned LEB128 varint to a bytearray"""
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def write_zigzag(out, value):
+    write_varint(out, (value << 1) if value >= 0 else ((-value << 1) - 1))
+
+
+def write_string(out, text):
+    data = text.encode("utf-8")
+    write_varint(out, len(data))
+    out += data
+
+
+class PackReader:
+    """Sequential decoder over a pack buffer"""
+
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def varint(self):
+        data = self.data
+        pos = self.pos
+        byte = data[pos]
+        value = byte & 0x7F
+        shift = 7
+        while byte & 0x80:
+            pos += 1
+            byte = data[pos]
+            value |= (byte & 0x7F) << shift
+            shift += 7
+        self.pos = pos + 1
+        return value
+
+    def zigzag(self):
+        value = self.varint()
+        return (value >> 1) if not value & 1 else -((value + 1) >> 1)
+
+    def raw(self, length):
+        start = self.pos
+        self.pos += length
+        return self.data[start : self.pos]
+
+    def string(self):
+        return str(self.raw(self.varint()), "utf-8")
+
+    def strings(self):
+        return [self.string() for _ in range(self.varint())]
+
+
+# ============================================================================
+# WRITER
+# ============================================================================
+
+
+def pack_snippet(language_name, total_lines, lines, presets=PRESETS):
+    """
+    Encode a snippet as pack bytes.
+
+    lines yields line objects in the schema 1 or schema 2 line layout (with
+    display_tokens dicts and preset_masks); they are consumed one at a time.
+    """
+    preset_names = list(presets)
+    types = []
+    type_codes = {}
+    body = bytearray()
+    previous_line = -1
+
+    for line in lines:
+        actual_line = line["actual_line"]
+        line_bytes = actual_line.encode("utf-8")
+        tokens = line["display_tokens"]
+        preset_flags = [
+            decode_mask(line["preset_masks"][name], len(tokens))
+            for name in preset_names
+        ]
+
+        write_varint(body, line["line_number"] - previous_line - 1)
+        previous_line = line["line_number"]
+        write_varint(body, line["indent_level"])
+        write_string(body, actual_line)
+        write_varint(body, len(tokens))
+
+        previous_end = 0
+        for idx, token in enumerate(tokens):
+            code = type_codes.get(token["type"])
+            if code is None:
+                code = type_codes[token["type"]] = len(types)
+                types.append(token["type"])
+            start_col = token["start_col"]
+            end_col = token["end_col"]
+            text = token["text"]
+            text_in_line = line_bytes[start_col:end_col] == text.encode("utf-8")
+
+            flags = BASE_TYPEABLE_FLAG if token["base_typeable"] else 0
+            if text_in_line:
+                flags |= TEXT_IN_LINE_FLAG
+            for bit, typeable in enumerate(preset_flags):
+                if typeable[idx]:
+                    flags |= 1 << (PRESET_FLAG_SHIFT + bit)
+
+            write_varint(body, code)
+            write_varint(body, categories_to_mask(token["categories"]))
+            write_varint(body, flags)
+            write_zigzag(body, start_col - previous_end)
+            write_zigzag(body, end_col - start_col)
+            if not text_in_line:
+                write_string(body, text)
+            previous_end = end_col
+
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    write_string(out, language_name)
+    write_varint(out, total_lines)
+    for table in (types, [name for name, _ in CATEGORY_BITS], preset_names):
+        write_varint(out, len(table))
+        for name in table:
+            write_string(out, name)
+    out += body
+    return bytes(out)
+
+
+def pack_snippet_json(json_data):
+    """Encode a loaded JSON snippet (any schema) as pack bytes"""
+    from parse_json import decode_snippet
+
+    json_data = decode_snippet(json_data)
+    return pack_snippet(
+        json_data["language"], json_data["total_lines"], json_data["lines"]
+    )
+
+
+# ============================================================================
+# READER
+# ============================================================================
+
+
+def unpack_snippet(data, schema=1):
+    """Decode pack bytes into the JSON snippet object of the given schema"""
+    from parse_json import snippet_json
+
+    reader = PackReader(data)
+    if bytes(reader.raw(4)) != MAGIC:
+        raise ValueError("Not a treetype snippet pack")
+    version = reader.raw(1)[0]
+    if version != VERSION:
+        raise ValueError(f"Unsupported snippet pack version: {version}")
+
+    language_name = reader.string()
+    total_lines = reader.varint()
+    types = reader.strings()
+    category_names = reader.strings()
+    preset_names = reader.strings()
+
+    # Category bitmasks are laid out like token_table.CATEGORY_BITS
+    if category_names != [name for name, _ in CATEGORY_BITS]:
+        raise ValueError("Snippet pack uses a different category layout")
+
+    lines_data = []
+    line_number = -1
+    for _ in range(total_lines):
+        line_number += reader.varint() + 1
+        indent_level = reader.varint()
+        actual_line = reader.string()
+        line_bytes = actual_line.encode("utf-8")
+
+        display_tokens = []
+        preset_bits = [0] * len(preset_names)
+        preset_lengths = [0] * len(preset_names)
+        typing_parts = []
+        previous_end = 0
+        for idx in range(reader.varint()):
+            token_type = types[reader.varint()]
+            categories = mask_to_categories(reader.varint())
+            flags = reader.varint()
+            start_col = previous_end + reader.zigzag()
+            end_col = start_col + reader.zigzag()
+            if flags & TEXT_IN_LINE_FLAG:
+                text = str(line_bytes[start_col:end_col], "utf-8")
+            else:
+                text = reader.string()
+            previous_end = end_col
+
+            base_typeable = bool(flags & BASE_TYPEABLE_FLAG)
+            if base_typeable:
+                typing_parts.append(text)
+            for bit in range(len(preset_names)):
+                if flags >> (PRESET_FLAG_SHIFT + bit) & 1:
+                    preset_bits[bit] |= 1 << idx
+                    preset_lengths[bit] += len(text.encode("utf-16-le")) // 2
+
+            display_tokens.append(
+                {
+                    "text": text,
+                    "type": token_type,
+                    "categories": categories,
+                    "base_typeable": base_typeable,
+                    "start_col": start_col,
+                    "end_col": end_col,
+                }
+            )
+
+        line = {
+            "line_number": line_number,
+            "indent_level": indent_level,
+            "actual_line": actual_line,
+            "display_tokens": display_tokens,
+            "typing_sequence": "".join(typing_parts),
+        }
+        if schema == 2:
+            offsets = []
+            offset = 0
+            for part in typing_parts:
+                offsets.append(offset)
+                offset += len(part)
+            line["token_offsets"] = offsets
+        else:
+            line["char_map"] = _char_map(typing_parts, display_tokens)
+        line["preset_masks"] = {
+            name: encode_mask(bits, len(display_tokens))
+            for name, bits in zip(preset_names, preset_bits)
+        }
+        line["preset_lengths"] = dict(zip(preset_names, preset_lengths))
+        lines_data.append(line)
+
+    return snippet_json(language_name, lines_data, schema)
+
+
+def _char_map(typing_parts, display_tokens):
+    typing_tokens = [t for t in display_tokens if t["base_typeable"]]
+    char_map = {}
+    char_idx = 0
+    for token_idx, token in enumerate(typing_tokens):
+        entry = {"token_idx": token_idx, "display_col": token["start_col"]}
+        for char in token["text"]:
+            char_map[str(char_idx)] = entry
+            char_idx += 1
+    return char_map
+
+
+# ============================================================================
+# ROUND-TRIP VERIFICATION
+# ============================================================================
+
+
+def verify_json_file(json_path, backend=None):
+    """
+    Pack a JSON snippet, unpack it and compare with the original.
+
+    Also checks a sibling .ttsp (as written by parse_json.py --format pack)
+    when one exists. Returns (ok, json bytes, pack bytes).
+    """
+    backend = backend or get_backend()
+    raw = Path(json_path).read_bytes()
+    json_data = backend.loads(raw)
+    schema = json_data.get("schema_version", 1)
+    packed = pack_snippet_json(backend.loads(raw))
+    ok = unpack_snippet(packed, schema) == json_data
+
+    sibling = Path(json_path).with_suffix(PACK_SUFFIX)
+    if sibling.is_file():
+        ok = ok and unpack_snippet(sibling.read_bytes(), schema) == json_data
+    return ok, len(raw), len(packed)
+
+
+def iter_json_files(paths):
+    # Imported here: parse_json imports this module, and build_metadata would
+    # drag the metadata/search index machinery into every parse
+    from build_metadata import is_snippet_file
+
+    for path in map(Path, paths):
+        if path.is_dir():
+            yield from sorted(
+                p for p in path.rglob("*.json") if is_snippet_file(p, path)
+            )
+        else:
+            yield path
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="treetype Snippet Pack - binary snippet format tools"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    verify = subparsers.add_parser(
+        "verify", help="Round-trip JSON snippets through the pack format"
+    )
+    verify.add_argument("paths", nargs="+", help="Snippet JSON files or directories")
+    pack = subparsers.add_parser("pack", help="Write a .ttsp next to each JSON snippet")
+    pack.add_argument("paths", nargs="+", help="Snippet JSON files or directories")
+    args = parser.parse_args()
+
+    backend = get_backend()
+    files = list(iter_json_files(args.paths))
+    if not files:
+        print("❌ Error: No snippet JSON files found")
+        return 1
+
+    if args.command == "pack":
+        for path in files:
+            packed = pack_snippet_json(backend.loads(path.read_bytes()))
+            path.with_suffix(PACK_SUFFIX).write_bytes(packed)
+        print(f"✅ Packed {len(files)} file(s)")
+        return 0
+
+    failures = 0
+    json_total = pack_total = 0
+    for path in files:
+        ok, json_size, pack_size = verify_json_file(path, backend)
+        json_total += json_size
+        pack_total += pack_size
+        if not ok:
+            failures += 1
+            print(f"❌ Round-trip mismatch: {path}")
+
+    print(f"\n{'='*70}")
+    print(f"Verified {len(files) - failures}/{len(files)} file(s)")
+    print(f"JSON: {json_total:,} bytes -> pack: {pack_total:,} bytes", end="")
+    print(f" ({json_total / max(pack_total, 1):.1f}x smaller)")
+    print(f"{'='*70}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+treetype Token Table
+Compact columnar (struct-of-arrays) storage for the tokens of one source file
+"""
+
+import json
+import struct
+import sys
+import zlib
+from array import array
+
+# ============================================================================
+# CATEGORY BITMASKS
+# ============================================================================
+
+# One bit per categorization rule, in the order categorize_token appends
+# categories. The string_delimiter rule can fire twice for one token (a
+# delimiter text AND a string_start/string_end type), so it owns two bits
+# that both decode to "string_delimiter". keyword/identifier are only set by
+# the query categorizer; jsx_tag_name marks JSX element names (tsx/javascript).
+COMMENT = 1 << 0
+STRING_CONTENT = 1 << 1
+STRING_DELIMITER = 1 << 2
+STRING_DELIMITER_NODE = 1 << 3
+PUNCTUATION = 1 << 4
+PARENTHESIS = 1 << 5
+CURLY_BRACE = 1 << 6
+SQUARE_BRACKET = 1 << 7
+ANGLE_BRACKET = 1 << 8
+OPERATOR = 1 << 9
+KEYWORD = 1 << 10
+IDENTIFIER = 1 << 11
+JSX_TAG_NAME = 1 << 12
+
+CATEGORY_BITS = (
+    ("comment", COMMENT),
+    ("string_content", STRING_CONTENT),
+    ("string_delimiter", STRING_DELIMITER),
+    ("string_delimiter", STRING_DELIMITER_NODE),
+    ("punctuation", PUNCTUATION),
+    ("parenthesis", PARENTHESIS),
+    ("curly_brace", CURLY_BRACE),
+    ("square_bracket", SQUARE_BRACKET),
+    ("angle_bracket", ANGLE_BRACKET),
+    ("operator", OPERATOR),
+    ("keyword", KEYWORD),
+    ("identifier", IDENTIFIER),
+    ("jsx_tag_name", JSX_TAG_NAME),
+)
+
+_MASK_CACHE = {}
+
+
+def categories_to_mask(categories):
+    """Encode a categories list as a bitmask (lossless, order-preserving)"""
+    mask = 0
+    for name in categories:
+        for bit_name, bit in CATEGORY_BITS:
+            if bit_name == name and not mask & bit:
+                mask |= bit
+                break
+        else:
+            raise ValueError(f"Unknown token category: {name}")
+    return mask
+
+
+def mask_to_categories(mask):
+    """Decode a category bitmask back into the categories list"""
+    names = _MASK_CACHE.get(mask)
+    if names is None:
+        names = tuple(name for name, bit in CATEGORY_BITS if mask & bit)
+        _MASK_CACHE[mask] = names
+    return list(names)
+
+
+# ============================================================================
+# COLUMN TABLES
+# ============================================================================
+
+# Stage cache blobs: zlib-compressed header, type name table and columns
+STAGE_MAGIC = b"TTST"
+STAGE_FORMAT_VERSION = 1
+_STAGE_HEADER = struct.Struct("<4sBII")
+
+
+class ColumnTable:
+    """
+    Base for struct-of-arrays tables: interned node type names and a compact
+    binary form of selected columns for the on-disk stage cache.
+    """
+
+    def __init__(self):
+        # Interned node type names (type_code indexes into this list)
+        self.types = []
+        self._type_codes = {}
+
+    def __len__(self):
+        return len(self.start_row)
+
+    def intern_type(self, token_type):
+        """Return the int code for a node type name"""
+        code = self._type_codes.get(token_type)
+        if code is None:
+            code = len(self.types)
+            self.types.append(token_type)
+            self._type_codes[token_type] = code
+        return code
+
+    def type_name(self, idx):
+        return self.types[self.type_code[idx]]
+
+    def to_bytes(self, columns, with_types=True):
+        """
+        Serialize columns ((name, storage typecode) pairs) and, optionally,
+        the type name table. Columns are stored little-endian at their
+        storage width, whatever their in-memory typecode.
+        """
+        types = json.dumps(self.types).encode("utf-8") if with_types else b""
+        header = _STAGE_HEADER.pack(
+            STAGE_MAGIC, STAGE_FORMAT_VERSION, len(self), len(types)
+        )
+        parts = [header, types]
+        for name, typecode in columns:
+            column = array(typecode, getattr(self, name))
+            if sys.byteorder == "big":
+                column.byteswap()
+            parts.append(column.tobytes())
+        return zlib.compress(b"".join(parts), 1)
+
+    def load_bytes(self, data, columns):
+        """
+        Restore columns (and the type table, if stored) from to_bytes output.
+        Raises ValueError for anything that is not an intact blob.
+        """
+        try:
+            data = zlib.decompress(data)
+            magic, version, count, types_length = _STAGE_HEADER.unpack_from(data)
+        except (zlib.error, struct.error):
+            raise ValueError("Not a treetype stage blob") from None
+        if magic != STAGE_MAGIC or version != STAGE_FORMAT_VERSION:
+            raise ValueError("Not a treetype stage blob")
+        offset = _STAGE_HEADER.size
+        types = None
+        if types_length:
+            types = json.loads(data[offset : offset + types_length])
+            offset += types_length
+        # Nothing is replaced until the whole blob has been read
+        loaded = {}
+        for name, typecode in columns:
+            column = array(typecode)
+            end = offset + count * column.itemsize
+            if end > len(data):
+                raise ValueError("Truncated or oversized treetype stage blob")
+            column.frombytes(data[offset:end])
+            if sys.byteorder == "big":
+                column.byteswap()
+            current = getattr(self, name).typecode
+            if current != typecode:
+                column = array(current, column)
+            loaded[name] = column
+            offset = end
+        if offset != len(data):
+            raise ValueError("Truncated or oversized treetype stage blob")
+
+        if types is not None:
+            self.types = types
+            self._type_codes = {name: code for code, name in enumerate(types)}
+        for name, column in loaded.items():
+            setattr(self, name, column)
+        return self
+
+
+# ============================================================================
+# LEAF TABLE
+# ============================================================================
+
+# LeafTable.flags bits
+LEAF_MISSING = 1 << 0
+LEAF_JSX_TAG = 1 << 1
+
+
+class LeafTable(ColumnTable):
+    """
+    Struct-of-arrays table of a syntax tree's leaves in source order.
+
+    Holds what the later pipeline stages need from the tree: positions,
+    grammar kind ids, type names, flags (error-recovery placeholders, JSX tag
+    names) and the category query captures, so they run without re-parsing.
+    """
+
+    COLUMNS = (
+        ("start_row", "I"),
+        ("start_col", "I"),
+        ("end_row", "I"),
+        ("end_col", "I"),
+        ("start_byte", "I"),
+        ("end_byte", "I"),
+        ("kind_id", "H"),
+        ("type_code", "H"),
+        ("flags", "B"),
+        ("query_mask", "I"),
+    )
+
+    def __init__(self, language):
+        super().__init__()
+        self.language = language
+        for name, typecode in self.COLUMNS:
+            setattr(self, name, array(typecode))
+
+    def append(
+        self,
+        start_point,
+        end_point,
+        start_byte,
+        end_byte,
+        kind_id,
+        token_type,
+        flags,
+        query_mask,
+    ):
+        """Append one leaf"""
+        self.start_row.append(start_point[0])
+        self.start_col.append(start_point[1])
+        self.end_row.append(end_point[0])
+        self.end_col.append(end_point[1])
+        self.start_byte.append(start_byte)
+        self.end_byte.append(end_byte)
+        self.kind_id.append(kind_id)
+        self.type_code.append(self.intern_type(token_type))
+        self.flags.append(flags)
+        self.query_mask.append(query_mask)
+
+    @classmethod
+    def from_bytes(cls, data, language):
+        return cls(language).load_bytes(data, cls.COLUMNS)
+
+
+# ============================================================================
+# TOKEN TABLE
+# ============================================================================
+
+
+class TokenTable(ColumnTable):
+    """
+    Struct-of-arrays token table.
+
+    Positions live in typed arrays, node types are interned to small int
+    codes, categories are a bitmask column and token text is a byte slice
+    into the single source buffer. No tree-sitter objects are referenced,
+    so the syntax tree can be released as soon as extraction finishes.
+    """
+
+    # Columns persisted by the token table and categorization stage caches
+    TOKEN_COLUMNS = (
+        ("start_row", "I"),
+        ("start_col", "I"),
+        ("end_row", "I"),
+        ("end_col", "I"),
+        ("start_byte", "I"),
+        ("end_byte", "I"),
+        ("indent_level", "I"),
+        ("type_code", "H"),
+        ("leaf", "I"),
+    )
+    CATEGORY_COLUMNS = (
+        ("category_mask", "I"),
+        ("base_typeable", "B"),
+    )
+
+    def __init__(self, source, language):
+        super().__init__()
+        self.source = source
+        self.view = memoryview(source)
+        self.language = language
+        self._line_starts = None
+
+        self.start_row = array("l")
+        self.start_col = array("l")
+        self.end_row = array("l")
+        self.end_col = array("l")
+        self.start_byte = array("l")
+        self.end_byte = array("l")
+        self.indent_level = array("l")
+        self.type_code = array("H")
+        self.category_mask = array("L")
+        self.base_typeable = array("B")
+        # Index of the LeafTable row each token was cut from
+        self.leaf = array("l")
+
+    @classmethod
+    def from_bytes(cls, data, source, language):
+        """Token table stage output; categories are left zeroed"""
+        table = cls(source, language).load_bytes(data, cls.TOKEN_COLUMNS)
+        table.category_mask = array("L", [0]) * len(table)
+        table.base_typeable = array("B", bytes(len(table)))
+        return table
+
+    def append(
+        self,
+        start_row,
+        start_col,
+        end_row,
+        end_col,
+        start_byte,
+        end_byte,
+        token_type,
+        base_typeable,
+        category_mask,
+        indent_level,
+        leaf,
+    ):
+        """Append one token"""
+        self.start_row.append(start_row)
+        self.start_col.append(start_col)
+        self.end_row.append(end_row)
+        self.end_col.append(end_col)
+        self.start_byte.append(start_byte)
+        self.end_byte.append(end_byte)
+        self.indent_level.append(indent_level)
+        self.type_code.append(self.intern_type(token_type))
+        self.category_mask.append(category_mask)
+        self.base_typeable.append(1 if base_typeable else 0)
+        self.leaf.append(leaf)
+
+    # ------------------------------------------------------------------------
+    # Column accessors
+    # ------------------------------------------------------------------------
+
+    def text(self, idx):
+        """Decoded token text (zero-copy slice of the source buffer)"""
+        return str(self.view[self.start_byte[idx] : self.end_byte[idx]], "utf-8")
+
+    def line_starts(self):
+        """Byte offset of the start of every source line (built once)"""
+        if self._line_starts is None:
+            starts = array("l", [0])
+            find = self.source.find
+            pos = find(b"\n")
+            while pos != -1:
+                starts.append(pos + 1)
+                pos = find(b"\n", pos + 1)
+            self._line_starts = starts
+        return self._line_starts
+
+    def line_text(self, row):
+        """Decoded source line without its newline ("" past the end)"""
+        starts = self.line_starts()
+        if row >= len(starts):
+            return ""
+        end = starts[row + 1] - 1 if row + 1 < len(starts) else len(self.source)
+        return str(self.view[starts[row] : end], "utf-8")
+
+    def categories(self, idx):
+        return mask_to_categories(self.category_mask[idx])
+
+    def row_order(self):
+        """Token indices stably sorted by (start_row, start_col)"""
+        start_row = self.start_row
+        start_col = self.start_col
+        return sorted(range(len(self)), key=lambda i: (start_row[i], start_col[i]))
+
+    def iter_records(self):
+        """Yield tokens as dict records (legacy DataFrame column names)"""
+        for idx in range(len(self)):
+            yield {
+                "START_ROW": self.start_row[idx],
+                "START_COL": self.start_col[idx],
+                "END_ROW": self.end_row[idx],
+                "END_COL": self.end_col[idx],
+                "TEXT": self.text(idx),
+                "TYPE": self.type_name(idx),
+                "BASE_TYPEABLE": bool(self.base_typeable[idx]),
+                "CATEGORIES": self.categories(idx),
+                "INDENT_LEVEL": self.indent_level[idx],
+            }
+
+    # ------------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------------
+
+    def typeable_count(self):
+        return sum(self.base_typeable)
+
+    def line_count(self):
+        return len(set(self.start_row))
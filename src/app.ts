@@ -1,5 +1,6 @@
 import { TestState, SnippetInfo } from "./types/state";
 import { SnippetData } from "./types/snippet";
+import { decodeSnippet } from "./core/snippetFormat";
 import { CodeRenderer } from "./ui/renderer";
 import { KeyboardHandler } from "./ui/keyboard";
 import {
@@ -253,7 +254,7 @@ export class TreeTypeApp {
       if (!response.ok) {
         throw new Error(`HTTP error! status: ${response.status}`);
       }
-      this.rawData = await response.json();
+      this.rawData = decodeSnippet(await response.json());
 
       this.snippetInfo.path = fetchPath;
       this.snippetInfo.language = this.rawData!.language;
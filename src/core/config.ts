@@ -1,45 +1,12 @@
 import { PresetsConfig, UserConfig, TypingMode } from "../types/config";
 import { Line, Token } from "../types/snippet";
+import presetsData from "../data/presets.json";
 
 /**
  * Preset configurations for typing modes
+ * (shared with the Python build, which precomputes per-line preset masks)
  */
-export const PRESETS: PresetsConfig = {
-  minimal: {
-    name: "Minimal",
-    description: "Type only keywords and identifiers",
-    exclude: [
-      "parenthesis",
-      "curly_brace",
-      "square_bracket",
-      "angle_bracket",
-      "operator",
-      "punctuation",
-      "string_content",
-      "string_delimiter",
-      "comment",
-    ],
-  },
-  standard: {
-    name: "Standard",
-    description: "Balanced practice without pinky strain (recommended)",
-    exclude: [
-      "curly_brace",
-      "square_bracket",
-      "angle_bracket",
-      "string_content",
-      "punctuation",
-      "string_delimiter",
-      "comment",
-    ],
-    includeSpecific: [":", ".", ",", "(", ")"],
-  },
-  full: {
-    name: "Full",
-    description: "Type everything except whitespace and comments",
-    exclude: ["comment", "string_content"],
-  },
-};
+export const PRESETS = presetsData as PresetsConfig;
 
 /**
  * Default user configuration
@@ -58,6 +25,12 @@ function isJSXTagName(
   idx: number,
   tokens: Token[]
 ): boolean {
+  // Tagged by the parser from the syntax tree (tsx/javascript)
+  if (token.categories?.includes("jsx_tag_name")) {
+    return true;
+  }
+
+  // Fallback for snippets built before jsx_tag_name existed:
   // Must be an identifier-like token
   if (token.type !== "identifier" && token.type !== "type_identifier") {
     return false;
@@ -97,11 +70,92 @@ function isJSXTagName(
  * 1. Whitespace is NEVER typeable
  * 2. JSX tag names follow angle_bracket exclusion rules (handles attributes)
  * 3. includeSpecific has highest priority
+ *
+ * Snippets built with preset_masks skip the rules and read each token's
+ * typeability straight from the mask (see applyPresetMask).
  */
 export function applyExclusionConfig(lineData: Line, preset: TypingMode): Line {
+  const presetMask = lineData.preset_masks?.[preset];
+  const presetLength = lineData.preset_lengths?.[preset];
+  if (presetMask !== undefined && presetLength !== undefined) {
+    return applyPresetMask(lineData, preset, presetMask, presetLength);
+  }
+
+  return rebuildTypingData(lineData, filterTokens(lineData, preset));
+}
+
+/**
+ * Lines already filtered from build-time masks, per preset
+ * (switching back to a mode reuses them instead of rebuilding char_map)
+ */
+const maskedLines = new WeakMap<Line, Partial<Record<TypingMode, Line>>>();
+
+/**
+ * Filter a line with its build-time preset mask and typing length
+ */
+function applyPresetMask(
+  lineData: Line,
+  preset: TypingMode,
+  mask: string,
+  length: number
+): Line {
+  let byPreset = maskedLines.get(lineData);
+  if (byPreset === undefined) {
+    byPreset = {};
+    maskedLines.set(lineData, byPreset);
+  }
+  const cached = byPreset[preset];
+  if (cached) {
+    return cached;
+  }
+
+  const charMap: Line["char_map"] = {};
+  const parts: string[] = [];
+  let charIdx = 0;
+  const filteredTokens = lineData.display_tokens.map((token, idx) => {
+    // Nothing to type on this line (comments, blank lines): skip the mask
+    const typeable = length > 0 && isMaskBitSet(mask, idx);
+    if (typeable) {
+      const entry = { token_idx: idx, display_col: token.start_col };
+      for (let i = 0; i < token.text.length; i++) {
+        charMap[String(charIdx++)] = entry;
+      }
+      parts.push(token.text);
+    }
+    return { ...token, typeable };
+  });
+
+  const result: Line = {
+    ...lineData,
+    display_tokens: filteredTokens,
+    // The stored sequence holds every base-typeable token: reuse it when
+    // the preset keeps them all
+    typing_sequence:
+      length === lineData.typing_sequence.length
+        ? lineData.typing_sequence
+        : parts.join(""),
+    char_map: charMap,
+  };
+  byPreset[preset] = result;
+  return result;
+}
+
+/**
+ * Check token idx in a build-time preset mask
+ * (hex digit k holds tokens 4k..4k+3, lowest bit first)
+ */
+function isMaskBitSet(mask: string, idx: number): boolean {
+  return ((parseInt(mask[idx >> 2], 16) >> (idx & 3)) & 1) === 1;
+}
+
+/**
+ * Derive token typeability from the preset rules
+ * (used when a snippet carries no precomputed preset_masks)
+ */
+function filterTokens(lineData: Line, preset: TypingMode): Token[] {
   const config = PRESETS[preset];
 
-  const filteredTokens: Token[] = lineData.display_tokens.map((token, idx) => {
+  return lineData.display_tokens.map((token, idx) => {
     let typeable = token.base_typeable;
 
     // CRITICAL FIX #1: Whitespace is NEVER typeable
@@ -142,7 +196,12 @@ export function applyExclusionConfig(lineData: Line, preset: TypingMode): Line {
 
     return { ...token, typeable };
   });
+}
 
+/**
+ * Regenerate typing_sequence and char_map from filtered tokens
+ */
+function rebuildTypingData(lineData: Line, filteredTokens: Token[]): Line {
   // Regenerate typing sequence from typeable tokens only
   const typingSequence = filteredTokens
     .filter((t) => t.typeable)
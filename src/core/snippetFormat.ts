@@ -0,0 +1,69 @@
+import {
+  CompactSnippetData,
+  Line,
+  SnippetData,
+  Token,
+  TokenCategory,
+} from "../types/snippet";
+
+/**
+ * Expand a loaded snippet file into SnippetData.
+ * Schema 1 files are returned as-is; compact schema 2 files get their
+ * token objects and char_map rebuilt.
+ */
+export function decodeSnippet(
+  raw: SnippetData | CompactSnippetData
+): SnippetData {
+  if (!("schema_version" in raw) || raw.schema_version !== 2) {
+    return raw as SnippetData;
+  }
+
+  const lines: Line[] = raw.lines.map((line) => {
+    const displayTokens: Token[] = line.tokens.map(
+      ([text, type, mask, baseTypeable, startCol, endCol]) => {
+        const categories: TokenCategory[] = [];
+        raw.category_bits.forEach((name, bit) => {
+          if (mask & (1 << bit)) categories.push(name);
+        });
+        return {
+          text,
+          type: raw.types[type],
+          typeable: baseTypeable === 1,
+          base_typeable: baseTypeable === 1,
+          start_col: startCol,
+          end_col: endCol,
+          categories,
+        };
+      }
+    );
+
+    const charMap: Line["char_map"] = {};
+    displayTokens
+      .filter((token) => token.base_typeable)
+      .forEach((token, tokenIdx) => {
+        const start = line.token_offsets[tokenIdx];
+        for (let i = 0; i < token.text.length; i++) {
+          charMap[String(start + i)] = {
+            token_idx: tokenIdx,
+            display_col: token.start_col,
+          };
+        }
+      });
+
+    return {
+      line_number: line.line_number,
+      indent_level: line.indent_level,
+      display_tokens: displayTokens,
+      typing_sequence: line.typing_sequence,
+      char_map: charMap,
+      preset_masks: line.preset_masks,
+      preset_lengths: line.preset_lengths,
+    };
+  });
+
+  return {
+    language: raw.language,
+    total_lines: raw.total_lines,
+    lines,
+  };
+}
@@ -1,12 +1,31 @@
-import { SnippetMetadata } from "./types/snippet.js";
+import {
+  MetadataIndex,
+  MetadataPage,
+  SnippetMetadata,
+} from "./types/snippet.js";
 import { SnippetStats } from "./types/state.js";
 import { loadSnippetStats } from "./core/storage.js";
 
+const DIFFICULTY_ORDER: Record<string, number> = {
+  beginner: 0,
+  intermediate: 1,
+  advanced: 2,
+};
+
 /**
  * Library page for browsing and selecting code snippets
+ *
+ * When the paginated index (snippets/index/) exists, views sorted by a
+ * presorted order are rendered page by page from it; search and the
+ * user-stat sorts fall back to the full metadata.json.
  */
 export class LibraryPage {
   private allSnippets: SnippetMetadata[] = [];
+  private allLoaded: boolean = false;
+  private index: MetadataIndex | null = null;
+  private pageCache = new Map<string, Promise<MetadataPage>>();
+  private visiblePages: number = 1;
+  private renderId: number = 0;
   private userStats: Record<string, SnippetStats> = {};
   private currentFilter: string = "all";
   private currentSearch: string = "";
@@ -25,23 +44,21 @@ export class LibraryPage {
   }
 
   /**
-   * Load snippet metadata from JSON file
+   * Load the paginated index, or the full metadata file without one
    */
   private async loadMetadata(): Promise<void> {
     try {
-      const response = await fetch("snippets/metadata.json");
-      if (!response.ok) {
-        throw new Error(`HTTP error! status: ${response.status}`);
+      this.index = await this.loadIndex();
+      if (!this.index) {
+        await this.loadAllSnippets();
       }
-      const data = await response.json();
-      this.allSnippets = data.snippets;
 
       // Load user statistics
       this.userStats = loadSnippetStats();
 
       // Render everything
       this.renderSummaryStats();
-      this.renderSnippets();
+      await this.renderSnippets();
 
       // Hide loading, show grid
       document.getElementById("loadingState")?.classList.add("hidden");
@@ -62,6 +79,95 @@ export class LibraryPage {
     }
   }
 
+  /**
+   * Load the paginated index manifest (null if this deploy has none)
+   */
+  private async loadIndex(): Promise<MetadataIndex | null> {
+    try {
+      const response = await fetch("snippets/index/manifest.json");
+      if (!response.ok) return null;
+      return (await response.json()) as MetadataIndex;
+    } catch {
+      return null;
+    }
+  }
+
+  /**
+   * Load every snippet's metadata from metadata.json
+   */
+  private async loadAllSnippets(): Promise<void> {
+    const response = await fetch("snippets/metadata.json");
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+    const data = await response.json();
+    this.allSnippets = data.snippets;
+    this.allLoaded = true;
+  }
+
+  /**
+   * Fetch one presorted index page (cached per URL)
+   */
+  private fetchPage(
+    index: MetadataIndex,
+    language: string,
+    sort: string,
+    page: number
+  ): Promise<MetadataPage> {
+    const url =
+      "snippets/" +
+      index.pagePath
+        .replace("{language}", language)
+        .replace("{sort}", sort)
+        .replace("{page}", String(page));
+
+    let pending = this.pageCache.get(url);
+    if (!pending) {
+      pending = fetch(url).then((response) => {
+        if (!response.ok) {
+          throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        return response.json() as Promise<MetadataPage>;
+      });
+      // Drop failed requests so a later render can retry
+      pending.catch(() => this.pageCache.delete(url));
+      this.pageCache.set(url, pending);
+    }
+    return pending;
+  }
+
+  /**
+   * True when the current view can be served from the presorted index
+   */
+  private usesIndex(): boolean {
+    return (
+      this.index !== null &&
+      !this.currentSearch &&
+      this.index.sortOrders.includes(this.currentSort)
+    );
+  }
+
+  /**
+   * Snippets of the first visiblePages index pages of the current view
+   */
+  private async loadIndexPages(
+    index: MetadataIndex
+  ): Promise<{ snippets: SnippetMetadata[]; hasMore: boolean }> {
+    const shard = index.shards[this.currentFilter];
+    if (!shard) return { snippets: [], hasMore: false };
+
+    const count = Math.min(this.visiblePages, shard.pages);
+    const pages = await Promise.all(
+      Array.from({ length: count }, (_, page) =>
+        this.fetchPage(index, this.currentFilter, this.currentSort, page)
+      )
+    );
+    return {
+      snippets: pages.flatMap((page) => page.snippets),
+      hasMore: count < shard.pages,
+    };
+  }
+
   /**
    * Calculate and render summary statistics
    */
@@ -70,7 +176,12 @@ export class LibraryPage {
 
     // Total snippets
     const totalEl = document.getElementById("totalSnippets");
-    if (totalEl) totalEl.textContent = String(this.allSnippets.length);
+    if (totalEl) {
+      const total = this.index
+        ? this.index.totalSnippets
+        : this.allSnippets.length;
+      totalEl.textContent = String(total);
+    }
 
     // Practiced count
     const practicedEl = document.getElementById("practicedCount");
@@ -116,11 +227,12 @@ export class LibraryPage {
       );
     }
 
-    // Sort
+    // Sort (stable: metadata.json lists snippets in the build's name
+    // order, so ties stay in that order, exactly as on the index pages)
     filtered.sort((a, b) => {
       switch (this.currentSort) {
         case "name":
-          return a.name.localeCompare(b.name);
+          return 0;
         case "wpm": {
           const aStats = this.userStats[a.id] || {};
           const bStats = this.userStats[b.id] || {};
@@ -133,6 +245,14 @@ export class LibraryPage {
         }
         case "lines":
           return a.lines - b.lines;
+        case "difficulty":
+          return (
+            (DIFFICULTY_ORDER[a.difficulty] ?? 3) -
+            (DIFFICULTY_ORDER[b.difficulty] ?? 3)
+          );
+        case "date":
+          // Code-point order, like the build's sort of the ISO dates
+          return a.dateAdded < b.dateAdded ? 1 : a.dateAdded > b.dateAdded ? -1 : 0;
         default:
           return 0;
       }
@@ -144,13 +264,30 @@ export class LibraryPage {
   /**
    * Render snippet cards in the grid
    */
-  private renderSnippets(): void {
-    const filtered = this.filterAndSortSnippets();
+  private async renderSnippets(): Promise<void> {
+    // Only the latest render may touch the DOM
+    const renderId = ++this.renderId;
+
+    let filtered: SnippetMetadata[];
+    let hasMore = false;
+    if (this.index && this.usesIndex()) {
+      ({ snippets: filtered, hasMore } = await this.loadIndexPages(this.index));
+    } else {
+      if (!this.allLoaded) {
+        await this.loadAllSnippets();
+      }
+      filtered = this.filterAndSortSnippets();
+    }
+    if (renderId !== this.renderId) return;
+
     const grid = document.getElementById("snippetGrid");
     const emptyState = document.getElementById("emptyState");
+    const loadMore = document.getElementById("loadMoreButton");
 
     if (!grid || !emptyState) return;
 
+    loadMore?.classList.toggle("hidden", !hasMore);
+
     if (filtered.length === 0) {
       grid.classList.add("hidden");
       emptyState.classList.remove("hidden");
@@ -259,7 +396,8 @@ export class LibraryPage {
 
           // Update filter and re-render
           this.currentFilter = btn.dataset.language || "all";
-          this.renderSnippets();
+          this.visiblePages = 1;
+          this.refresh();
         });
       });
 
@@ -270,7 +408,8 @@ export class LibraryPage {
     if (searchInput) {
       searchInput.addEventListener("input", (e) => {
         this.currentSearch = (e.target as HTMLInputElement).value;
-        this.renderSnippets();
+        this.visiblePages = 1;
+        this.refresh();
       });
     }
 
@@ -281,9 +420,25 @@ export class LibraryPage {
     if (sortSelect) {
       sortSelect.addEventListener("change", (e) => {
         this.currentSort = (e.target as HTMLSelectElement).value;
-        this.renderSnippets();
+        this.visiblePages = 1;
+        this.refresh();
       });
     }
+
+    // Next index page
+    document.getElementById("loadMoreButton")?.addEventListener("click", () => {
+      this.visiblePages++;
+      this.refresh();
+    });
+  }
+
+  /**
+   * Re-render from an event handler, logging failures
+   */
+  private refresh(): void {
+    this.renderSnippets().catch((error) => {
+      console.error("Error rendering snippets:", error);
+    });
   }
 }
 
@@ -12,7 +12,8 @@ export type TokenCategory =
   | "string_delimiter"
   | "comment"
   | "keyword"
-  | "identifier";
+  | "identifier"
+  | "jsx_tag_name";
 
 /**
  * Individual token in parsed code
@@ -41,6 +42,10 @@ export interface Line {
       display_col: number;
     };
   };
+  /** Build-time typeable mask per preset (hex, digit k = tokens 4k..4k+3) */
+  preset_masks?: { [preset: string]: string };
+  /** Build-time typing_sequence length per preset */
+  preset_lengths?: { [preset: string]: number };
 }
 
 /**
@@ -52,6 +57,42 @@ export interface SnippetData {
   lines: Line[];
 }
 
+/**
+ * Compact snippet file (schema_version 2, written by `--schema 2`).
+ * Tokens are positional arrays ordered by token_fields; type indexes
+ * `types` and categories is a bitmask over `category_bits`. char_map is
+ * not stored: typing token i starts at token_offsets[i] in typing_sequence.
+ */
+export type CompactToken = [
+  text: string,
+  type: number,
+  categories: number,
+  base_typeable: 0 | 1,
+  start_col: number,
+  end_col: number,
+];
+
+export interface CompactLine {
+  line_number: number;
+  indent_level: number;
+  actual_line: string;
+  tokens: CompactToken[];
+  typing_sequence: string;
+  token_offsets: number[];
+  preset_masks: { [preset: string]: string };
+  preset_lengths: { [preset: string]: number };
+}
+
+export interface CompactSnippetData {
+  schema_version: 2;
+  language: SnippetData["language"];
+  total_lines: number;
+  token_fields: string[];
+  category_bits: TokenCategory[];
+  types: string[];
+  lines: CompactLine[];
+}
+
 /**
  * Snippet metadata from library
  */
@@ -65,4 +106,32 @@ export interface SnippetMetadata {
   difficulty: "beginner" | "intermediate" | "advanced";
   tags: string[];
   dateAdded: string;
+  schemaVersion?: number;
+}
+
+/**
+ * Root manifest of the paginated metadata index (snippets/index/manifest.json)
+ */
+export interface MetadataIndex {
+  version: number;
+  generatedAt: string;
+  totalSnippets: number;
+  languages: string[];
+  pageSize: number;
+  sortOrders: string[];
+  /** Page URL template relative to snippets/, e.g. "index/{language}/{sort}/{page}.json" */
+  pagePath: string;
+  /** Keyed by language, plus "all" */
+  shards: Record<string, { count: number; pages: number }>;
+}
+
+/**
+ * One presorted page of the metadata index
+ */
+export interface MetadataPage {
+  language: string;
+  sort: string;
+  page: number;
+  pages: number;
+  snippets: SnippetMetadata[];
 }
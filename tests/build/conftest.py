@@ -0,0 +1,27 @@
+"""Shared setup for the Python build script tests"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# The build scripts import each other as top-level modules
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "build"))
+
+CORPUS_DIR = (
+    Path(__file__).resolve().parents[2] / "DEV" / "MISC" / "GM_01_CODE_SNIPPETS"
+)
+
+# One small corpus file per language
+SAMPLE_SOURCES = (
+    "python/gm_01_015_03_functools-patterns.py",
+    "javascript/gm_01_009_02_json-operations.js",
+    "typescript/gm_01_031_02_configuration-patterns.ts",
+    "react/gm_01_016_02_context-api.tsx",
+)
+
+
+@pytest.fixture(params=SAMPLE_SOURCES, ids=lambda path: Path(path).suffix)
+def sample_source(request):
+    """Path of a corpus source file (parametrized over every language)"""
+    return CORPUS_DIR / request.param
@@ -0,0 +1,221 @@
+"""Tests for build/build_cache.py and parse_json.py's use of it"""
+
+import os
+
+import pytest
+
+import parse_json
+from build_cache import STAGES_DIR_NAME, BuildCache
+from parse_json import STAGES, process_file
+
+
+@pytest.fixture
+def source_file(tmp_path):
+    path = tmp_path / "example.py"
+    path.write_text(
+        "def add(a, b):\n    return a + b\n\n\nprint(add(1, 2))\n", encoding="utf-8"
+    )
+    return path
+
+
+def build(source_file, cache, **options):
+    output = source_file.with_suffix(".json")
+    assert process_file(source_file, output, quiet=True, cache=cache, **options)
+    return output
+
+
+def test_unchanged_source_is_skipped(source_file, tmp_path):
+    cache = BuildCache(tmp_path / "cache")
+    output = build(source_file, cache)
+    cache.save()
+    written = output.stat().st_mtime_ns
+
+    cache = BuildCache(tmp_path / "cache")
+    build(source_file, cache)
+    assert (cache.hits, cache.misses) == (1, 0)
+    assert output.stat().st_mtime_ns == written
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        "edit source",
+        "rules change",
+        "other schema",
+        "other categorizer",
+        "output deleted",
+        "force",
+    ],
+)
+def test_changes_invalidate_the_cache(source_file, tmp_path, monkeypatch, change):
+    cache = BuildCache(tmp_path / "cache")
+    output = build(source_file, cache)
+    cache.save()
+
+    options = {}
+    force = False
+    if change == "edit source":
+        source_file.write_text(
+            source_file.read_text(encoding="utf-8") + "# end\n", encoding="utf-8"
+        )
+    elif change == "rules change":
+        monkeypatch.setattr(parse_json, "_rules_version", "edited rules")
+    elif change == "other schema":
+        options["schema"] = 2
+    elif change == "other categorizer":
+        options["categorizer"] = "query"
+    elif change == "output deleted":
+        output.unlink()
+    else:
+        force = True
+
+    cache = BuildCache(tmp_path / "cache", force=force)
+    build(source_file, cache, **options)
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_output_stats_follow_the_file(source_file, tmp_path):
+    cache = BuildCache(tmp_path / "cache")
+    output = build(source_file, cache)
+    cache.save()
+
+    stats = BuildCache(tmp_path / "cache").output_stats(output)
+    assert stats["language"] == "python"
+    assert stats["lines"] == 3  # lines with tokens
+    assert "add" in stats["identifiers"]
+
+    # Same bytes with a new mtime (e.g. a fresh checkout): still valid
+    os.utime(output, ns=(0, 0))
+    assert BuildCache(tmp_path / "cache").output_stats(output) is not None
+
+    output.write_bytes(output.read_bytes().replace(b"add", b"sum"))
+    assert BuildCache(tmp_path / "cache").output_stats(output) is None
+
+
+def test_worker_updates_merge_into_parent(source_file, tmp_path):
+    worker = BuildCache(tmp_path / "cache")
+    output = build(source_file, worker)
+
+    parent = BuildCache(tmp_path / "cache")
+    parent.merge(*worker.drain())
+    assert (parent.hits, parent.misses) == (0, 1)
+    parent.save()
+
+    assert BuildCache(tmp_path / "cache").is_fresh(
+        source_file, parent.entries[str(source_file.resolve())]["key"], output
+    )
+
+
+def test_unreadable_manifest_starts_empty(tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    (cache_dir / "manifest.json").write_text("{not json", encoding="utf-8")
+
+    cache = BuildCache(cache_dir)
+    assert (cache.entries, cache.outputs) == ({}, {})
+
+
+def test_save_without_changes_writes_nothing(tmp_path):
+    cache_dir = tmp_path / "cache"
+    BuildCache(cache_dir).save()
+    assert not cache_dir.exists()
+
+
+def stage_files(cache_dir):
+    return sorted(path.relative_to(cache_dir) for path in cache_dir.glob("*/*/*.bin"))
+
+
+def rebuild_with_stages(source_file, tmp_path):
+    """Rerun the pipeline (the rules version moved on) over the stage store"""
+    cache = BuildCache(tmp_path / "cache")
+    output = build(source_file, cache)
+    assert (cache.hits, cache.misses) == (0, 1)
+    return cache, output
+
+
+def test_unchanged_stages_are_reused(source_file, tmp_path, monkeypatch):
+    cache = BuildCache(tmp_path / "cache")
+    output = build(source_file, cache)
+    cache.save()
+    assert cache.stage_counts == {stage: [0, 1] for stage in STAGES}
+    expected = output.read_bytes()
+
+    monkeypatch.setattr(parse_json, "_rules_version", "edited rules")
+    cache, output = rebuild_with_stages(source_file, tmp_path)
+    # Tokens and categories load; leaves are not even needed
+    assert cache.stage_counts == {"tokens": [1, 0], "categories": [1, 0]}
+    assert output.read_bytes() == expected
+
+
+def test_stage_change_rebuilds_later_stages(source_file, tmp_path, monkeypatch):
+    cache = BuildCache(tmp_path / "cache")
+    expected = build(source_file, cache).read_bytes()
+    cache.save()
+
+    monkeypatch.setattr(parse_json, "_rules_version", "edited rules")
+    monkeypatch.setitem(parse_json._stage_versions, "tokens", "edited tokenizer")
+    cache, output = rebuild_with_stages(source_file, tmp_path)
+    assert cache.stage_counts == {
+        "leaves": [1, 0],
+        "tokens": [0, 1],
+        "categories": [0, 1],
+    }
+    assert output.read_bytes() == expected
+
+    # The old tokens/categories outputs are no longer referenced
+    cache.save()
+    assert len(stage_files(tmp_path / "cache")) == len(STAGES)
+
+
+@pytest.mark.parametrize(
+    "stage, counts",
+    [
+        # Leaves are only loaded when a later stage has to be rebuilt
+        ("leaves", {"leaves": [0, 1], "tokens": [0, 1], "categories": [0, 1]}),
+        ("tokens", {"leaves": [1, 0], "tokens": [0, 1], "categories": [0, 1]}),
+        ("categories", {"leaves": [1, 0], "tokens": [1, 0], "categories": [0, 1]}),
+    ],
+)
+def test_damaged_stage_output_is_rebuilt(
+    source_file, tmp_path, monkeypatch, stage, counts
+):
+    cache = BuildCache(tmp_path / "cache")
+    expected = build(source_file, cache).read_bytes()
+    cache.save()
+    (stage_path,) = (tmp_path / "cache" / STAGES_DIR_NAME / stage).glob("*.bin")
+    stage_path.write_bytes(stage_path.read_bytes()[:-3])
+
+    monkeypatch.setattr(parse_json, "_rules_version", "edited rules")
+    if stage == "leaves":
+        monkeypatch.setitem(parse_json._stage_versions, "tokens", "edited tokenizer")
+    cache, output = rebuild_with_stages(source_file, tmp_path)
+    # A damaged output counts as rebuilt only, never as reused
+    assert cache.stage_counts == counts
+    assert output.read_bytes() == expected
+
+
+def test_empty_source_stages_are_reused(tmp_path, monkeypatch):
+    # Long enough to pass validation, but without a single token
+    source_file = tmp_path / "blank.py"
+    source_file.write_text("\n" * 5, encoding="utf-8")
+    cache = BuildCache(tmp_path / "cache")
+    build(source_file, cache)
+    cache.save()
+
+    monkeypatch.setattr(parse_json, "_rules_version", "edited rules")
+    cache, _ = rebuild_with_stages(source_file, tmp_path)
+    assert cache.stage_counts == {"tokens": [1, 0], "categories": [1, 0]}
+
+
+def test_unreferenced_stage_outputs_are_pruned(source_file, tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache = BuildCache(cache_dir)
+    build(source_file, cache)
+    cache.save()
+    kept = stage_files(cache_dir)
+    assert len(kept) == len(STAGES)
+
+    orphan = cache_dir / STAGES_DIR_NAME / "leaves" / "orphan.bin"
+    orphan.write_bytes(b"")
+    assert BuildCache(cache_dir).prune_stages() == 1
+    assert stage_files(cache_dir) == kept
@@ -0,0 +1,48 @@
+"""Tests for build/build_metadata.py"""
+
+from build_metadata import sort_snippets
+
+
+def entry(snippet_id, name, difficulty="beginner", lines=10, date="2025-01-01"):
+    return {
+        "id": snippet_id,
+        "name": name,
+        "difficulty": difficulty,
+        "lines": lines,
+        "dateAdded": date,
+    }
+
+
+SNIPPETS = [
+    entry("py-b", "beta", "advanced", 30, "2025-03-01"),
+    entry("js-a", "Alpha", "beginner", 10, "2025-01-01"),
+    entry("py-a", "alpha", "beginner", 20, "2025-03-01"),
+    entry("ts-e", "Éclair", "intermediate", 10, "2025-02-01"),
+]
+
+
+def ids(snippets):
+    return [s["id"] for s in snippets]
+
+
+def test_name_order_casefolds_then_breaks_ties_by_id():
+    assert ids(sort_snippets(SNIPPETS, "name")) == ["js-a", "py-a", "py-b", "ts-e"]
+
+
+def test_other_orders_keep_name_order_for_ties():
+    assert ids(sort_snippets(SNIPPETS, "difficulty")) == [
+        "js-a",
+        "py-a",
+        "ts-e",
+        "py-b",
+    ]
+    assert ids(sort_snippets(SNIPPETS, "lines")) == ["js-a", "ts-e", "py-a", "py-b"]
+    assert ids(sort_snippets(SNIPPETS, "date")) == ["py-a", "py-b", "ts-e", "js-a"]
+
+
+def test_stable_resort_of_name_order_matches():
+    # What the library's fallback does with metadata.json (already in name order)
+    by_name = sort_snippets(SNIPPETS, "name")
+    for order, key in (("lines", "lines"), ("date", "dateAdded")):
+        resorted = sorted(by_name, key=lambda s: s[key], reverse=order == "date")
+        assert resorted == sort_snippets(SNIPPETS, order)
@@ -0,0 +1,91 @@
+"""Tests for build/bundle_snippets.py"""
+
+import pytest
+
+from bundle_snippets import HEADER_SIZE, SnippetBundle, write_bundle
+from json_backend import get_backend
+
+BACKEND = get_backend("stdlib")
+
+
+@pytest.fixture
+def snippet_files(tmp_path):
+    files = []
+    for name, text in (("first", "é"), ("second", "x" * 300), ("empty", "")):
+        path = tmp_path / f"{name}.json"
+        path.write_bytes(BACKEND.dumps({"language": "python", "text": text}))
+        files.append((f"python-{name}", path))
+    return files
+
+
+def test_bundle_round_trip(snippet_files, tmp_path):
+    bundle_path = tmp_path / "bundles" / "python.ttb"
+    entries = write_bundle(bundle_path, "python", snippet_files, BACKEND)
+    assert [entry["id"] for entry in entries] == [id_ for id_, _ in snippet_files]
+
+    with SnippetBundle(bundle_path, BACKEND) as bundle:
+        assert bundle.language == "python"
+        assert len(bundle) == 3
+        assert list(bundle) == [id_ for id_, _ in snippet_files]
+        assert "python-missing" not in bundle
+        for snippet_id, path in snippet_files:
+            assert bundle.read(snippet_id, verify=True) == path.read_bytes()
+            start, end = bundle.byte_range(snippet_id)
+            assert bundle_path.read_bytes()[start:end] == path.read_bytes()
+        assert bundle.load("python-first")["text"] == "é"
+
+
+def test_corrupt_snippet_fails_verification(snippet_files, tmp_path):
+    bundle_path = tmp_path / "python.ttb"
+    write_bundle(bundle_path, "python", snippet_files, BACKEND)
+    with SnippetBundle(bundle_path, BACKEND) as bundle:
+        start, _ = bundle.byte_range("python-second")
+
+    data = bytearray(bundle_path.read_bytes())
+    data[start + 30] ^= 1
+    bundle_path.write_bytes(bytes(data))
+
+    with SnippetBundle(bundle_path, BACKEND) as bundle:
+        bundle.read("python-second")  # unchecked reads still succeed
+        with pytest.raises(ValueError, match="Hash mismatch"):
+            bundle.read("python-second", verify=True)
+
+
+@pytest.mark.parametrize(
+    "data, message",
+    [
+        (b"", "Empty bundle"),
+        (b"ZIPS\x01\x00\x00\x00\x00\x00\x00\x00", "Not a treetype snippet bundle"),
+        (b"TTBN\x07\x00\x00\x00\x00\x00\x00\x00", "Unsupported bundle version"),
+    ],
+)
+def test_foreign_files_rejected(tmp_path, data, message):
+    path = tmp_path / "bad.ttb"
+    path.write_bytes(data)
+    with pytest.raises(ValueError, match=message):
+        SnippetBundle(path, BACKEND)
+
+
+@pytest.mark.parametrize(
+    "cut, message",
+    [
+        (lambda data, index_end: data[:3], "Truncated bundle header"),
+        (lambda data, index_end: data[: index_end - 1], "Truncated bundle index"),
+        (
+            lambda data, index_end: data[:HEADER_SIZE]
+            + b"!" * (index_end - HEADER_SIZE)
+            + data[index_end:],
+            "Invalid bundle index",
+        ),
+    ],
+    ids=["header", "index", "garbled"],
+)
+def test_damaged_bundle_rejected(snippet_files, tmp_path, cut, message):
+    path = tmp_path / "python.ttb"
+    write_bundle(path, "python", snippet_files, BACKEND)
+    with SnippetBundle(path, BACKEND) as bundle:
+        index_end = bundle.data_offset
+    path.write_bytes(cut(path.read_bytes(), index_end))
+
+    with pytest.raises(ValueError, match=message):
+        SnippetBundle(path, BACKEND)
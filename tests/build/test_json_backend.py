@@ -0,0 +1,45 @@
+"""Tests for build/json_backend.py"""
+
+import json
+
+import pytest
+
+from json_backend import ENV_VAR, available_backends, get_backend
+
+DOCUMENT = {
+    "language": "tsx",
+    "text": 'é "quoted" \\ tab\t   \U0001f600',
+    "lines": [{"n": 0, "ok": True, "none": None, "mask": "f1"}, []],
+    "empty": {},
+}
+
+
+@pytest.mark.parametrize("backend_name", available_backends())
+@pytest.mark.parametrize("pretty", [False, True])
+def test_backends_write_stdlib_bytes(backend_name, pretty):
+    expected = get_backend("stdlib").dumps(DOCUMENT, pretty=pretty)
+    assert get_backend(backend_name).dumps(DOCUMENT, pretty=pretty) == expected
+
+
+@pytest.mark.parametrize("backend_name", available_backends())
+def test_backends_read_bytes_and_str(backend_name):
+    backend = get_backend(backend_name)
+    data = json.dumps(DOCUMENT, ensure_ascii=False)
+    assert backend.loads(data) == DOCUMENT
+    assert backend.loads(data.encode("utf-8")) == DOCUMENT
+
+
+def test_stdlib_compact_and_pretty_layout():
+    backend = get_backend("stdlib")
+    assert backend.dumps({"a": [1, "é"]}) == '{"a":[1,"é"]}'.encode("utf-8")
+    assert backend.dumps({"a": 1}, pretty=True) == b'{\n  "a": 1\n}'
+
+
+def test_environment_picks_the_default(monkeypatch):
+    monkeypatch.setenv(ENV_VAR, "stdlib")
+    assert get_backend().name == "stdlib"
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError, match="Unknown JSON backend"):
+        get_backend("simdjson")
@@ -0,0 +1,116 @@
+"""Tests for build/json_events.py and the streamed metadata scan"""
+
+import io
+import json
+from json.decoder import JSONDecodeError
+
+import pytest
+
+from build_metadata import snippet_stats, stream_snippet_stats
+from json_events import iter_events
+from parse_json import process_file
+
+DOCUMENTS = [
+    {},
+    [],
+    {"a": 1, "b": [1, 2.5, -3e2, True, False, None], "c": {"d": {}}},
+    [[], [[]], {"x": [{"y": "z"}]}],
+    {"escapes": 'quote " backslash \\ tab \t', "unicode": "é → 🌲"},
+    {"long": "x" * 1000, "numbers": list(range(0, 500, 7))},
+    "just a string",
+    12345,
+    None,
+]
+
+
+def expected_events(value, prefix=""):
+    """The ijson.parse events for a decoded value"""
+    if isinstance(value, dict):
+        yield prefix, "start_map", None
+        for key, item in value.items():
+            yield prefix, "map_key", key
+            yield from expected_events(item, f"{prefix}.{key}" if prefix else key)
+        yield prefix, "end_map", None
+    elif isinstance(value, list):
+        yield prefix, "start_array", None
+        for item in value:
+            yield from expected_events(item, f"{prefix}.item" if prefix else "item")
+        yield prefix, "end_array", None
+    elif isinstance(value, str):
+        yield prefix, "string", value
+    elif isinstance(value, bool):
+        yield prefix, "boolean", value
+    elif value is None:
+        yield prefix, "null", None
+    else:
+        yield prefix, "number", value
+
+
+def events(text, **options):
+    return list(iter_events(io.StringIO(text), **options))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64, 1 << 16])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_events_match_decoded_document(chunk_size, indent):
+    for document in DOCUMENTS:
+        text = json.dumps(document, indent=indent, ensure_ascii=False)
+        assert events(text, chunk_size=chunk_size) == list(
+            expected_events(document)
+        ), text
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 1 << 16])
+def test_skipped_subtrees_yield_nothing(chunk_size):
+    document = {
+        "keep": [1, 2],
+        "drop": {"nested": ["a ] tricky } string", {"x": [[]]}], "s": '"'},
+        "lines": [{"drop": [1, [2]], "keep": 3}],
+    }
+    skipped = events(
+        json.dumps(document), skip=("drop", "lines.item.drop"), chunk_size=chunk_size
+    )
+
+    # The "drop" keys themselves are still reported by their parent maps
+    assert skipped == [
+        event
+        for event in expected_events(document)
+        if not event[0].startswith(("drop", "lines.item.drop"))
+    ]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "{",
+        '{"a" 1}',
+        '{"a": 1,}',
+        '{"a": 1 "b": 2}',
+        "[1, 2",
+        "[1] 2",
+        '{1: "a"}',
+        "[nope]",
+        '"unterminated',
+    ],
+)
+def test_malformed_documents_raise(text):
+    with pytest.raises(JSONDecodeError):
+        events(text, chunk_size=2)
+
+
+def test_empty_input_has_no_events():
+    assert events("") == []
+    assert events(" \n") == []
+
+
+def test_unterminated_skipped_value_raises():
+    with pytest.raises(JSONDecodeError):
+        events('{"drop": [1, {"a": 2}', skip=("drop",))
+
+
+@pytest.mark.parametrize("schema", [1, 2])
+def test_streamed_stats_match_decoded_stats(sample_source, tmp_path, schema):
+    output = tmp_path / "snippet.json"
+    assert process_file(sample_source, output, quiet=True, schema=schema)
+
+    assert stream_snippet_stats(output, chunk_size=257) == snippet_stats(output)
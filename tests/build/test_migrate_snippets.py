@@ -0,0 +1,207 @@
+"""Tests for build/migrate_snippets.py"""
+
+import json
+
+import pytest
+
+from json_backend import get_backend
+import migrate_snippets
+from migrate_snippets import (
+    emit_snippet,
+    legacy_jsx_tag_names,
+    migrate_file,
+    migrate_snippet,
+    preserved_mismatch,
+)
+from parse_json import PARSERS, build_token_table, decode_snippet, token_table_to_json
+
+TSX_SOURCE = b"""import React, { useState } from "react";
+
+function Panel({ user }: { user: User }) {
+  const [open, setOpen] = useState<boolean>(false);
+  const load = (): Promise<User> => fetchUser(user.id);
+  return (
+    <AuthContext.Provider value={user}>
+      <input
+        type="text"
+      />
+      <p>Loading item...</p>
+    </AuthContext.Provider>
+  );
+}
+"""
+
+BACKEND = get_backend("stdlib")
+
+
+def fresh_snippet(source=TSX_SOURCE, language="tsx"):
+    """Schema 1 snippet straight from parse_json's pipeline"""
+    table = build_token_table(source, PARSERS[language][1], language)
+    return token_table_to_json(table)
+
+
+def legacy_snippet(snippet):
+    """The snippet as built before jsx_tag_name and preset masks existed"""
+    legacy = json.loads(json.dumps(snippet))
+    for line in legacy["lines"]:
+        line.pop("preset_masks", None)
+        line.pop("preset_lengths", None)
+        for token in line["display_tokens"]:
+            if "jsx_tag_name" in token["categories"]:
+                token["categories"].remove("jsx_tag_name")
+    return legacy
+
+
+def migrate(snippet, schema=1):
+    language, lines, _ = migrate_snippet(snippet)
+    data, ok = emit_snippet(language, lines, schema, BACKEND)
+    assert ok
+    return decode_snippet(BACKEND.loads(data))
+
+
+def tag_names(snippet):
+    return [
+        (line["line_number"], token["start_col"], token["text"])
+        for line in snippet["lines"]
+        for token in line["display_tokens"]
+        if "jsx_tag_name" in token["categories"]
+    ]
+
+
+@pytest.mark.parametrize("schema", [1, 2])
+def test_migrating_current_snippet_is_lossless(schema):
+    snippet = fresh_snippet()
+    assert migrate(snippet, schema) == snippet
+
+
+def test_legacy_snippet_masks_match_fresh_parse():
+    snippet = fresh_snippet()
+    migrated = migrate(legacy_snippet(snippet))
+    for got, expected in zip(migrated["lines"], snippet["lines"]):
+        assert got["preset_masks"] == expected["preset_masks"], got["actual_line"]
+        assert got["preset_lengths"] == expected["preset_lengths"]
+
+
+def test_legacy_snippet_tag_names_rebuilt():
+    snippet = fresh_snippet()
+    migrated = migrate(legacy_snippet(snippet))
+    assert tag_names(migrated) == tag_names(snippet)
+    texts = {text for _, _, text in tag_names(migrated)}
+    # Member parts and a tag continued on later lines, but no type arguments
+    assert {"AuthContext", "Provider", "input", "p"} <= texts
+    assert not texts & {"boolean", "User"}
+
+
+def test_generic_arguments_are_not_tag_names():
+    def token(text, token_type, start_col):
+        return {
+            "text": text,
+            "type": token_type,
+            "start_col": start_col,
+            "end_col": start_col + len(text),
+        }
+
+    generic = [
+        token("Promise", "type_identifier", 0),
+        token("<", "<", 7),
+        token("User", "type_identifier", 8),
+        token(">", ">", 12),
+    ]
+    assert legacy_jsx_tag_names([generic]) == set()
+
+
+def test_migrate_file_reports_unchanged_and_keeps_bad_output(tmp_path):
+    snippet_path = tmp_path / "panel.json"
+    snippet_path.write_bytes(BACKEND.dumps(legacy_snippet(fresh_snippet())))
+
+    assert migrate_file(snippet_path, snippet_path, 2)[3] == "rewritten"
+    assert migrate_file(snippet_path, snippet_path, 2)[3] == "unchanged"
+    assert list(tmp_path.iterdir()) == [snippet_path]
+
+    broken = tmp_path / "broken.json"
+    broken.write_bytes(b'{"language": "tsx"}')
+    status = migrate_file(broken, broken, 2)[3]
+    assert status.startswith("KeyError")
+    assert broken.read_bytes() == b'{"language": "tsx"}'
+
+
+@pytest.mark.parametrize("legacy", [False, True], ids=["current", "legacy"])
+def test_migration_preserves_stored_fields(legacy):
+    snippet = fresh_snippet()
+    stored = legacy_snippet(snippet) if legacy else snippet
+    assert preserved_mismatch(stored, migrate(stored, 2)) is None
+
+
+def find_token(snippet, text):
+    for line in snippet["lines"]:
+        for idx, token in enumerate(line["display_tokens"]):
+            if token["text"] == text:
+                return line, idx
+
+
+def tamper_drop(snippet):
+    line, idx = find_token(snippet, "fetchUser")
+    del line["display_tokens"][idx]
+
+
+def tamper_shift(snippet):
+    line, idx = find_token(snippet, "fetchUser")
+    line["display_tokens"][idx]["start_col"] += 1
+
+
+def tamper_merge(snippet):
+    line, idx = find_token(snippet, "fetchUser")
+    tokens = line["display_tokens"]
+    tokens[idx : idx + 2] = [
+        {
+            **tokens[idx],
+            "text": tokens[idx]["text"] + tokens[idx + 1]["text"],
+            "end_col": tokens[idx + 1]["end_col"],
+        }
+    ]
+
+
+def tamper_tree_category(snippet):
+    line, idx = find_token(snippet, "Provider")
+    line["display_tokens"][idx]["categories"].remove("jsx_tag_name")
+
+
+def tamper_source(snippet):
+    snippet["lines"][0]["actual_line"] = ""
+
+
+@pytest.mark.parametrize(
+    "tamper, message",
+    [
+        (tamper_drop, "token text changed"),
+        (tamper_shift, "moved"),
+        (tamper_merge, "moved"),
+        (tamper_tree_category, "lost a tree category"),
+        (tamper_source, "actual_line changed"),
+    ],
+)
+def test_preserved_mismatch_detects_lossy_migration(tamper, message):
+    stored = fresh_snippet()
+    migrated = json.loads(json.dumps(stored))
+    tamper(migrated)
+    assert message in preserved_mismatch(stored, migrated)
+
+
+def test_migrate_file_rejects_lossy_migration(tmp_path, monkeypatch):
+    snippet_path = tmp_path / "panel.json"
+    original = BACKEND.dumps(fresh_snippet())
+    snippet_path.write_bytes(original)
+
+    # A rule change that drops the tree-decided jsx_tag_name category
+    def lossy(token, line_number, split_jsx):
+        token = {
+            **token,
+            "categories": [c for c in token["categories"] if c != "jsx_tag_name"],
+        }
+        return migrate_token(token, line_number, split_jsx)
+
+    migrate_token = migrate_snippets.migrate_token
+    monkeypatch.setattr(migrate_snippets, "migrate_token", lossy)
+    status = migrate_file(snippet_path, snippet_path, 2)[3]
+    assert status.startswith("verify failed: ") and "tree category" in status
+    assert snippet_path.read_bytes() == original
@@ -0,0 +1,33 @@
+"""Tests for snippet emission in build/parse_json.py"""
+
+import pytest
+
+from parse_json import process_file
+
+
+@pytest.mark.parametrize("schema", [1, 2])
+def test_streamed_output_matches_whole_document(sample_source, tmp_path, schema):
+    streamed = tmp_path / "streamed.json"
+    whole = tmp_path / "whole.json"
+    assert process_file(sample_source, streamed, quiet=True, schema=schema)
+    assert process_file(sample_source, whole, quiet=True, schema=schema, stream=False)
+    assert streamed.read_bytes() == whole.read_bytes()
+
+
+def test_failed_emission_keeps_previous_snippet(tmp_path):
+    source = tmp_path / "latin.py"
+    output = tmp_path / "latin.json"
+    source.write_bytes(b"x = 1\ny = 2\nz = 3\nw = 4\nv = 5\n")
+    assert process_file(source, output, quiet=True)
+    previous = output.read_bytes()
+
+    # Not UTF-8: decoding fails while the snippet is being written
+    source.write_bytes(b'x = 1\ny = 2\nz = 3\nw = 4\nv = "\xe9"\n')
+    with pytest.raises(UnicodeDecodeError):
+        process_file(source, output, quiet=True)
+
+    assert output.read_bytes() == previous
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "latin.json",
+        "latin.py",
+    ]
@@ -0,0 +1,103 @@
+"""Tests for build/search_index.py"""
+
+import json
+
+import pytest
+
+from search_index import (
+    SEARCH_DIR_NAME,
+    SearchIndex,
+    delta_decode,
+    delta_encode,
+    write_search_index,
+)
+
+SNIPPETS = [
+    {"id": "py-decorators", "name": "Decorator Patterns", "tags": ["python"]},
+    {"id": "js-json", "name": "JSON Operations", "tags": ["javascript", "json"]},
+    {"id": "ts-config", "name": "Configuration Patterns", "tags": ["typescript"]},
+    {"id": "tsx-context", "name": "Context API", "tags": ["react", "typescript"]},
+]
+
+IDENTIFIERS = {
+    "py-decorators": ["wraps", "lru_cache"],
+    "js-json": ["JSON", "stringify"],
+    "tsx-context": ["useState", "createContext"],
+}
+
+
+@pytest.fixture
+def search_dir(tmp_path):
+    write_search_index(SNIPPETS, tmp_path, IDENTIFIERS)
+    return tmp_path / SEARCH_DIR_NAME
+
+
+def test_delta_round_trip():
+    numbers = [0, 3, 4, 10, 250]
+    assert delta_encode(numbers) == [0, 3, 1, 6, 240]
+    assert delta_decode(delta_encode(numbers)) == numbers
+    assert delta_decode(delta_encode([])) == []
+
+
+def test_every_document_is_found_by_its_terms(search_dir):
+    index = SearchIndex(search_dir)
+
+    for snippet in SNIPPETS:
+        assert snippet["id"] in index.search(snippet["name"])
+        for tag in snippet["tags"]:
+            assert snippet["id"] in index.search(tag)
+        for name in IDENTIFIERS.get(snippet["id"], ()):
+            assert snippet["id"] in index.search(name)
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("patterns", ["py-decorators", "ts-config"]),
+        ("  PATTERNS ", ["py-decorators", "ts-config"]),
+        ("typescript", ["ts-config", "tsx-context"]),
+        ("api", ["tsx-context"]),
+        ("on", ["js-json", "ts-config", "tsx-context"]),
+        ("usestate", ["tsx-context"]),
+        ("json", ["js-json"]),
+        ("nothing like this", []),
+        ("", ["py-decorators", "js-json", "ts-config", "tsx-context"]),
+    ],
+)
+def test_search(search_dir, query, expected):
+    assert SearchIndex(search_dir).search(query) == expected
+
+
+def test_trigram_candidates_are_verified(search_dir):
+    # "ern" and "pat" both occur in "Patterns", but not as one substring
+    assert SearchIndex(search_dir).search("patern") == []
+
+
+def test_identifiers_are_optional(tmp_path):
+    write_search_index(SNIPPETS, tmp_path)
+    index = SearchIndex(tmp_path / SEARCH_DIR_NAME)
+
+    assert "i" not in index.fields
+    assert index.search("usestate") == []
+    assert index.search("react") == ["tsx-context"]
+
+
+def test_rebuild_removes_stale_shards(search_dir, tmp_path):
+    assert (search_dir / "u.json").exists()  # i:usestate
+
+    write_search_index(SNIPPETS[:1], tmp_path)
+    manifest = json.loads((search_dir / "manifest.json").read_text(encoding="utf-8"))
+    written = {path.stem for path in search_dir.glob("*.json")} - {"manifest"}
+    assert written == set(manifest["shards"])
+    assert not (search_dir / "u.json").exists()
+    assert SearchIndex(search_dir).search("json") == []
+
+
+def test_unknown_version_is_rejected(search_dir):
+    manifest_path = search_dir / "manifest.json"
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    manifest["version"] += 1
+    manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+
+    with pytest.raises(ValueError, match="Unsupported search index version"):
+        SearchIndex(search_dir)
@@ -0,0 +1,56 @@
+"""Tests for build/snippet_pack.py"""
+
+import pytest
+
+from json_backend import get_backend
+from parse_json import process_file
+from snippet_pack import (
+    PACK_SUFFIX,
+    pack_snippet_json,
+    unpack_snippet,
+    verify_json_file,
+)
+
+BACKEND = get_backend("stdlib")
+
+
+@pytest.mark.parametrize("schema", [1, 2])
+def test_pack_round_trip(sample_source, tmp_path, schema):
+    output = tmp_path / "snippet.json"
+    assert process_file(sample_source, output, quiet=True, schema=schema)
+    json_data = BACKEND.loads(output.read_bytes())
+
+    packed = pack_snippet_json(json_data)
+    assert unpack_snippet(packed, schema) == json_data
+    assert len(packed) < output.stat().st_size
+
+
+def test_parse_json_pack_output_matches_json(sample_source, tmp_path):
+    json_path = tmp_path / "snippet.json"
+    assert process_file(sample_source, json_path, quiet=True)
+    pack_path = json_path.with_suffix(PACK_SUFFIX)
+    assert process_file(sample_source, pack_path, quiet=True, output_format="pack")
+
+    # Checks the JSON round trip and the sibling .ttsp written by parse_json.py
+    ok, _, _ = verify_json_file(json_path, BACKEND)
+    assert ok
+
+
+def test_pack_schemas_decode_the_same_snippet(sample_source, tmp_path):
+    output = tmp_path / "snippet.json"
+    assert process_file(sample_source, output, quiet=True, schema=2)
+    packed = pack_snippet_json(BACKEND.loads(output.read_bytes()))
+
+    assert pack_snippet_json(unpack_snippet(packed, 1)) == packed
+
+
+@pytest.mark.parametrize(
+    "data, message",
+    [
+        (b"JSON{}", "Not a treetype snippet pack"),
+        (b"TTSP\x63", "Unsupported snippet pack version"),
+    ],
+)
+def test_foreign_data_rejected(data, message):
+    with pytest.raises(ValueError, match=message):
+        unpack_snippet(data)
@@ -0,0 +1,127 @@
+"""Tests for build/token_table.py and the stream engine built on it"""
+
+import zlib
+
+import pytest
+
+from parse_json import (
+    LANGUAGE_EXTENSIONS,
+    PARSERS,
+    build_token_table,
+    dataframe_to_json,
+    extract_leaves,
+    parse_code_to_dataframe,
+    read_source,
+    token_table_to_json,
+)
+from token_table import (
+    CATEGORY_BITS,
+    LeafTable,
+    TokenTable,
+    categories_to_mask,
+    mask_to_categories,
+)
+
+
+def test_category_mask_round_trip():
+    for name, _ in CATEGORY_BITS:
+        assert mask_to_categories(categories_to_mask([name])) == [name]
+    categories = ["string_delimiter", "string_delimiter", "comment"]
+    mask = categories_to_mask(categories)
+    # Decoding follows CATEGORY_BITS order, duplicates included
+    assert mask_to_categories(mask) == [
+        "comment",
+        "string_delimiter",
+        "string_delimiter",
+    ]
+    assert mask_to_categories(0) == []
+
+
+def test_unknown_category_rejected():
+    with pytest.raises(ValueError, match="Unknown token category"):
+        categories_to_mask(["not_a_category"])
+
+
+def test_token_text_and_lines_slice_the_source():
+    source = "x = 'é'\nprint(x)".encode("utf-8")
+    table = TokenTable(source, "python")
+    table.append(0, 4, 0, 7, 4, 8, "string", True, 0, 0, 0)
+    table.append(1, 0, 1, 5, 9, 14, "identifier", True, 0, 0, 1)
+
+    assert len(table) == 2
+    assert table.text(0) == "'é'"
+    assert table.type_name(1) == "identifier"
+    assert table.line_text(0) == "x = 'é'"
+    assert table.line_text(1) == "print(x)"
+    assert table.line_text(5) == ""
+    assert table.line_count() == 2
+    assert table.typeable_count() == 2
+
+
+def test_stream_engine_matches_legacy_engine(sample_source):
+    language = LANGUAGE_EXTENSIONS[sample_source.suffix]
+    parser = PARSERS[language][1]
+    source = read_source(sample_source)
+
+    source_code = source.decode("utf-8")
+    df = parse_code_to_dataframe(source_code, parser, language)
+    expected = dataframe_to_json(df, source_code, language)
+    table = build_token_table(source, parser, language)
+
+    assert token_table_to_json(table) == expected
+
+
+def parsed(sample_source):
+    language = LANGUAGE_EXTENSIONS[sample_source.suffix]
+    return read_source(sample_source), PARSERS[language][1], language
+
+
+def columns(table, names):
+    return {name: list(getattr(table, name)) for name, _ in names}
+
+
+def test_leaf_table_bytes_round_trip(sample_source):
+    source, parser, language = parsed(sample_source)
+    leaves = extract_leaves(source, parser, language)
+
+    loaded = LeafTable.from_bytes(leaves.to_bytes(LeafTable.COLUMNS), language)
+    assert loaded.types == leaves.types
+    assert columns(loaded, LeafTable.COLUMNS) == columns(leaves, LeafTable.COLUMNS)
+
+
+def test_token_table_bytes_round_trip(sample_source):
+    source, parser, language = parsed(sample_source)
+    table = build_token_table(source, parser, language)
+
+    loaded = TokenTable.from_bytes(
+        table.to_bytes(TokenTable.TOKEN_COLUMNS), source, language
+    )
+    loaded.load_bytes(
+        table.to_bytes(TokenTable.CATEGORY_COLUMNS, with_types=False),
+        TokenTable.CATEGORY_COLUMNS,
+    )
+    assert token_table_to_json(loaded) == token_table_to_json(table)
+
+
+@pytest.mark.parametrize(
+    "blob",
+    [
+        zlib.compress(b"not a stage blob at all"),
+        zlib.compress(b"TTST\xff" + bytes(8)),
+    ],
+    ids=["magic", "version"],
+)
+def test_foreign_stage_blob_rejected(blob):
+    with pytest.raises(ValueError, match="Not a treetype stage blob"):
+        LeafTable.from_bytes(blob, "python")
+
+
+def test_truncated_stage_blob_rejected():
+    leaves = LeafTable("python")
+    leaves.append((0, 0), (0, 1), 0, 1, 1, "identifier", 0, 0)
+    data = zlib.decompress(leaves.to_bytes(LeafTable.COLUMNS))
+
+    with pytest.raises(ValueError, match="Truncated or oversized"):
+        LeafTable.from_bytes(zlib.compress(data[:-1]), "python")
+    with pytest.raises(ValueError, match="Truncated or oversized"):
+        LeafTable.from_bytes(zlib.compress(data + b"\0"), "python")
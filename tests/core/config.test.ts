@@ -23,6 +23,26 @@ describe("Config: Token Filtering Logic", () => {
     };
   }
 
+  /**
+   * Helper function to create a base-typeable token
+   */
+  function token(
+    text: string,
+    type: string,
+    categories: Token["categories"],
+    start_col: number
+  ): Token {
+    return {
+      text,
+      type,
+      typeable: true,
+      base_typeable: true,
+      start_col,
+      end_col: start_col + text.length,
+      categories,
+    };
+  }
+
   describe("Whitespace Handling", () => {
     test("pure whitespace tokens are never typeable", () => {
       const line = createTestLine([
@@ -871,6 +891,120 @@ describe("Config: Token Filtering Logic", () => {
     });
   });
 
+  describe("jsx_tag_name Category", () => {
+    test("member tag name parts follow angle_bracket rules", () => {
+      // <AuthContext.Provider value={user}>: the scan only sees AuthContext
+      const line = createTestLine([
+        token("<", "<", ["angle_bracket"], 0),
+        token("AuthContext", "identifier", ["jsx_tag_name"], 1),
+        token(".", ".", ["punctuation"], 12),
+        token("Provider", "property_identifier", ["jsx_tag_name"], 13),
+        token("value", "property_identifier", [], 22),
+      ]);
+
+      const minimal = applyExclusionConfig(line, "minimal");
+      expect(minimal.display_tokens[1].typeable).toBe(false);
+      expect(minimal.display_tokens[3].typeable).toBe(false);
+      expect(minimal.typing_sequence).toBe("value");
+
+      const full = applyExclusionConfig(line, "full");
+      expect(full.display_tokens[3].typeable).toBe(true);
+    });
+
+    test("tag name continued on the next line is excluded", () => {
+      // <input   (attributes and /> follow on later lines)
+      const line = createTestLine([
+        token("<", "<", ["angle_bracket"], 0),
+        token("input", "identifier", ["jsx_tag_name"], 1),
+      ]);
+
+      const result = applyExclusionConfig(line, "standard");
+      expect(result.display_tokens[1].typeable).toBe(false);
+      expect(result.typing_sequence).toBe("");
+    });
+  });
+
+  describe("Build-time Preset Masks", () => {
+    /**
+     * if (loading) return <p>Loading item...</p>;
+     * as written by parse_json.py (masks and lengths included)
+     */
+    function createMaskedLine(): Line {
+      const tokens = [
+        token("if", "if", [], 2),
+        token("(", "(", ["parenthesis"], 5),
+        token("loading", "identifier", [], 6),
+        token(")", ")", ["parenthesis"], 13),
+        token("return", "return", [], 15),
+        token("<", "<", ["angle_bracket"], 22),
+        token("p", "identifier", ["jsx_tag_name"], 23),
+        token(">", ">", ["angle_bracket"], 24),
+        token("Loading item...", "jsx_text", ["string_content"], 25),
+        token("</", "</", ["angle_bracket"], 40),
+        token("p", "identifier", ["jsx_tag_name"], 42),
+        token(">", ">", ["angle_bracket"], 43),
+        token(";", ";", ["punctuation"], 44),
+      ];
+      return {
+        ...createTestLine(tokens),
+        typing_sequence: "if(loading)return<p>Loading item...</p>;",
+        preset_masks: { minimal: "5100", standard: "f100", full: "ffe1" },
+        preset_lengths: { minimal: 15, standard: 17, full: 25 },
+      };
+    }
+
+    test.each(["minimal", "standard", "full"] as TypingMode[])(
+      "%s: mask gives the same result as the preset rules",
+      (preset) => {
+        const line = createMaskedLine();
+        const masked = applyExclusionConfig(line, preset);
+        const rules = applyExclusionConfig(
+          { ...line, preset_masks: undefined, preset_lengths: undefined },
+          preset
+        );
+
+        expect(masked.display_tokens).toEqual(rules.display_tokens);
+        expect(masked.typing_sequence).toBe(rules.typing_sequence);
+        expect(masked.char_map).toEqual(rules.char_map);
+        expect(masked.typing_sequence.length).toBe(line.preset_lengths![preset]);
+      }
+    );
+
+    test("typeability comes from the mask, not the rules", () => {
+      const line = {
+        ...createMaskedLine(),
+        // Only "loading" (token 2)
+        preset_masks: { minimal: "4000", standard: "4000", full: "4000" },
+        preset_lengths: { minimal: 7, standard: 7, full: 7 },
+      };
+
+      const result = applyExclusionConfig(line, "full");
+      expect(result.typing_sequence).toBe("loading");
+      expect(result.char_map["0"]).toEqual({ token_idx: 2, display_col: 6 });
+      expect(result.display_tokens.filter((t) => t.typeable).length).toBe(1);
+    });
+
+    test("zero typing length leaves nothing typeable", () => {
+      const line = {
+        ...createMaskedLine(),
+        preset_lengths: { minimal: 0, standard: 0, full: 0 },
+      };
+
+      const result = applyExclusionConfig(line, "standard");
+      expect(result.typing_sequence).toBe("");
+      expect(result.char_map).toEqual({});
+      expect(result.display_tokens.some((t) => t.typeable)).toBe(false);
+    });
+
+    test("switching back to a mode reuses the filtered line", () => {
+      const line = createMaskedLine();
+
+      const first = applyExclusionConfig(line, "minimal");
+      applyExclusionConfig(line, "full");
+      expect(applyExclusionConfig(line, "minimal")).toBe(first);
+    });
+  });
+
   describe("Edge Cases", () => {
     test("empty token array", () => {
       const line = createTestLine([]);
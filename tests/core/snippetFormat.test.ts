@@ -0,0 +1,111 @@
+import { describe, test, expect } from "vitest";
+import { decodeSnippet } from "../../src/core/snippetFormat";
+import { CompactSnippetData, SnippetData } from "../../src/types/snippet";
+
+// `total = add(1, 2)  # sum` as written by parse_json.py --schema 2
+const createCompactSnippet = (): CompactSnippetData => ({
+  schema_version: 2,
+  language: "python",
+  total_lines: 1,
+  token_fields: [
+    "text",
+    "type",
+    "categories",
+    "base_typeable",
+    "start_col",
+    "end_col",
+  ],
+  category_bits: [
+    "comment",
+    "string_content",
+    "string_delimiter",
+    "string_delimiter",
+    "punctuation",
+    "parenthesis",
+    "curly_brace",
+    "square_bracket",
+    "angle_bracket",
+    "operator",
+    "keyword",
+    "identifier",
+    "jsx_tag_name",
+  ],
+  types: ["identifier", "=", "(", "integer", ",", ")", "comment"],
+  lines: [
+    {
+      line_number: 0,
+      indent_level: 0,
+      actual_line: "total = add(1, 2)  # sum",
+      typing_sequence: "total=add(1,2)# sum",
+      token_offsets: [0, 5, 6, 9, 10, 11, 12, 13, 14],
+      preset_masks: { minimal: "550", standard: "ff0", full: "ff0" },
+      preset_lengths: { minimal: 10, standard: 14, full: 14 },
+      tokens: [
+        ["total", 0, 0, 1, 0, 5],
+        ["=", 1, 512, 1, 6, 7],
+        ["add", 0, 0, 1, 8, 11],
+        ["(", 2, 32, 1, 11, 12],
+        ["1", 3, 0, 1, 12, 13],
+        [",", 4, 16, 1, 13, 14],
+        ["2", 3, 0, 1, 15, 16],
+        [")", 5, 32, 1, 16, 17],
+        ["# sum", 6, 1, 1, 19, 24],
+      ],
+    },
+  ],
+});
+
+describe("Snippet Format: decodeSnippet", () => {
+  test("schema 1 snippets are returned as-is", () => {
+    const snippet: SnippetData = {
+      language: "python",
+      total_lines: 0,
+      lines: [],
+    };
+
+    expect(decodeSnippet(snippet)).toBe(snippet);
+  });
+
+  test("compact tokens expand into display tokens", () => {
+    const [line] = decodeSnippet(createCompactSnippet()).lines;
+
+    expect(line.display_tokens).toHaveLength(9);
+    expect(line.display_tokens[1]).toEqual({
+      text: "=",
+      type: "=",
+      typeable: true,
+      base_typeable: true,
+      start_col: 6,
+      end_col: 7,
+      categories: ["operator"],
+    });
+    expect(line.display_tokens[3].categories).toEqual(["parenthesis"]);
+    expect(line.display_tokens[8].categories).toEqual(["comment"]);
+    expect(line.display_tokens[0].categories).toEqual([]);
+  });
+
+  test("char_map is rebuilt from token_offsets", () => {
+    const [line] = decodeSnippet(createCompactSnippet()).lines;
+
+    expect(line.typing_sequence).toBe("total=add(1,2)# sum");
+    expect(Object.keys(line.char_map)).toHaveLength(19);
+    expect(line.char_map["0"]).toEqual({ token_idx: 0, display_col: 0 });
+    expect(line.char_map["5"]).toEqual({ token_idx: 1, display_col: 6 });
+    expect(line.char_map["18"]).toEqual({ token_idx: 8, display_col: 19 });
+  });
+
+  test("line metadata and preset masks are kept", () => {
+    const decoded = decodeSnippet(createCompactSnippet());
+    const [line] = decoded.lines;
+
+    expect(decoded.language).toBe("python");
+    expect(decoded.total_lines).toBe(1);
+    expect(line.line_number).toBe(0);
+    expect(line.preset_masks).toEqual({
+      minimal: "550",
+      standard: "ff0",
+      full: "ff0",
+    });
+    expect(line.preset_lengths).toEqual({ minimal: 10, standard: 14, full: 14 });
+  });
+});